@@ -0,0 +1,274 @@
+"""
+Benchmark suite for h7-file-finder, h7-env-manager and h7-logger-manager, with JSON baselines.
+
+Runs every benchmark on synthetic trees and files in a temporary directory:
+
+    root      find_project_root from depths 1 to 50, with and without the root cache
+    env       EnvManager getters, 1M calls each by default
+    dotenv    native .env parser on files of 1k and 100k lines
+    logging   per-call latency and throughput of each LoggerManager handler setup
+
+Every result is a time in microseconds (per call, per file or per record), so lower
+is always better. Timed loops are repeated ``--rounds`` times and the fastest round
+is kept, which filters out most scheduling noise.
+
+Usage:
+    python benchmarks/run_benchmarks.py --output baseline.json
+    python benchmarks/run_benchmarks.py --baseline baseline.json [--threshold 0.25]
+
+With ``--baseline`` every result slower than the baseline by more than ``--threshold``
+(a fraction, 0.25 = 25%) is reported as a regression and the exit status is 1.
+Baselines are only comparable on the same machine and Python version.
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+for src in ('h7-file-finder/src', 'h7-env-manager/src', 'h7-logger-manager/src'):
+    sys.path.insert(0, os.path.join(ROOT, src))
+
+from h7_env_manager import EnvManager  # noqa: E402
+from h7_env_manager.dotenv_parser import parse_dotenv  # noqa: E402
+from h7_file_finder.path_finder import clear_project_root_cache, find_project_root  # noqa: E402
+from h7_logger_manager import LoggerManager  # noqa: E402
+
+BASELINE_SCHEMA = 1
+
+Results = Dict[str, float]
+
+# LoggerManager class attributes per handler setup; unlisted attributes keep their defaults
+LOGGING_SETUPS = {
+    "rotating": {},
+    "buffered": {"file_handler_mode": "buffered"},
+    "timed": {"file_handler_mode": "timed"},
+    "json": {"output_format": "json"},
+    "binary": {"output_format": "binary"},
+    "async": {"async_logging": True},
+}
+
+
+def best_of(rounds: int, func: Callable[[], float]) -> float:
+    return min(func() for _ in range(rounds))
+
+
+def time_loop(func: Callable[[], object], calls: int) -> float:
+    """Mean microseconds per call of ``func`` over ``calls`` calls."""
+    start = time.perf_counter()
+    for _ in range(calls):
+        func()
+    return (time.perf_counter() - start) / calls * 1e6
+
+
+def bench_root_discovery(base: Path, depths: List[int], calls: int, rounds: int) -> Results:
+    """find_project_root from the leaf of a tree ``depth`` levels below the only marker."""
+    results = {}
+    for depth in depths:
+        root = base / f"root_depth_{depth}"
+        (root / ".git").mkdir(parents=True)
+        leaf = root
+        for level in range(depth):
+            leaf = leaf / f"level_{level}"
+            leaf.mkdir()
+            for index in range(8):
+                (leaf / f"module_{index}.py").write_text("")
+
+        clear_project_root_cache()
+        results[f"root.depth_{depth}.uncached_us"] = best_of(
+            rounds, lambda: time_loop(lambda: find_project_root(leaf, use_cache=False), calls))
+        results[f"root.depth_{depth}.cached_us"] = best_of(
+            rounds, lambda: time_loop(lambda: find_project_root(leaf), calls))
+    clear_project_root_cache()
+    return results
+
+
+def bench_env_getters(calls: int, rounds: int) -> Results:
+    """Repeated lookups of a set and a missing variable through the EnvManager getters."""
+    os.environ.update({"BENCH_STR": "value", "BENCH_INT": "42", "BENCH_BOOL": "true"})
+    cases = {
+        "get_optional_env_var": lambda: EnvManager.get_optional_env_var("BENCH_STR"),
+        "get_optional_env_var_missing": lambda: EnvManager.get_optional_env_var("BENCH_MISSING", "default"),
+        "get_required_env_var": lambda: EnvManager.get_required_env_var("BENCH_STR"),
+        "get_optional_bool_env_var": lambda: EnvManager.get_optional_bool_env_var("BENCH_BOOL"),
+        "get_optional_int_env_var": lambda: EnvManager.get_optional_int_env_var("BENCH_INT"),
+    }
+    results = {}
+    for name, getter in cases.items():
+        getter()  # loads the .env file and fills the parse cache
+        results[f"env.{name}_us"] = best_of(rounds, lambda: time_loop(getter, calls))
+    return results
+
+
+def write_env_file(path: Path, lines: int):
+    """Write a .env file mixing plain, exported, quoted, interpolated and comment lines."""
+    templates = [
+        "PLAIN_{i}=value_{i}",
+        "export EXPORTED_{i}=yes",
+        "QUOTED_{i}=\"double quoted {i} with spaces\"",
+        "SINGLE_{i}='single quoted {i}'",
+        "REF_{i}=${{PLAIN_0}}/path/{i}",
+        "# comment line {i}",
+    ]
+    with open(path, "w", encoding="utf-8") as stream:
+        for i in range(lines):
+            stream.write(templates[i % len(templates)].format(i=i) + "\n")
+
+
+def bench_dotenv_parsing(base: Path, sizes: List[int], rounds: int) -> Results:
+    results = {}
+    for lines in sizes:
+        env_file = base / f"{lines}.env"
+        write_env_file(env_file, lines)
+        calls = max(1, 100000 // lines)
+        results[f"dotenv.lines_{lines}.parse_us"] = best_of(
+            rounds, lambda: time_loop(lambda: parse_dotenv(env_file), calls))
+    return results
+
+
+def run_logging_setup(name: str, options: dict, logs_dir: Path, records: int) -> Tuple[List[int], float]:
+    """Log ``records`` DEBUG records (file handler only) and return the call latencies in ns and the total time."""
+    defaults = {option: getattr(LoggerManager, option) for option in options}
+    LoggerManager._loggers = {}
+    LoggerManager._async_pipeline = None
+    for option, value in options.items():
+        setattr(LoggerManager, option, value)
+    try:
+        logger = LoggerManager.setup_logger(f"bench_{name}", logs_dir=logs_dir)
+        clock = time.perf_counter_ns
+        samples = []
+        start = time.perf_counter()
+        for index in range(records):
+            call_start = clock()
+            logger.debug("request %d handled for user %s in %.3f ms", index, "user@example.com", 1.234)
+            samples.append(clock() - call_start)
+        # Count the work left to the background writer and the buffer in the throughput
+        LoggerManager.shutdown()
+        for handler in logger.handlers:
+            handler.flush()
+        elapsed = time.perf_counter() - start
+    finally:
+        LoggerManager.close_all()
+        LoggerManager._async_pipeline = None
+        for option, value in defaults.items():
+            setattr(LoggerManager, option, value)
+    return samples, elapsed
+
+
+def bench_logging(base: Path, records: int, rounds: int) -> Results:
+    results = {}
+    for name, options in LOGGING_SETUPS.items():
+        runs = [run_logging_setup(name, options, base / "logs" / name / str(run), records) for run in range(rounds)]
+        samples, elapsed = min(runs, key=lambda run: run[1])
+        samples.sort()
+        results[f"logging.{name}.p50_us"] = samples[len(samples) // 2] / 1000
+        results[f"logging.{name}.p99_us"] = samples[min(len(samples) - 1, int(len(samples) * 0.99))] / 1000
+        results[f"logging.{name}.per_record_us"] = elapsed / records * 1e6
+    return results
+
+
+def compare(results: Results, baseline: Results, threshold: float) -> List[Tuple[str, float, float, float, bool]]:
+    """Return (name, baseline, current, ratio, regressed) for every result present in both."""
+    rows = []
+    for name in sorted(set(results) & set(baseline)):
+        ratio = results[name] / baseline[name] if baseline[name] else float("inf")
+        rows.append((name, baseline[name], results[name], ratio, ratio > 1.0 + threshold))
+    return rows
+
+
+def load_baseline(path: Path) -> Results:
+    """
+    Read the results of a baseline file written with ``--output``.
+
+    Raises:
+        ValueError: If the file is not a baseline of this suite
+    """
+    with open(path, encoding="utf-8") as stream:
+        document = json.load(stream)
+    if not isinstance(document, dict) or document.get("schema") != BASELINE_SCHEMA:
+        raise ValueError(f"{path} is not a benchmark baseline (schema {BASELINE_SCHEMA})")
+    return document["results"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--only", nargs="+", choices=["root", "env", "dotenv", "logging"],
+                        default=["root", "env", "dotenv", "logging"])
+    parser.add_argument("--depths", type=int, nargs="+", default=[1, 5, 10, 20, 50])
+    parser.add_argument("--root-calls", type=int, default=2000)
+    parser.add_argument("--env-calls", type=int, default=1000000)
+    parser.add_argument("--dotenv-lines", type=int, nargs="+", default=[1000, 100000])
+    parser.add_argument("--records", type=int, default=20000, help="records per logging setup")
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--quick", action="store_true", help="divide the call and record counts by 10")
+    parser.add_argument("--output", type=Path, help="write the results as a JSON baseline")
+    parser.add_argument("--baseline", type=Path, help="compare against a baseline written with --output")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="slowdown, as a fraction of the baseline, reported as a regression")
+    args = parser.parse_args()
+    if args.quick:
+        args.root_calls = max(1, args.root_calls // 10)
+        args.env_calls = max(1, args.env_calls // 10)
+        args.records = max(100, args.records // 10)
+    baseline = load_baseline(args.baseline) if args.baseline else None
+
+    results: Results = {}
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as temp_dir:
+        project = Path(temp_dir).resolve()
+        (project / ".env").write_text("LOGGER_NAME=bench\nDEBUG_MODE=true\n")
+        os.chdir(project)
+        EnvManager.dotenv_parser = "native"
+        try:
+            if "root" in args.only:
+                results.update(bench_root_discovery(project / "trees", args.depths, args.root_calls, args.rounds))
+            if "env" in args.only:
+                results.update(bench_env_getters(args.env_calls, args.rounds))
+            if "dotenv" in args.only:
+                results.update(bench_dotenv_parsing(project, args.dotenv_lines, args.rounds))
+            if "logging" in args.only:
+                results.update(bench_logging(project, args.records, args.rounds))
+        finally:
+            os.chdir(cwd)
+
+    print(f"{'benchmark':<44} {'us':>12}")
+    for name, value in results.items():
+        print(f"{name:<44} {value:>12.3f}")
+
+    if args.output:
+        document = {
+            "schema": BASELINE_SCHEMA,
+            "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "options": {key: str(value) if isinstance(value, Path) else value for key, value in vars(args).items()},
+            "results": results,
+        }
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        with open(args.output, "w", encoding="utf-8") as stream:
+            json.dump(document, stream, indent=2)
+            stream.write("\n")
+        print(f"\nResults written to {args.output}")
+
+    if baseline is not None:
+        rows = compare(results, baseline, args.threshold)
+        print(f"\n{'benchmark':<44} {'baseline':>10} {'current':>10} {'change':>8}")
+        for name, before, after, ratio, regressed in rows:
+            flag = "  REGRESSION" if regressed else ""
+            print(f"{name:<44} {before:>10.3f} {after:>10.3f} {(ratio - 1) * 100:>+7.1f}%{flag}")
+        regressions = [row for row in rows if row[4]]
+        if regressions:
+            print(f"\n{len(regressions)} benchmark(s) slower than the baseline by more than {args.threshold:.0%}")
+            sys.exit(1)
+        print(f"\nNo regression beyond {args.threshold:.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Benchmark: import-plus-parse time of the native .env parser versus python-dotenv.
+
+Every measurement runs in a fresh interpreter so the import cost is included, which
+is what a short-lived CLI job or serverless handler pays on a cold start.
+
+Usage:
+    python benchmarks/bench_dotenv_parser.py [--lines 10 1000 100000] [--runs 5]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+SRC_DIRS = [
+    os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')),
+    os.path.abspath(os.path.join(os.path.dirname(__file__), '../../h7-file-finder/src')),
+]
+
+PARSERS = {
+    "python-dotenv": "from dotenv import dotenv_values as parse",
+    "native": "from h7_env_manager.dotenv_parser import parse_dotenv as parse",
+}
+
+SNIPPET = """
+import json, sys, time
+start = time.perf_counter()
+{import_line}
+values = parse(sys.argv[1])
+print(json.dumps({{"seconds": time.perf_counter() - start, "keys": len(values)}}))
+"""
+
+
+def write_env_file(path: Path, lines: int):
+    """Write a .env file mixing the statement styles we use in production."""
+    templates = [
+        "PLAIN_{i}=value_{i}",
+        "export EXPORTED_{i}=yes",
+        "QUOTED_{i}=\"double quoted {i} with spaces\"",
+        "SINGLE_{i}='single quoted {i}'",
+        "REF_{i}=${{PLAIN_0}}/path/{i}",
+        "# comment line {i}",
+    ]
+    with open(path, "w", encoding="utf-8") as stream:
+        for i in range(lines):
+            stream.write(templates[i % len(templates)].format(i=i) + "\n")
+
+
+def run_once(parser: str, env_file: Path) -> dict:
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(SRC_DIRS))
+    code = SNIPPET.format(import_line=PARSERS[parser])
+    output = subprocess.check_output([sys.executable, "-c", code, str(env_file)], env=env)
+    return json.loads(output)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--lines", type=int, nargs="+", default=[10, 1000, 100000])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--parsers", nargs="+", choices=sorted(PARSERS), default=list(PARSERS),
+                        help="python-dotenv re-copies the environment for every line, so it takes "
+                             "minutes on 100k-line files")
+    args = parser.parse_args()
+
+    print(f"{'lines':>7} {'parser':<14} {'median ms':>10} {'keys':>7}")
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for lines in args.lines:
+            env_file = Path(temp_dir) / f"{lines}.env"
+            write_env_file(env_file, lines)
+            for name in args.parsers:
+                try:
+                    results = [run_once(name, env_file) for _ in range(args.runs)]
+                except subprocess.CalledProcessError:
+                    print(f"{lines:>7} {name:<14} {'skipped (not importable)':>18}")
+                    continue
+                median = statistics.median(result["seconds"] for result in results) * 1000
+                print(f"{lines:>7} {name:<14} {median:>10.2f} {results[0]['keys']:>7}")
+
+
+if __name__ == "__main__":
+    main()
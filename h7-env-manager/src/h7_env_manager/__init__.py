@@ -1,10 +1,56 @@
-"""Documentation for the h7_env_manager package.
+"""
+Documentation for the h7_env_manager package.
 
 This package provides utilities for managing environment variables in a project.
+The package-level names are imported lazily, on first access.
 """
 
+# typing.TYPE_CHECKING without importing typing, which costs more than the package itself
+TYPE_CHECKING = False
+
 # Package version
 __version__ = "1.0.2"
 
-# Import main class to make it available at package level
-from .env_manager import EnvManager as EnvManager
+# Package-level name -> module defining it (relative names are submodules)
+_LAZY_ATTRIBUTES = {
+    "EnvManager": ".env_manager",
+    "Setting": ".settings",
+    "SettingsError": ".settings",
+    "EnvChange": ".watcher",
+    "SecretProvider": ".secrets",
+    "SecretError": ".secrets",
+    # The metrics registry shared by the h7 packages
+    "metrics": "h7_file_finder.instrumentation",
+    "MetricsRegistry": "h7_file_finder.instrumentation",
+}
+
+__all__ = ["__version__"]
+__all__.extend(_LAZY_ATTRIBUTES)
+
+if TYPE_CHECKING:
+    from h7_file_finder.instrumentation import MetricsRegistry as MetricsRegistry
+    from h7_file_finder.instrumentation import metrics as metrics
+
+    from .env_manager import EnvManager as EnvManager
+    from .secrets import SecretError as SecretError
+    from .secrets import SecretProvider as SecretProvider
+    from .settings import Setting as Setting
+    from .settings import SettingsError as SettingsError
+    from .watcher import EnvChange as EnvChange
+
+
+# Defined here rather than shared through h7_file_finder, which importing the package must not load
+def __getattr__(name):
+    module_name = _LAZY_ATTRIBUTES.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    if module_name.startswith("."):
+        module_name = __name__ + module_name
+    # The import statement machinery, unlike importlib.import_module, shows up in -X importtime
+    value = getattr(__import__(module_name, fromlist=[name]), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_ATTRIBUTES))
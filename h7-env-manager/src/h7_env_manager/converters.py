@@ -0,0 +1,69 @@
+"""Conversions from raw environment variable strings to typed values.
+
+Every converter raises ValueError with a short description when the string cannot
+be converted.
+"""
+
+import json
+import re
+from typing import Any, List
+
+_DURATION_UNITS = {
+    "ms": 0.001,
+    "s": 1.0,
+    "m": 60.0,
+    "h": 3600.0,
+    "d": 86400.0,
+}
+_DURATION_PART_RE = re.compile(r"(\d+(?:\.\d*)?|\.\d+)(ms|s|m|h|d)")
+
+
+def to_int(raw: str) -> int:
+    """Convert a decimal integer, ignoring surrounding whitespace."""
+    return int(raw.strip())
+
+
+def to_float(raw: str) -> float:
+    """Convert a float, ignoring surrounding whitespace."""
+    return float(raw.strip())
+
+
+def to_bool(raw: str) -> bool:
+    """Return True for "true" in any case, False for anything else."""
+    return raw.strip().lower() == "true"
+
+
+def to_list(raw: str, separator: str = ",") -> List[str]:
+    """Split on ``separator``, stripping whitespace and dropping empty items."""
+    return [item.strip() for item in raw.split(separator) if item.strip()]
+
+
+def to_json(raw: str) -> Any:
+    """Decode a JSON document, raising ValueError when it is invalid."""
+    try:
+        return json.loads(raw)
+    except json.JSONDecodeError as e:
+        raise ValueError(f"invalid JSON: {e}") from e
+
+
+def to_duration(raw: str) -> float:
+    """Convert a duration such as ``"30s"``, ``"250ms"`` or ``"1h30m"`` to seconds.
+
+    A bare number is interpreted as seconds.
+    """
+    text = raw.strip().lower()
+    try:
+        return float(text)
+    except ValueError:
+        pass
+
+    position = 0
+    seconds = 0.0
+    for match in _DURATION_PART_RE.finditer(text):
+        if match.start() != position:
+            break
+        seconds += float(match.group(1)) * _DURATION_UNITS[match.group(2)]
+        position = match.end()
+    if position == 0 or position != len(text):
+        raise ValueError(f"invalid duration '{raw}', expected e.g. '30s', '250ms' or '1h30m'")
+    return seconds
@@ -0,0 +1,179 @@
+"""Streaming parser for .env files.
+
+Supports the subset of the python-dotenv syntax used by our projects: comments,
+``export`` prefixes, single and double quoted (multi-line) values, inline comments
+after unquoted values and ``${VAR}`` / ``${VAR:-default}`` interpolation. Parsing
+and interpolation are separate steps so the raw bindings can be cached and resolved
+later against a different environment.
+
+Like python-dotenv, ``${VAR:-default}`` only falls back on the default when ``VAR``
+is not defined at all; a variable set to an empty string resolves to "".
+"""
+
+import os
+import re
+from typing import Dict, Iterable, Iterator, List, Mapping, NamedTuple, Optional, Union
+
+# Lines a quoted value may span before its statement is given up as unterminated
+MAX_CONTINUATION_LINES = 1000
+
+_KEY_RE = re.compile(r"[A-Za-z_][A-Za-z0-9_.\-]*")
+# Body of a quoted value up to its closing quote; escapes never span a line break, so
+# each line of a multi-line value is matched on its own
+_SINGLE_QUOTED_RE = re.compile(r"((?:\\'|[^'])*)'")
+_DOUBLE_QUOTED_RE = re.compile(r'((?:\\.|[^"\\])*)"', re.DOTALL)
+_INLINE_COMMENT_RE = re.compile(r"\s+#.*$")
+_VARIABLE_RE = re.compile(r"\$\{(?P<name>[^}:]*)(?::-(?P<default>[^}]*))?\}")
+_SINGLE_QUOTE_ESCAPES_RE = re.compile(r"\\[\\']")
+_DOUBLE_QUOTE_ESCAPES_RE = re.compile(r"\\[\\'\"abfnrtv]")
+_ESCAPES = {
+    "\\\\": "\\", "\\'": "'", '\\"': '"', "\\a": "\a", "\\b": "\b",
+    "\\f": "\f", "\\n": "\n", "\\r": "\r", "\\t": "\t", "\\v": "\v",
+}
+# Result of looking up a variable defined neither in the file nor in the environment
+_UNDEFINED = object()
+
+
+class Binding(NamedTuple):
+    """A raw ``KEY=value`` statement; ``value`` is None for a bare ``KEY``."""
+
+    key: str
+    value: Optional[str]
+
+
+def _unescape(match: "re.Match") -> str:
+    return _ESCAPES[match.group(0)]
+
+
+class _Lines:
+    """Iterator over the lines of a stream, able to read lines again after a statement is given up."""
+
+    def __init__(self, stream: Iterable[str]):
+        self._stream = iter(stream)
+        self._pending: List[str] = []
+
+    def __iter__(self) -> "_Lines":
+        return self
+
+    def __next__(self) -> str:
+        if self._pending:
+            return self._pending.pop()
+        return next(self._stream)
+
+    def push_back(self, lines: List[str]):
+        self._pending.extend(reversed(lines))
+
+
+def _read_quoted(value: str, lines: _Lines, quote_re: "re.Pattern") -> Optional[str]:
+    """Return the body of a quoted value, pulling continuation lines for multi-line values.
+
+    An unterminated value gives up at the end of the file or after
+    ``MAX_CONTINUATION_LINES`` lines; the lines it pulled are then parsed again.
+    """
+    match = quote_re.match(value, 1)
+    if match:
+        return match.group(1)
+    parts = [value[1:]]
+    continuation: List[str] = []
+    for line in lines:
+        continuation.append(line)
+        match = quote_re.match(line)
+        if match:
+            parts.append(match.group(1))
+            return "".join(parts)
+        parts.append(line)
+        if len(continuation) >= MAX_CONTINUATION_LINES:
+            break
+    lines.push_back(continuation)
+    return None
+
+
+def iter_bindings(stream: Iterable[str]) -> Iterator[Binding]:
+    """Yield the bindings of a .env file one statement at a time.
+
+    Args:
+        stream: Lines of the file, e.g. an open text file
+    Returns:
+        An iterator of bindings; statements that cannot be parsed are skipped, and
+        parsing resumes on the line after them
+    """
+    lines = _Lines(stream)
+    for line in lines:
+        statement = line.lstrip()
+        if not statement or statement.startswith("#"):
+            continue
+        if statement.startswith("export ") or statement.startswith("export\t"):
+            statement = statement[7:].lstrip()
+
+        key, separator, value = statement.partition("=")
+        key = key.strip()
+        if not _KEY_RE.fullmatch(key):
+            continue
+        if not separator:
+            yield Binding(key, None)
+            continue
+
+        value = value.lstrip(" \t")
+        if value.startswith("'"):
+            body = _read_quoted(value, lines, _SINGLE_QUOTED_RE)
+            if body is not None:
+                yield Binding(key, _SINGLE_QUOTE_ESCAPES_RE.sub(_unescape, body))
+        elif value.startswith('"'):
+            body = _read_quoted(value, lines, _DOUBLE_QUOTED_RE)
+            if body is not None:
+                yield Binding(key, _DOUBLE_QUOTE_ESCAPES_RE.sub(_unescape, body))
+        else:
+            value = value.rstrip("\r\n")
+            yield Binding(key, _INLINE_COMMENT_RE.sub("", value).strip())
+
+
+def resolve_bindings(bindings: Iterable[Binding],
+                     environ: Optional[Mapping[str, str]] = None,
+                     override: bool = True) -> Dict[str, Optional[str]]:
+    """Interpolate ``${VAR}`` references and return the resulting mapping.
+
+    Args:
+        bindings: Bindings as produced by :func:`iter_bindings`
+        environ: Environment used for references not defined in the file,
+                 defaults to ``os.environ``
+        override: Whether values defined earlier in the file take precedence
+                  over ``environ`` when resolving references
+    Returns:
+        A mapping of key to value, in file order
+    """
+    environ = os.environ if environ is None else environ
+    values: Dict[str, Optional[str]] = {}
+
+    if override:
+        def lookup(name: str) -> Optional[str]:
+            return values[name] if name in values else environ.get(name, _UNDEFINED)
+    else:
+        def lookup(name: str) -> Optional[str]:
+            return environ[name] if name in environ else values.get(name, _UNDEFINED)
+
+    def substitute(match: "re.Match") -> str:
+        value = lookup(match.group("name"))
+        # The default only replaces undefined variables, as in python-dotenv
+        if value is _UNDEFINED:
+            value = match.group("default")
+        return value or ""
+
+    for key, value in bindings:
+        if value is not None and "${" in value:
+            value = _VARIABLE_RE.sub(substitute, value)
+        values[key] = value
+    return values
+
+
+def parse_dotenv(path: Union[str, "os.PathLike[str]"],
+                 interpolate: bool = True,
+                 encoding: str = "utf-8") -> Dict[str, Optional[str]]:
+    """Parse a .env file into a mapping, resolving references like python-dotenv's ``dotenv_values``.
+
+    Raises:
+        OSError: If the file cannot be read
+    """
+    with open(path, encoding=encoding) as stream:
+        if not interpolate:
+            return dict(iter_bindings(stream))
+        return resolve_bindings(iter_bindings(stream))
@@ -1,25 +1,242 @@
 import os
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
-from h7_file_finder import find_env_file
+from h7_file_finder import find_env_file, running_archive
+from h7_file_finder.instrumentation import metrics
+
+from . import converters, settings
+
+# Prefix of the values resolved through EnvManager.secret_provider; secrets.py is only
+# imported once such a value is found
+SECRET_SCHEME = "secret://"
 
 # Track whether dotenv has been loaded
 _dotenv_loaded = False
 
+# Guards loading so concurrent first accesses parse the .env file only once
+_dotenv_lock = threading.RLock()
+
+# Files the environment was loaded from, in increasing order of precedence
+_env_files: List[Path] = []
+
+# Parser the loaded files were read with, so the watcher re-reads them the same way
+_env_parser: Optional[str] = None
+
+# Background .env watcher, only created when hot reloading is requested
+_watcher = None
+
+# Parsed values of the typed getters: (key, conversion) -> (raw string, parsed value)
+_parsed_cache: Dict[Tuple[str, str], Tuple[str, Any]] = {}
+
+# Cache of the resolved secret:// references, created with the first reference
+_secret_cache = None
+
 
 class EnvManager:
     """Manages environment variables for the application."""
 
+    # Parser used for .env files: "python-dotenv", or "native" to use the built-in
+    # streaming parser and skip importing python-dotenv altogether
+    dotenv_parser = "python-dotenv"
+
+    # Load layered files (.env, .env.local, .env.<profile>, .env.<profile>.local)
+    # instead of the single .env file. The profile defaults to $ENV_PROFILE.
+    layered_env = False
+    env_profile: Optional[str] = None
+
+    # Backend resolving "secret://<path>" values (a secrets.SecretProvider), and how long
+    # resolved values are cached; after secret_refresh_ahead of the TTL a read refreshes
+    # the value in the background. Set them before the first lookup, since the references
+    # of the loaded .env files are fetched in one batch when they are loaded.
+    secret_provider = None
+    secret_ttl = 300.0
+    secret_refresh_ahead = 0.8
+
+    @classmethod
+    def _read_env_file(cls, dotenv_path: Path, parser: Optional[str] = None) -> Dict[str, Optional[str]]:
+        """Parse a .env file with the configured parser.
+
+        Args:
+            dotenv_path: Path of the .env file
+            parser: Parser to use instead of ``dotenv_parser``
+        Returns:
+            The values defined in the file, with references interpolated
+        Raises:
+            ValueError: If the configured parser is unknown
+        """
+        archive = running_archive()
+        if archive is not None and archive.contains(dotenv_path):
+            # A .env file packed inside the zipapp the program runs from
+            import io
+
+            stream = io.StringIO(archive.read_bytes(dotenv_path).decode("utf-8"))
+        else:
+            stream = None
+        parser = parser or cls.dotenv_parser
+        if parser == "native":
+            from .dotenv_parser import iter_bindings, parse_dotenv, resolve_bindings
+
+            return resolve_bindings(iter_bindings(stream)) if stream is not None else parse_dotenv(dotenv_path)
+        if parser == "python-dotenv":
+            from dotenv.main import dotenv_values
+
+            return dotenv_values(stream=stream) if stream is not None else dotenv_values(dotenv_path)
+        raise ValueError(f"Unknown dotenv parser '{parser}'")
+
     @classmethod
     def _ensure_dotenv_loaded(cls):
         """Ensure .env file is loaded only once."""
-        global _dotenv_loaded
+        global _dotenv_loaded, _env_files, _env_parser
+
+        if _dotenv_loaded:
+            return
+        with _dotenv_lock:
+            if _dotenv_loaded:
+                return
+            with metrics.timer("env_load_seconds"):
+                if cls.layered_env:
+                    cls.load_env_profile()
+                    return
+                dotenv_path = find_env_file()
+                values = cls._read_env_file(dotenv_path)
+                cls._apply_env_values(values)
+                _env_files = [dotenv_path]
+                _env_parser = cls.dotenv_parser
+                _dotenv_loaded = True
+            cls._prefetch_loaded_secrets(values.values())
+
+    @staticmethod
+    def _apply_env_values(values: Dict[str, Optional[str]]):
+        """Copy loaded values into os.environ, overriding existing variables."""
+        for key, value in values.items():
+            if value is not None:
+                os.environ[key] = value
+
+    @classmethod
+    def load_env_profile(cls, profile: Optional[str] = None, use_cache: bool = True,
+                         start_path: Optional[Path] = None) -> List[Path]:
+        """Load the layered .env files of a profile into the environment.
+
+        The layers are found in one ancestor walk and merged into a single view,
+        later layers overriding earlier ones. Their raw bindings are cached on disk
+        keyed by the files' mtimes, so later starts with unchanged files skip
+        parsing. Layered files are always read with the native parser, also when
+        ``watch_env_file`` reloads them.
+
+        Args:
+            profile: Profile name, defaults to ``env_profile`` then ``$ENV_PROFILE``
+            use_cache: Whether to use the on-disk bindings cache
+            start_path: Directory the search for the layers starts from, defaults to the cwd
+        Returns:
+            The loaded files, in increasing order of precedence
+        Raises:
+            FileNotFoundError: If none of the layers exist
+        """
+        global _dotenv_loaded, _env_files, _env_parser
 
-        if not _dotenv_loaded:
-            from dotenv.main import load_dotenv
+        from .profiles import load_layers
 
-            dotenv_path = find_env_file()
-            load_dotenv(dotenv_path, override=True)
+        if profile is None:
+            profile = cls.env_profile if cls.env_profile is not None else os.environ.get("ENV_PROFILE")
+        with _dotenv_lock:
+            layered = load_layers(profile, start_path, use_cache=use_cache)
+            cls._apply_env_values(layered.values)
+            _env_files = layered.layers
+            _env_parser = "native"
             _dotenv_loaded = True
+            cls._prefetch_loaded_secrets(layered.values.values())
+        return layered.layers
+
+    @classmethod
+    def _get_secret_cache(cls):
+        """Return the secret cache of the configured provider; called with _dotenv_lock held or for a lookup.
+
+        Raises:
+            ValueError: If no secret provider is configured
+        """
+        global _secret_cache
+
+        if cls.secret_provider is None:
+            raise ValueError("A secret:// reference was found but EnvManager.secret_provider is not set")
+        cache = _secret_cache
+        if cache is None or cache.provider is not cls.secret_provider:
+            from .secrets import SecretCache
+
+            with _dotenv_lock:
+                cache = _secret_cache
+                if cache is None or cache.provider is not cls.secret_provider:
+                    cache = _secret_cache = SecretCache(cls.secret_provider, cls.secret_ttl,
+                                                        cls.secret_refresh_ahead)
+        return cache
+
+    @classmethod
+    def _prefetch_secrets(cls, values):
+        """Fetch every secret:// reference among the loaded values in one request."""
+        if cls.secret_provider is None:
+            return
+        from .secrets import is_secret_reference, secret_path
+
+        paths = [secret_path(value) for value in values if is_secret_reference(value)]
+        if paths:
+            cls._get_secret_cache().prefetch(paths)
+
+    @classmethod
+    def _prefetch_loaded_secrets(cls, values):
+        """Prefetch the references of freshly loaded files, on a best-effort basis.
+
+        A failing batch must not fail the lookup that triggered the load, which may
+        be for an unrelated plain variable; each reference is fetched again when it
+        is read, so only the lookups of unresolvable secrets raise.
+        """
+        from .secrets import SecretError
+
+        try:
+            cls._prefetch_secrets(values)
+        except SecretError:
+            if metrics.enabled:
+                metrics.inc("secret_prefetch_errors_total")
+
+    @classmethod
+    def prefetch_secrets(cls):
+        """Fetch every secret:// reference currently in the environment in one request.
+
+        The references of the loaded .env files are already fetched when they are
+        loaded; call this after configuring a provider later, or to warm the cache.
+
+        Raises:
+            ValueError: If no secret provider is configured or the provider fails
+        """
+        cls._ensure_dotenv_loaded()
+        if cls.secret_provider is None:
+            raise ValueError("EnvManager.secret_provider is not set")
+        cls._prefetch_secrets(list(os.environ.values()))
+
+    @classmethod
+    def _resolve_secret(cls, key: str, reference: str) -> str:
+        """Return the secret a secret:// value refers to.
+
+        Raises:
+            ValueError: If no provider is configured or the secret cannot be fetched
+        """
+        from .secrets import SecretError, secret_path
+
+        try:
+            return cls._get_secret_cache().get(secret_path(reference))
+        except SecretError as e:
+            raise ValueError(f"Environment variable '{key}': {e}") from e
+
+    @classmethod
+    def _resolve_value(cls, key: str, value: str) -> str:
+        """Return ``value``, or the secret it refers to if it is a secret:// reference.
+
+        Raises:
+            ValueError: If the reference cannot be resolved
+        """
+        if value.startswith(SECRET_SCHEME):
+            return cls._resolve_secret(key, value)
+        return value
 
     @classmethod
     def get_required_env_var(cls, key: str) -> str:
@@ -35,8 +252,14 @@ class EnvManager:
         """
         cls._ensure_dotenv_loaded()
         value = os.getenv(key)
+        if metrics.enabled:
+            metrics.inc("env_lookups_total")
+            if not value:
+                metrics.inc("env_lookup_misses_total")
         if not value:
             raise ValueError(f"Environment variable '{key}' not found")
+        if value.startswith(SECRET_SCHEME):
+            return cls._resolve_secret(key, value)
         return value
 
     @classmethod
@@ -51,8 +274,14 @@ class EnvManager:
         """
         cls._ensure_dotenv_loaded()
         value = os.getenv(key)  # Only the key is passed here
+        if metrics.enabled:
+            metrics.inc("env_lookups_total")
+            if value is None:
+                metrics.inc("env_lookup_misses_total")
         if value is None:
             return default  # Default handling happens here, not in os.getenv
+        if value.startswith(SECRET_SCHEME):
+            return cls._resolve_secret(key, value)
         return value
 
     @classmethod
@@ -75,3 +304,186 @@ class EnvManager:
 
         # Convert string to boolean
         return value.lower() == "true"
+
+    @classmethod
+    def _get_parsed_env_var(cls, key: str, default: Any, conversion: str,
+                            converter: Callable[..., Any], *args: Any) -> Any:
+        """Return the converted value of an environment variable, converting each raw string only once.
+
+        The parsed value is cached together with the raw string it came from, so the
+        cache entry is replaced as soon as the variable changes in ``os.environ``.
+
+        Raises:
+            ValueError: If the value cannot be converted
+        """
+        cls._ensure_dotenv_loaded()
+        raw = os.environ.get(key)
+        if metrics.enabled:
+            metrics.inc("env_lookups_total")
+            if not raw:
+                metrics.inc("env_lookup_misses_total")
+        if not raw:
+            return default
+        if raw.startswith(SECRET_SCHEME):
+            raw = cls._resolve_secret(key, raw)
+
+        cache_key = (key, conversion)
+        cached = _parsed_cache.get(cache_key)
+        if cached is not None and cached[0] == raw:
+            if metrics.enabled:
+                metrics.inc("env_parse_cache_hits_total")
+            return cached[1]
+        if metrics.enabled:
+            metrics.inc("env_parse_cache_misses_total")
+
+        try:
+            value = converter(raw, *args)
+        except ValueError as e:
+            raise ValueError(f"Environment variable '{key}' is not a valid {conversion}: {e}") from e
+        _parsed_cache[cache_key] = (raw, value)
+        return value
+
+    @classmethod
+    def get_optional_int_env_var(cls, key: str, default: Optional[int] = None) -> Optional[int]:
+        """Get an integer environment variable.
+
+        Args:
+            key: The name of the environment variable
+            default: Value to return if the variable is not set or empty
+        Returns:
+            The integer value of the environment variable or the default value
+        Raises:
+            ValueError: If the value is not an integer
+        """
+        return cls._get_parsed_env_var(key, default, "int", converters.to_int)
+
+    @classmethod
+    def get_optional_float_env_var(cls, key: str, default: Optional[float] = None) -> Optional[float]:
+        """Get a float environment variable.
+
+        Args:
+            key: The name of the environment variable
+            default: Value to return if the variable is not set or empty
+        Returns:
+            The float value of the environment variable or the default value
+        Raises:
+            ValueError: If the value is not a number
+        """
+        return cls._get_parsed_env_var(key, default, "float", converters.to_float)
+
+    @classmethod
+    def get_optional_list_env_var(cls, key: str, default: Optional[List[str]] = None,
+                                  separator: str = ",") -> Optional[List[str]]:
+        """Get a list from a separated environment variable, e.g. ``"a, b,c"``.
+
+        The returned list is shared between calls and must not be modified.
+
+        Args:
+            key: The name of the environment variable
+            default: Value to return if the variable is not set or empty
+            separator: The item separator
+        Returns:
+            The stripped, non-empty items or the default value
+        """
+        return cls._get_parsed_env_var(key, default, f"list[{separator}]", converters.to_list, separator)
+
+    @classmethod
+    def get_optional_json_env_var(cls, key: str, default: Any = None) -> Any:
+        """Get a JSON encoded environment variable.
+
+        The returned object is shared between calls and must not be modified.
+
+        Args:
+            key: The name of the environment variable
+            default: Value to return if the variable is not set or empty
+        Returns:
+            The decoded value or the default value
+        Raises:
+            ValueError: If the value is not valid JSON
+        """
+        return cls._get_parsed_env_var(key, default, "JSON value", converters.to_json)
+
+    @classmethod
+    def get_optional_duration_env_var(cls, key: str, default: Optional[float] = None) -> Optional[float]:
+        """Get a duration such as ``"30s"``, ``"250ms"`` or ``"1h30m"`` in seconds.
+
+        Args:
+            key: The name of the environment variable
+            default: Value in seconds to return if the variable is not set or empty
+        Returns:
+            The duration in seconds or the default value
+        Raises:
+            ValueError: If the value is not a valid duration
+        """
+        return cls._get_parsed_env_var(key, default, "duration", converters.to_duration)
+
+    @classmethod
+    def load_settings(cls, schema: Any) -> Any:
+        """Load, convert and validate a whole settings schema in one pass.
+
+        ``secret://`` references are resolved like in the getters.
+
+        Args:
+            schema: A class (or mapping) whose attributes are ``Setting`` declarations
+        Returns:
+            An immutable snapshot with one attribute per declared setting
+        Raises:
+            SettingsError: Listing every missing or invalid variable at once
+        """
+        cls._ensure_dotenv_loaded()
+        return settings.load_settings(schema, os.environ, cls._resolve_value)
+
+    @classmethod
+    def watch_env_file(cls, interval: float = 1.0, callback: Optional[Callable[[Any], None]] = None):
+        """Start hot-reloading the .env file on a background thread.
+
+        When layered files were loaded, every layer is watched. The file is polled
+        by mtime and size; on change it is re-parsed, the diff is applied to
+        ``os.environ`` and the callbacks are called with an ``EnvChange``. Calling
+        this again only registers the extra callback.
+
+        Args:
+            interval: Seconds between two polls
+            callback: Optional callable receiving each ``EnvChange``
+        Returns:
+            The running ``EnvFileWatcher``
+        """
+        global _watcher
+
+        cls._ensure_dotenv_loaded()
+        with _dotenv_lock:
+            if _watcher is None:
+                from .watcher import EnvFileWatcher
+
+                parser = _env_parser
+                _watcher = EnvFileWatcher(_env_files or [find_env_file()],
+                                          lambda path: cls._read_env_file(path, parser), interval,
+                                          lock=_dotenv_lock)
+            if callback is not None:
+                _watcher.add_callback(callback)
+            _watcher.start()
+            return _watcher
+
+    @classmethod
+    def stop_watching_env_file(cls):
+        """Stop the .env watcher started by ``watch_env_file``, if any."""
+        global _watcher
+
+        with _dotenv_lock:
+            watcher, _watcher = _watcher, None
+        if watcher is not None:
+            watcher.stop()
+
+
+def _reinit_after_fork():
+    """Give a forked child fresh locks and drop the parent's watcher, whose thread did not survive the fork."""
+    global _dotenv_lock, _watcher
+
+    _dotenv_lock = threading.RLock()
+    _watcher = None
+    if _secret_cache is not None:
+        _secret_cache.reinit_after_fork()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reinit_after_fork)
@@ -0,0 +1,153 @@
+"""Layered .env resolution with an on-disk cache of the merged bindings.
+
+The layers of a profile are, in increasing order of precedence::
+
+    .env, .env.local, .env.<profile>, .env.<profile>.local
+
+They are discovered in one ancestor walk and must live in the same directory as the
+nearest one found. The raw bindings of all layers are cached on disk keyed by the
+layers' paths, mtimes and sizes, so a later start with unchanged files skips parsing
+and only resolves ``${VAR}`` references against the current environment.
+
+Inside a zipapp the layers are looked up in the archive, like ``find_env_file``
+does, and the archive's mtime and size stand for those of its layers.
+"""
+
+import hashlib
+import io
+import json
+import os
+from pathlib import Path
+from typing import Dict, List, Mapping, NamedTuple, Optional, Tuple
+
+from h7_file_finder import find_markers, running_archive
+
+from .dotenv_parser import Binding, iter_bindings, resolve_bindings
+
+_CACHE_FORMAT_VERSION = 1
+
+
+class LayeredEnv(NamedTuple):
+    """The discovered layers and their merged, interpolated values."""
+
+    layers: List[Path]
+    values: Dict[str, Optional[str]]
+    from_cache: bool
+
+
+def layer_names(profile: Optional[str] = None) -> List[str]:
+    """Return the file names of the layers of ``profile``, in increasing order of precedence."""
+    names = [".env", ".env.local"]
+    if profile:
+        names += [f".env.{profile}", f".env.{profile}.local"]
+    return names
+
+
+def discover_layers(profile: Optional[str] = None, start_path: Optional[Path] = None) -> List[Path]:
+    """Find the layers of ``profile`` with a single ancestor walk.
+
+    Raises:
+        FileNotFoundError: If no layer exists
+    """
+    names = layer_names(profile)
+    found = find_markers(names, start_path)
+    if not found:
+        raise FileNotFoundError(f"None of {names} found starting from {start_path or Path.cwd()}")
+    base_dir = max((path.parent for path in found.values()), key=lambda directory: len(directory.parts))
+    return [found[name] for name in names if name in found and found[name].parent == base_dir]
+
+
+def default_cache_dir() -> Path:
+    """Return $H7_ENV_CACHE_DIR, or the h7-env-manager directory of the user cache."""
+    if os.environ.get("H7_ENV_CACHE_DIR"):
+        return Path(os.environ["H7_ENV_CACHE_DIR"])
+    cache_home = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return Path(cache_home) / "h7-env-manager"
+
+
+def _layer_signatures(layers: List[Path]) -> List[Tuple[str, int, int]]:
+    archive = running_archive()
+    signatures = []
+    for path in layers:
+        st = os.stat(archive.signature_path(path) if archive is not None else path)
+        signatures.append((str(path), st.st_mtime_ns, st.st_size))
+    return signatures
+
+
+def _cache_file(cache_dir: Path, layers: List[Path]) -> Path:
+    digest = hashlib.sha1("\0".join(str(path) for path in layers).encode("utf-8")).hexdigest()
+    return cache_dir / f"{digest}.json"
+
+
+def _read_cache(cache_file: Path, signatures: List[Tuple[str, int, int]]) -> Optional[List[Binding]]:
+    try:
+        with open(cache_file, encoding="utf-8") as stream:
+            payload = json.load(stream)
+        if payload["version"] != _CACHE_FORMAT_VERSION:
+            return None
+        if [tuple(signature) for signature in payload["layers"]] != signatures:
+            return None
+        return [Binding(key, value) for key, value in payload["bindings"]]
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+
+def _write_cache(cache_file: Path, signatures: List[Tuple[str, int, int]], bindings: List[Binding]):
+    payload = {"version": _CACHE_FORMAT_VERSION, "layers": signatures, "bindings": bindings}
+    temp_file = cache_file.with_name(f"{cache_file.name}.{os.getpid()}.tmp")
+    try:
+        # The bindings may hold secrets: only the user can list or read them
+        cache_file.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+        fd = os.open(temp_file, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with open(fd, "w", encoding="utf-8") as stream:
+            json.dump(payload, stream, separators=(",", ":"))
+        os.replace(temp_file, cache_file)
+    except OSError:
+        # A read-only or full cache directory only costs us the next start's parse
+        try:
+            os.unlink(temp_file)
+        except OSError:
+            pass
+
+
+def load_layers(profile: Optional[str] = None,
+                start_path: Optional[Path] = None,
+                cache_dir: Optional[Path] = None,
+                use_cache: bool = True,
+                environ: Optional[Mapping[str, str]] = None) -> LayeredEnv:
+    """Discover, parse (or load from cache) and merge the layers of ``profile``.
+
+    Args:
+        profile: Profile name, e.g. "production"; None loads only .env and .env.local
+        start_path: Directory the search starts from, defaults to the cwd
+        cache_dir: Directory of the bindings cache, see ``default_cache_dir``
+        use_cache: Whether to read and write the bindings cache
+        environ: Environment used to resolve references, defaults to ``os.environ``
+    Returns:
+        The layers and their merged values; later layers win
+    Raises:
+        FileNotFoundError: If no layer exists
+    """
+    layers = discover_layers(profile, start_path)
+    signatures = _layer_signatures(layers)
+
+    bindings = None
+    cache_file = _cache_file(cache_dir or default_cache_dir(), layers) if use_cache else None
+    if cache_file is not None:
+        bindings = _read_cache(cache_file, signatures)
+    from_cache = bindings is not None
+
+    if bindings is None:
+        archive = running_archive()
+        bindings = []
+        for path in layers:
+            if archive is not None and archive.contains(path):
+                stream = io.StringIO(archive.read_bytes(path).decode("utf-8"))
+            else:
+                stream = open(path, encoding="utf-8")
+            with stream:
+                bindings.extend(iter_bindings(stream))
+        if cache_file is not None:
+            _write_cache(cache_file, signatures, bindings)
+
+    return LayeredEnv(layers, resolve_bindings(bindings, environ), from_cache)
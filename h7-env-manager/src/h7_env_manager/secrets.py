@@ -0,0 +1,334 @@
+"""Resolution of ``secret://<path>`` references found in environment variables.
+
+A ``.env`` file may hold ``DB_PASSWORD=secret://db/password`` instead of the value
+itself. The EnvManager getters resolve such references through the configured
+:class:`SecretProvider` and return the secret. Resolved values are kept in a
+:class:`SecretCache` for a TTL; once an entry is older than ``refresh_ahead`` of
+its TTL, reading it returns the cached value and refreshes it on a background
+thread, so callers only wait for a secret the first time it is read, or when it
+was not read for a whole TTL. Every reference of the loaded ``.env`` files is
+fetched in one batch when they are loaded.
+
+Providers:
+    FileSecretProvider: one file per secret under a directory, e.g. a mounted volume
+    HttpSecretProvider: a JSON endpoint over pooled keep-alive HTTP connections,
+                        e.g. a local secret agent or a test stand-in
+"""
+
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+from urllib.parse import urlsplit
+
+from h7_file_finder.instrumentation import metrics
+
+SECRET_SCHEME = "secret://"
+
+
+class SecretError(ValueError):
+    """Raised when a secret reference cannot be resolved."""
+
+
+def is_secret_reference(value: Optional[str]) -> bool:
+    """Return whether ``value`` is a ``secret://<path>`` reference."""
+    return value is not None and value.startswith(SECRET_SCHEME)
+
+
+def secret_path(reference: str) -> str:
+    """Return the path of a ``secret://<path>`` reference.
+
+    Raises:
+        SecretError: If the reference has no path
+    """
+    path = reference[len(SECRET_SCHEME):]
+    if not path:
+        raise SecretError(f"Secret reference '{reference}' has no path")
+    return path
+
+
+class SecretProvider:
+    """Base class of the secret backends.
+
+    Subclasses implement ``fetch_many``; ``fetch`` and ``close`` have defaults.
+    """
+
+    def fetch_many(self, paths: Sequence[str]) -> Dict[str, str]:
+        """Return the values of several secrets in one request.
+
+        Raises:
+            SecretError: If a secret does not exist or the backend fails
+        """
+        raise NotImplementedError
+
+    def fetch(self, path: str) -> str:
+        """Return the value of one secret.
+
+        Raises:
+            SecretError: If the secret does not exist or the backend fails
+        """
+        return self.fetch_many([path])[path]
+
+    def close(self):
+        """Release the resources held by the provider, e.g. its connections."""
+
+    def reinit_after_fork(self):
+        """Drop state that a forked child must not share with its parent."""
+
+
+class FileSecretProvider(SecretProvider):
+    """Secrets stored as files under ``directory``, e.g. ``/run/secrets/db/password``.
+
+    A single trailing newline is stripped from each file.
+
+    Args:
+        directory: Directory holding the secret files
+    """
+
+    def __init__(self, directory: Union[str, "os.PathLike[str]"]):
+        """Serve the secrets stored under ``directory``."""
+        self.directory = Path(directory).resolve()
+
+    def _secret_file(self, path: str) -> Path:
+        secret_file = (self.directory / path).resolve()
+        if self.directory not in secret_file.parents:
+            raise SecretError(f"Secret path '{path}' is outside {self.directory}")
+        return secret_file
+
+    def fetch_many(self, paths: Sequence[str]) -> Dict[str, str]:
+        """Read one file per path, below the directory only."""
+        values = {}
+        for path in paths:
+            try:
+                value = self._secret_file(path).read_text(encoding="utf-8")
+            except OSError as e:
+                raise SecretError(f"Secret '{path}' cannot be read: {e}") from e
+            values[path] = value[:-1] if value.endswith("\n") else value
+        return values
+
+
+class HttpSecretProvider(SecretProvider):
+    """Secrets served by a JSON endpoint, with a pool of keep-alive connections.
+
+    Every fetch is one ``POST`` of ``{"paths": [...]}`` to ``url``, answered with a
+    JSON object mapping each path to its value. Idle connections are kept for the
+    next request, up to ``pool_size`` of them; a connection closed by the server is
+    replaced once.
+
+    Args:
+        url: Endpoint URL, ``http://`` or ``https://``
+        timeout: Seconds to wait for the server
+        headers: Extra request headers, e.g. an authorization token
+        pool_size: Idle connections kept open
+    """
+
+    def __init__(self, url: str, timeout: float = 5.0, headers: Optional[Dict[str, str]] = None,
+                 pool_size: int = 4):
+        """
+        Create the provider; connections are opened on the first fetch.
+
+        Raises:
+            ValueError: If the URL is not an http(s) URL
+        """
+        parts = urlsplit(url)
+        if parts.scheme not in ("http", "https") or not parts.hostname:
+            raise ValueError(f"Secret provider URL '{url}' is not an http(s) URL")
+        self.url = url
+        self.timeout = timeout
+        self.pool_size = pool_size
+        self.headers = {"Content-Type": "application/json", "Accept": "application/json", **(headers or {})}
+        self._scheme = parts.scheme
+        self._host = parts.hostname
+        self._port = parts.port
+        self._request_path = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+        self._idle: List = []
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        import http.client
+
+        connection_class = http.client.HTTPSConnection if self._scheme == "https" else http.client.HTTPConnection
+        return connection_class(self._host, self._port, timeout=self.timeout)
+
+    def _acquire(self) -> Tuple[object, bool]:
+        """Return a connection and whether it was reused from the pool."""
+        with self._lock:
+            if self._idle:
+                return self._idle.pop(), True
+        return self._connect(), False
+
+    def _release(self, connection):
+        with self._lock:
+            if len(self._idle) < self.pool_size:
+                self._idle.append(connection)
+                return
+        connection.close()
+
+    def _post(self, body: bytes) -> Tuple[int, bytes]:
+        import http.client
+
+        connection, reused = self._acquire()
+        try:
+            try:
+                connection.request("POST", self._request_path, body, self.headers)
+                response = connection.getresponse()
+            except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+                if not reused:
+                    raise
+                # The server closed the idle connection; retry once on a new one
+                connection.close()
+                connection = self._connect()
+                connection.request("POST", self._request_path, body, self.headers)
+                response = connection.getresponse()
+            status, data = response.status, response.read()
+        except BaseException:
+            connection.close()
+            raise
+        if response.will_close:
+            connection.close()
+        else:
+            self._release(connection)
+        return status, data
+
+    def fetch_many(self, paths: Sequence[str]) -> Dict[str, str]:
+        """Fetch the paths in one POST request."""
+        import http.client
+
+        paths = list(paths)
+        try:
+            status, data = self._post(json.dumps({"paths": paths}).encode("utf-8"))
+        except (OSError, http.client.HTTPException) as e:
+            raise SecretError(f"Secret provider {self.url} is unreachable: {e}") from e
+        if status != 200:
+            raise SecretError(f"Secret provider {self.url} answered HTTP {status}")
+        try:
+            values = json.loads(data)
+        except ValueError as e:
+            raise SecretError(f"Secret provider {self.url} sent invalid JSON: {e}") from e
+        if not isinstance(values, dict):
+            raise SecretError(f"Secret provider {self.url} did not send a JSON object")
+        missing = [path for path in paths if not isinstance(values.get(path), str)]
+        if missing:
+            raise SecretError(f"Secret provider {self.url} has no secret {', '.join(missing)}")
+        return {path: values[path] for path in paths}
+
+    def close(self):
+        """Close the idle connections."""
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for connection in idle:
+            connection.close()
+
+    def reinit_after_fork(self):
+        """Forget the connections, whose sockets are shared with the parent; the child opens its own."""
+        self._lock = threading.Lock()
+        self._idle = []
+
+
+class SecretCache:
+    """TTL cache of resolved secrets with refresh-ahead.
+
+    Args:
+        provider: Backend the secrets are fetched from
+        ttl: Seconds a value is served for
+        refresh_ahead: Fraction of the TTL after which a read triggers a background
+                       refresh; the cached value is returned meanwhile
+    """
+
+    def __init__(self, provider: SecretProvider, ttl: float = 300.0, refresh_ahead: float = 0.8):
+        """
+        Create an empty cache.
+
+        Raises:
+            ValueError: If the TTL is not positive or refresh_ahead is not in (0, 1]
+        """
+        if ttl <= 0 or not 0 < refresh_ahead <= 1:
+            raise ValueError("The secret TTL must be positive and refresh_ahead in (0, 1]")
+        self.provider = provider
+        self.ttl = ttl
+        self.refresh_ahead = refresh_ahead
+        # path -> (value, monotonic time after which it is refreshed, time after which it expired)
+        self._entries: Dict[str, Tuple[str, float, float]] = {}
+        self._refreshing: set = set()
+        self._lock = threading.Lock()
+
+    def _store(self, values: Dict[str, str], fetched_at: float):
+        refresh_at = fetched_at + self.ttl * self.refresh_ahead
+        expires_at = fetched_at + self.ttl
+        with self._lock:
+            for path, value in values.items():
+                self._entries[path] = (value, refresh_at, expires_at)
+
+    def prefetch(self, paths: Sequence[str]):
+        """Fetch the paths not cached yet, or about to expire, in one batch.
+
+        Raises:
+            SecretError: If the provider fails
+        """
+        now = time.monotonic()
+        with self._lock:
+            due = sorted({path for path in paths if path not in self._entries or self._entries[path][1] <= now})
+        if not due:
+            return
+        if metrics.enabled:
+            metrics.inc("secret_fetches_total", labels=(("mode", "batch"),))
+        self._store(self.provider.fetch_many(due), now)
+
+    def get(self, path: str) -> str:
+        """Return the value of a secret, fetching it only if it is not cached or expired.
+
+        Raises:
+            SecretError: If the secret must be fetched and the provider fails
+        """
+        now = time.monotonic()
+        entry = self._entries.get(path)
+        if entry is not None and now < entry[2]:
+            if now >= entry[1]:
+                self._schedule_refresh(path)
+            if metrics.enabled:
+                metrics.inc("secret_cache_hits_total")
+            return entry[0]
+        if metrics.enabled:
+            metrics.inc("secret_cache_misses_total")
+            metrics.inc("secret_fetches_total", labels=(("mode", "single"),))
+        value = self.provider.fetch(path)
+        self._store({path: value}, now)
+        return value
+
+    def _schedule_refresh(self, path: str):
+        with self._lock:
+            if path in self._refreshing:
+                return
+            # Refresh every entry due by now in the same request
+            now = time.monotonic()
+            due = [cached for cached, entry in self._entries.items()
+                   if entry[1] <= now and cached not in self._refreshing]
+            self._refreshing.update(due)
+        threading.Thread(target=self._refresh, args=(due,), name="h7-secret-refresh", daemon=True).start()
+
+    def _refresh(self, paths: List[str]):
+        fetched_at = time.monotonic()
+        try:
+            if metrics.enabled:
+                metrics.inc("secret_fetches_total", labels=(("mode", "refresh"),))
+            self._store(self.provider.fetch_many(paths), fetched_at)
+        except Exception:
+            # Served until it expires; the next read after that fetches it synchronously
+            if metrics.enabled:
+                metrics.inc("secret_refresh_errors_total")
+        finally:
+            with self._lock:
+                self._refreshing.difference_update(paths)
+
+    def clear(self):
+        """Forget every cached value."""
+        with self._lock:
+            self._entries.clear()
+
+    def reinit_after_fork(self):
+        """Replace the lock and forget refreshes whose threads did not survive the fork."""
+        self._lock = threading.Lock()
+        self._refreshing = set()
+        self.provider.reinit_after_fork()
@@ -0,0 +1,173 @@
+"""Declarative settings schemas loaded from the environment in a single pass.
+
+A schema is a class (or a mapping) whose attributes are :class:`Setting` declarations.
+Loading it converts and validates every variable at once, reports all problems in a
+single :class:`SettingsError` and returns an immutable ``__slots__`` snapshot whose
+attribute reads are plain slot lookups.
+"""
+
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple, Type, Union
+
+from . import converters
+
+_MISSING = object()
+
+_CONVERTERS: Dict[Any, Callable[[str], Any]] = {
+    str: str,
+    int: converters.to_int,
+    float: converters.to_float,
+    bool: converters.to_bool,
+    list: converters.to_list,
+    "json": converters.to_json,
+    "duration": converters.to_duration,
+}
+
+
+class SettingsError(ValueError):
+    """Raised when one or more settings are missing or invalid.
+
+    Attributes:
+        errors: One message per offending environment variable
+    """
+
+    def __init__(self, errors: List[str]):
+        """Create the error listing every message."""
+        self.errors = errors
+        super().__init__("Invalid settings:\n  " + "\n  ".join(errors))
+
+
+class Setting:
+    """Declaration of one environment variable in a settings schema.
+
+    Args:
+        key: Name of the environment variable, defaults to the upper-cased attribute name
+        type: ``str``, ``int``, ``float``, ``bool``, ``list``, ``"json"``, ``"duration"``
+              or a callable converting the raw string
+        default: Value used when the variable is unset or empty; without a default
+                 the setting is required. String defaults are converted like raw values.
+    """
+
+    __slots__ = ("converter", "default", "key", "type")
+
+    def __init__(self, key: Optional[str] = None, type: Union[type, str, Callable[[str], Any]] = str,
+                 default: Any = _MISSING):
+        """
+        Create the declaration.
+
+        Raises:
+            ValueError: If the type is neither supported nor callable
+        """
+        if type in _CONVERTERS:
+            converter = _CONVERTERS[type]
+        elif callable(type):
+            converter = type
+        else:
+            raise ValueError(f"Unsupported setting type {type!r}")
+        self.key = key
+        self.type = type
+        self.converter = converter
+        self.default = default
+
+    @property
+    def required(self) -> bool:
+        """Whether the setting has no default."""
+        return self.default is _MISSING
+
+    def __repr__(self) -> str:
+        """Show the key, type and default of the declaration."""
+        default = "" if self.required else f", default={self.default!r}"
+        return f"Setting({self.key!r}, {getattr(self.type, '__name__', self.type)!r}{default})"
+
+
+def _frozen_setattr(self, name, value):
+    raise AttributeError(f"{type(self).__name__} is immutable")
+
+
+def _frozen_delattr(self, name):
+    raise AttributeError(f"{type(self).__name__} is immutable")
+
+
+def _settings_repr(self) -> str:
+    fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+    return f"{type(self).__name__}({fields})"
+
+
+def _settings_asdict(self) -> Dict[str, Any]:
+    return {name: getattr(self, name) for name in self.__slots__}
+
+
+def _settings_eq(self, other) -> bool:
+    if type(other) is not type(self):
+        return NotImplemented
+    return all(getattr(self, name) == getattr(other, name) for name in self.__slots__)
+
+
+def collect_settings(schema: Union[type, Mapping[str, Setting]]) -> Tuple[str, Dict[str, Setting]]:
+    """Return the snapshot class name and the ``{attribute: Setting}`` declarations of ``schema``."""
+    if isinstance(schema, Mapping):
+        return "Settings", dict(schema)
+    fields = {}
+    for klass in reversed(schema.__mro__):
+        fields.update({name: value for name, value in vars(klass).items() if isinstance(value, Setting)})
+    return schema.__name__, fields
+
+
+def build_snapshot(name: str, values: Dict[str, Any]) -> Any:
+    """Create an immutable ``__slots__`` object holding ``values``."""
+    snapshot_class: Type = type(name, (), {
+        "__slots__": tuple(values),
+        "__setattr__": _frozen_setattr,
+        "__delattr__": _frozen_delattr,
+        "__repr__": _settings_repr,
+        "__eq__": _settings_eq,
+        "__hash__": None,
+        "_asdict": _settings_asdict,
+    })
+    snapshot = snapshot_class.__new__(snapshot_class)
+    for attribute, value in values.items():
+        object.__setattr__(snapshot, attribute, value)
+    return snapshot
+
+
+def load_settings(schema: Union[type, Mapping[str, Setting]], environ: Mapping[str, str],
+                  resolve: Optional[Callable[[str, str], str]] = None) -> Any:
+    """Convert and validate every setting of ``schema`` against ``environ``.
+
+    Args:
+        schema: A class (or mapping) whose attributes are ``Setting`` declarations
+        environ: Mapping the raw values are read from
+        resolve: Optional ``resolve(key, raw)`` applied to each raw value before its
+                 conversion, e.g. to resolve ``secret://`` references; its ValueError
+                 is reported like an invalid value
+    Raises:
+        SettingsError: Listing every missing or invalid variable
+    """
+    name, fields = collect_settings(schema)
+    values: Dict[str, Any] = {}
+    errors: List[str] = []
+
+    for attribute, setting in fields.items():
+        key = setting.key or attribute.upper()
+        raw = environ.get(key)
+        if not raw:
+            if setting.required:
+                errors.append(f"Environment variable '{key}' not found")
+                continue
+            raw = setting.default
+            if not isinstance(raw, str) or setting.converter is str:
+                values[attribute] = raw
+                continue
+        elif resolve is not None:
+            try:
+                raw = resolve(key, raw)
+            except ValueError as e:
+                errors.append(str(e))
+                continue
+        try:
+            values[attribute] = setting.converter(raw)
+        except ValueError as e:
+            errors.append(f"Environment variable '{key}' is invalid: {e}")
+
+    if errors:
+        raise SettingsError(errors)
+    return build_snapshot(name, values)
@@ -0,0 +1,193 @@
+"""Polling watcher that hot-reloads .env files into ``os.environ``.
+
+The watcher stats its files on a background thread and only re-parses a file whose
+mtime or size changed. The new values are diffed against the previous ones, the
+whole diff is applied to ``os.environ`` while holding the watcher's lock, and the
+registered callbacks are then called with an :class:`EnvChange`.
+
+The lock only serialises writers: EnvManager passes the lock of its own loading, so
+a reload never interleaves with another reload or a .env load. Code reading
+``os.environ`` during a reload may still see some keys updated and others not yet.
+"""
+
+import os
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+_FileSignature = Optional[Tuple[int, int]]
+
+# Serialises updates of os.environ made by watchers created without a lock
+_environ_lock = threading.Lock()
+
+
+class EnvChange(NamedTuple):
+    """Difference between two versions of the watched .env files.
+
+    Attributes:
+        paths: The files that changed since the previous poll, in increasing order of precedence
+    """
+
+    paths: Tuple[Path, ...]
+    added: Dict[str, str]
+    changed: Dict[str, Tuple[str, str]]
+    removed: Dict[str, str]
+
+    def __bool__(self) -> bool:
+        """Whether any variable was added, changed or removed."""
+        return bool(self.added or self.changed or self.removed)
+
+
+def _file_signature(path: Path) -> _FileSignature:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+def diff_values(paths: Sequence[Path], old: Dict[str, str], new: Dict[str, str]) -> EnvChange:
+    """Return the change from ``old`` to ``new``, caused by the files in ``paths``."""
+    return EnvChange(
+        paths=tuple(paths),
+        added={key: value for key, value in new.items() if key not in old},
+        changed={key: (old[key], value) for key, value in new.items() if key in old and old[key] != value},
+        removed={key: value for key, value in old.items() if key not in new},
+    )
+
+
+class EnvFileWatcher:
+    """Watch one or more .env files, later files overriding earlier ones.
+
+    Args:
+        paths: The files to watch, in increasing order of precedence
+        read_file: Parser returning the values defined in a file
+        interval: Seconds between polls of the background thread
+        lock: Lock held while a change is applied to ``os.environ``, defaults to
+              one shared by the watchers created without a lock
+    """
+
+    def __init__(self, paths: Sequence[Path], read_file: Callable[[Path], Dict[str, Optional[str]]],
+                 interval: float = 1.0, lock: Optional[Any] = None):
+        """Read the files once; polling starts with ``start`` or ``check``."""
+        self.paths = [Path(path) for path in paths]
+        self.interval = interval
+        self._read_file = read_file
+        self._lock = lock
+        self._callbacks: List[Callable[[EnvChange], None]] = []
+        self._signatures: Dict[Path, _FileSignature] = {}
+        self._file_values: Dict[Path, Dict[str, str]] = {}
+        for path in self.paths:
+            self._signatures[path] = _file_signature(path)
+            self._file_values[path] = self._read_values(path)
+        self._values = self._merge()
+        self._check_lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def running(self) -> bool:
+        """Whether the background thread is polling."""
+        return self._thread is not None and self._thread.is_alive()
+
+    def add_callback(self, callback: Callable[[EnvChange], None]):
+        """Call ``callback`` with every applied change, once even if added twice."""
+        if callback not in self._callbacks:
+            self._callbacks.append(callback)
+
+    def remove_callback(self, callback: Callable[[EnvChange], None]):
+        """Stop calling ``callback``; unknown callbacks are ignored."""
+        if callback in self._callbacks:
+            self._callbacks.remove(callback)
+
+    def start(self):
+        """Poll the files every ``interval`` seconds on a daemon thread."""
+        if self.running:
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="h7-env-watcher", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None):
+        """Stop the background thread, waiting up to ``timeout`` seconds for it."""
+        self._stop_event.set()
+        thread, self._thread = self._thread, None
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout)
+
+    def check(self) -> Optional[EnvChange]:
+        """Poll the files once and apply any change.
+
+        Returns:
+            The applied change, or None if nothing changed
+        """
+        with self._check_lock:
+            changed_paths = []
+            for path in self.paths:
+                signature = _file_signature(path)
+                if signature != self._signatures[path]:
+                    # Keep the old values if the file is unreadable mid-write; retry on next poll
+                    try:
+                        self._file_values[path] = self._read_values(path)
+                    except (OSError, UnicodeDecodeError, ValueError):
+                        continue
+                    self._signatures[path] = signature
+                    changed_paths.append(path)
+            if not changed_paths:
+                return None
+
+            values = self._merge()
+            change = diff_values(changed_paths, self._values, values)
+            self._values = values
+            if change:
+                self._apply(change)
+
+        if change:
+            self._notify(change)
+            return change
+        return None
+
+    def _read_values(self, path: Path) -> Dict[str, str]:
+        if not path.exists():
+            return {}
+        return {key: value for key, value in self._read_file(path).items() if value is not None}
+
+    def _merge(self) -> Dict[str, str]:
+        values: Dict[str, str] = {}
+        for path in self.paths:
+            values.update(self._file_values[path])
+        return values
+
+    def _apply(self, change: EnvChange):
+        with self._lock if self._lock is not None else _environ_lock:
+            for key, value in change.added.items():
+                os.environ[key] = value
+            for key, (_, value) in change.changed.items():
+                os.environ[key] = value
+            for key, value in change.removed.items():
+                # Leave variables alone that were since set by someone else
+                if os.environ.get(key) == value:
+                    del os.environ[key]
+
+    def _notify(self, change: EnvChange):
+        for callback in list(self._callbacks):
+            try:
+                callback(change)
+            except Exception:
+                import logging
+
+                logging.getLogger(__name__).exception("Env change callback %r failed", callback)
+
+    def _run(self):
+        while not self._stop_event.wait(self.interval):
+            self.check()
+
+
+def _reinit_after_fork():
+    global _environ_lock
+
+    _environ_lock = threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reinit_after_fork)
@@ -0,0 +1,33 @@
+"""Helpers of the import tests, run in fresh interpreters seeing this interpreter's sys.path."""
+
+import json
+import os
+import subprocess
+import sys
+
+
+def _run(args):
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(path for path in sys.path if path))
+    return subprocess.run([sys.executable, *args], capture_output=True, text=True, env=env, check=True)
+
+
+def loaded_modules(statement):
+    """Return the names in ``sys.modules`` after running ``statement``."""
+    code = f"{statement}\nimport sys\nloaded = sorted(sys.modules)\nimport json\nprint(json.dumps(loaded))"
+    return set(json.loads(_run(["-c", code]).stdout))
+
+
+def import_time(statement, module, runs=5):
+    """
+    Return the smallest cumulative ``-X importtime`` of ``module``, in microseconds,
+    over ``runs`` interpreters running ``statement``.
+    """
+    samples = []
+    for _ in range(runs):
+        for line in _run(["-X", "importtime", "-c", statement]).stderr.splitlines():
+            fields = line.split("|")
+            if len(fields) == 3 and fields[2].strip() == module:
+                samples.append(int(fields[1]))
+    if len(samples) != runs:
+        raise ValueError(f"'{statement}' does not import {module}")
+    return min(samples)
@@ -0,0 +1,126 @@
+import importlib.util
+import io
+import os
+import sys
+import tempfile
+import unittest
+import zipfile
+from pathlib import Path
+from unittest.mock import patch
+
+# Add the src directory to the path so we can import the package
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from h7_env_manager import EnvManager
+from h7_env_manager.dotenv_parser import iter_bindings, parse_dotenv, resolve_bindings
+
+SAMPLE = """\
+# Comment line
+export EXPORTED=yes
+PLAIN=value # trailing comment
+HASH=value#not-a-comment
+EMPTY=
+BARE
+SINGLE='literal ${PLAIN} \\n'
+DOUBLE="line1\\nline2 \\"quoted\\""
+MULTI="first
+second"
+REF=${PLAIN}/sub
+DEFAULTED=${MISSING:-fallback}
+EMPTY_DEFAULTED=${EMPTY:-fallback}
+  SPACED = spaced value
+"""
+
+
+class TestDotenvParser(unittest.TestCase):
+
+    def parse(self, text, environ=None):
+        return resolve_bindings(iter_bindings(io.StringIO(text)), environ=environ or {})
+
+    def test_parses_supported_syntax(self):
+        """Test quotes, export prefixes, comments and bare keys"""
+        values = self.parse(SAMPLE)
+        self.assertEqual(values["EXPORTED"], "yes")
+        self.assertEqual(values["PLAIN"], "value")
+        self.assertEqual(values["HASH"], "value#not-a-comment")
+        self.assertEqual(values["EMPTY"], "")
+        self.assertIsNone(values["BARE"])
+        self.assertEqual(values["SINGLE"], "literal value \\n")
+        self.assertEqual(values["DOUBLE"], 'line1\nline2 "quoted"')
+        self.assertEqual(values["MULTI"], "first\nsecond")
+        self.assertEqual(values["SPACED"], "spaced value")
+
+    def test_interpolation(self):
+        """Test that references resolve against the file first, then the environment"""
+        values = self.parse(SAMPLE)
+        self.assertEqual(values["REF"], "value/sub")
+        self.assertEqual(values["DEFAULTED"], "fallback")
+        # As in python-dotenv, the default only replaces undefined variables
+        self.assertEqual(values["EMPTY_DEFAULTED"], "")
+        self.assertEqual(self.parse("A=${BARE:-x}", environ={"BARE": ""})["A"], "")
+
+        values = self.parse("A=${HOME_DIR}\nHOME_DIR=late\n", environ={"HOME_DIR": "/home/env"})
+        self.assertEqual(values["A"], "/home/env")
+
+    def test_unterminated_quote_is_skipped(self):
+        """Test that a value whose quote is never closed does not produce a binding"""
+        values = self.parse('GOOD=1\nBAD="never closed\n')
+        self.assertEqual(values, {"GOOD": "1"})
+
+    def test_unterminated_quote_skips_only_its_statement(self):
+        """Test that the bindings after an unclosed quote are still parsed"""
+        text = 'FIRST=1\nBAD="never closed\nAFTER=2\nSINGLE=\'ok\'\n' + "".join(
+            f"KEY_{index}=value\n" for index in range(5000))
+        values = self.parse(text)
+        self.assertNotIn("BAD", values)
+        self.assertEqual(values["FIRST"], "1")
+        self.assertEqual(values["AFTER"], "2")
+        self.assertEqual(values["SINGLE"], "ok")
+        self.assertEqual(values["KEY_4999"], "value")
+        self.assertEqual(len(values), 5003)
+
+    @unittest.skipUnless(importlib.util.find_spec("dotenv"), "python-dotenv not installed")
+    def test_matches_python_dotenv(self):
+        """Test that the native parser agrees with python-dotenv on the supported subset"""
+        from dotenv import dotenv_values
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            env_file = Path(temp_dir) / ".env"
+            env_file.write_text(SAMPLE)
+            with patch.dict(os.environ, {}, clear=True):
+                self.assertEqual(parse_dotenv(env_file), dict(dotenv_values(env_file)))
+
+
+class TestNativeParserLoading(unittest.TestCase):
+
+    @patch('h7_env_manager.env_manager._dotenv_loaded', False)
+    @patch('h7_env_manager.env_manager._env_files', [])
+    @patch.object(EnvManager, 'dotenv_parser', 'native')
+    def test_native_parser_loads_env_file(self):
+        """Test that EnvManager loads the .env file without python-dotenv"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            env_file = Path(temp_dir) / ".env"
+            env_file.write_text("NATIVE_PARSER_VAR=loaded\nNATIVE_BARE\n")
+            with patch('h7_env_manager.env_manager.find_env_file', return_value=env_file), \
+                    patch.dict(os.environ, {}, clear=False), \
+                    patch.dict(sys.modules, {"dotenv": None, "dotenv.main": None}):
+                self.assertEqual(EnvManager.get_required_env_var("NATIVE_PARSER_VAR"), "loaded")
+                self.assertNotIn("NATIVE_BARE", os.environ)
+
+    def test_env_file_inside_running_archive(self):
+        """Test that a .env file packed in the running zipapp is read from the archive"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            archive = Path(temp_dir).resolve() / "app.pyz"
+            with zipfile.ZipFile(archive, "w") as zip_file:
+                zip_file.writestr("__main__.py", "")
+                zip_file.writestr(".env", "ARCHIVED=yes\n")
+            with patch.object(sys.modules["__main__"], "__file__", str(archive / "__main__.py"), create=True):
+                for parser in ("native", "python-dotenv"):
+                    if parser == "python-dotenv" and not importlib.util.find_spec("dotenv"):
+                        continue
+                    with patch.object(EnvManager, "dotenv_parser", parser):
+                        self.assertEqual(EnvManager._read_env_file(archive / ".env"), {"ARCHIVED": "yes"})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,12 +1,15 @@
 import unittest
 import os
 import sys
+import threading
+import time
+from pathlib import Path
 from unittest.mock import patch
 
 # Add the src directory to the path so we can import the package
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
 
-from h7_env_manager import EnvManager
+from h7_env_manager import EnvManager, converters, env_manager, metrics
 
 class TestEnvManager(unittest.TestCase):
     
@@ -84,6 +87,128 @@ class TestEnvManager(unittest.TestCase):
         mock_get_optional.assert_called_once_with("BOOL_VAR")
 
 
+class TestTypedEnvVars(unittest.TestCase):
+
+    def setUp(self):
+        patcher = patch('h7_env_manager.env_manager._dotenv_loaded', True)  # Skip loading dotenv
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        env_patcher = patch.dict(os.environ, {
+            "INT_VAR": "42",
+            "FLOAT_VAR": "0.5",
+            "LIST_VAR": "a, b,,c ",
+            "JSON_VAR": '{"retries": 3}',
+            "DURATION_VAR": "1m30s",
+            "BAD_INT_VAR": "forty",
+        })
+        env_patcher.start()
+        self.addCleanup(env_patcher.stop)
+        env_manager._parsed_cache.clear()
+
+    def test_typed_getters(self):
+        """Test that the typed getters convert values and fall back to defaults"""
+        self.assertEqual(EnvManager.get_optional_int_env_var("INT_VAR"), 42)
+        self.assertEqual(EnvManager.get_optional_float_env_var("FLOAT_VAR"), 0.5)
+        self.assertEqual(EnvManager.get_optional_list_env_var("LIST_VAR"), ["a", "b", "c"])
+        self.assertEqual(EnvManager.get_optional_json_env_var("JSON_VAR"), {"retries": 3})
+        self.assertEqual(EnvManager.get_optional_duration_env_var("DURATION_VAR"), 90.0)
+        self.assertEqual(EnvManager.get_optional_int_env_var("MISSING_VAR", 7), 7)
+
+    def test_invalid_value_raises(self):
+        """Test that an unconvertible value raises ValueError naming the variable"""
+        with self.assertRaisesRegex(ValueError, "BAD_INT_VAR"):
+            EnvManager.get_optional_int_env_var("BAD_INT_VAR")
+
+    def test_parsed_value_cached_until_raw_value_changes(self):
+        """Test that each raw string is converted once and re-converted after it changes"""
+        with patch('h7_env_manager.env_manager.converters.to_int', wraps=int) as mock_to_int:
+            EnvManager.get_optional_int_env_var("INT_VAR")
+            EnvManager.get_optional_int_env_var("INT_VAR")
+            self.assertEqual(mock_to_int.call_count, 1)
+
+            os.environ["INT_VAR"] = "43"
+            self.assertEqual(EnvManager.get_optional_int_env_var("INT_VAR"), 43)
+            self.assertEqual(mock_to_int.call_count, 2)
+
+    def test_lookup_metrics(self):
+        """Test that lookups, misses and parse cache hits are counted when metrics are enabled"""
+        metrics.reset()
+        metrics.enable()
+        self.addCleanup(metrics.reset)
+        self.addCleanup(metrics.disable)
+        EnvManager.get_optional_int_env_var("INT_VAR")
+        EnvManager.get_optional_int_env_var("INT_VAR")
+        EnvManager.get_optional_env_var("MISSING_VAR")
+        self.assertEqual(metrics.counter("env_lookups_total"), 3)
+        self.assertEqual(metrics.counter("env_lookup_misses_total"), 1)
+        self.assertEqual(metrics.counter("env_parse_cache_misses_total"), 1)
+        self.assertEqual(metrics.counter("env_parse_cache_hits_total"), 1)
+
+    def test_duration_formats(self):
+        """Test the supported duration formats"""
+        self.assertEqual(converters.to_duration("250ms"), 0.25)
+        self.assertEqual(converters.to_duration("2h"), 7200.0)
+        self.assertEqual(converters.to_duration("15"), 15.0)
+        with self.assertRaises(ValueError):
+            converters.to_duration("10 parsecs")
+
+
+class TestConcurrentLoading(unittest.TestCase):
+
+    @patch('h7_env_manager.env_manager._dotenv_loaded', False)
+    @patch('h7_env_manager.env_manager._env_files', [])
+    @patch('h7_env_manager.env_manager.find_env_file', return_value=Path('.env'))
+    def test_concurrent_first_access_loads_once(self, mock_find_env_file):
+        """Test that many threads racing on the first access parse the .env file once"""
+        parses = []
+
+        def slow_read(dotenv_path):
+            parses.append(dotenv_path)
+            time.sleep(0.05)
+            return {"CONCURRENT_VAR": "loaded"}
+
+        barrier = threading.Barrier(64)
+        results = []
+
+        def worker():
+            barrier.wait()
+            results.append(EnvManager.get_optional_env_var("CONCURRENT_VAR"))
+
+        with patch.object(EnvManager, '_read_env_file', side_effect=slow_read), patch.dict(os.environ):
+            threads = [threading.Thread(target=worker) for _ in range(64)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        self.assertEqual(len(parses), 1)
+        self.assertEqual(results, ["loaded"] * 64)
+
+    @unittest.skipUnless(hasattr(os, "fork"), "requires os.fork")
+    def test_lock_usable_in_forked_child(self):
+        """Test that a child forked while another thread holds the lock can still load"""
+        locked = threading.Event()
+        release = threading.Event()
+
+        def hold_lock():
+            with env_manager._dotenv_lock:
+                locked.set()
+                release.wait()
+
+        holder = threading.Thread(target=hold_lock)
+        holder.start()
+        locked.wait()
+        try:
+            pid = os.fork()
+            if pid == 0:
+                acquired = env_manager._dotenv_lock.acquire(timeout=2)
+                os._exit(0 if acquired else 1)
+            _, status = os.waitpid(pid, 0)
+        finally:
+            release.set()
+            holder.join()
+        self.assertEqual(os.WEXITSTATUS(status), 0)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,48 @@
+import os
+import sys
+import unittest
+
+# Add the src directory to the path so we can import the package
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from _import_time import import_time, loaded_modules
+
+# Modules that importing the package alone must not load, besides its own submodules
+DEFERRED_MODULES = ("h7_file_finder", "dotenv", "pathlib", "threading", "typing")
+
+# Modules that importing EnvManager must not load
+UNRELATED_MODULES = ("h7_env_manager.watcher", "h7_env_manager.secrets", "h7_env_manager.profiles", "dotenv")
+
+# Opt-in cumulative import time budgets in microseconds, measured with ``python -X importtime``:
+# checked when H7_IMPORT_TIME_BUDGETS is set, multiplied by H7_IMPORT_TIME_SCALE on slow machines
+BUDGETS = (
+    ("import h7_env_manager", "h7_env_manager", 20_000),
+    ("from h7_env_manager import EnvManager", "h7_env_manager.env_manager", 150_000),
+)
+
+
+class TestImportTime(unittest.TestCase):
+
+    def test_package_import_loads_no_submodules(self):
+        """Test that importing the package loads none of its submodules, its dependencies or heavy stdlib modules"""
+        loaded = loaded_modules("import h7_env_manager")
+        self.assertEqual(sorted(module for module in loaded if module.startswith("h7_env_manager.")), [])
+        self.assertEqual([module for module in DEFERRED_MODULES if module in loaded], [])
+
+    def test_name_import_loads_only_its_module(self):
+        """Test that importing EnvManager does not load the unrelated submodules"""
+        loaded = loaded_modules("from h7_env_manager import EnvManager")
+        self.assertIn("h7_env_manager.env_manager", loaded)
+        self.assertEqual([module for module in UNRELATED_MODULES if module in loaded], [])
+
+    @unittest.skipUnless(os.environ.get("H7_IMPORT_TIME_BUDGETS"), "set H7_IMPORT_TIME_BUDGETS to check the budgets")
+    def test_import_time_within_budget(self):
+        """Test that importing the package, then EnvManager, stays within the import time budgets"""
+        scale = float(os.environ.get("H7_IMPORT_TIME_SCALE", "1"))
+        for statement, module, budget in BUDGETS:
+            with self.subTest(module=module):
+                self.assertLess(import_time(statement, module), budget * scale)
+
+
+if __name__ == '__main__':
+    unittest.main()
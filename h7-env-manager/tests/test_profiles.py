@@ -0,0 +1,123 @@
+import os
+import sys
+import tempfile
+import unittest
+import zipfile
+from pathlib import Path
+from unittest.mock import patch
+
+# Add the src directory to the path so we can import the package
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from h7_env_manager import EnvManager, env_manager
+from h7_env_manager.profiles import discover_layers, load_layers
+
+
+class TestLayeredEnv(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        base = Path(self.temp_dir.name).resolve()
+        self.project = base / "project"
+        self.cache_dir = base / "cache"
+        (self.project / "app").mkdir(parents=True)
+        (self.project / ".env").write_text("NAME=base\nURL=http://${HOST}/api\nHOST=localhost\n")
+        (self.project / ".env.local").write_text("LOCAL_ONLY=yes\n")
+        (self.project / ".env.prod").write_text("NAME=prod\nHOST=example.com\n")
+        (base / ".env.prod.local").write_text("IGNORED=outside the project directory\n")
+        self.start = self.project / "app"
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_discover_layers_in_precedence_order(self):
+        """Test that only layers next to the nearest one are used, in precedence order"""
+        layers = discover_layers("prod", self.start)
+        self.assertEqual(layers, [self.project / ".env", self.project / ".env.local", self.project / ".env.prod"])
+
+    def test_later_layers_override_and_interpolate(self):
+        """Test that the merged view resolves references with the overriding values"""
+        layered = load_layers("prod", self.start, self.cache_dir, environ={})
+        self.assertEqual(layered.values["NAME"], "prod")
+        self.assertEqual(layered.values["LOCAL_ONLY"], "yes")
+        self.assertEqual(layered.values["URL"], "http:///api")
+        self.assertNotIn("IGNORED", layered.values)
+
+    def test_second_load_skips_parsing(self):
+        """Test that unchanged layers are served from the on-disk cache"""
+        first = load_layers("prod", self.start, self.cache_dir, environ={})
+        with patch('h7_env_manager.profiles.iter_bindings') as mock_iter_bindings:
+            second = load_layers("prod", self.start, self.cache_dir, environ={})
+        mock_iter_bindings.assert_not_called()
+        self.assertFalse(first.from_cache)
+        self.assertTrue(second.from_cache)
+        self.assertEqual(first.values, second.values)
+
+    def test_changed_layer_invalidates_cache(self):
+        """Test that editing a layer forces a re-parse"""
+        load_layers("prod", self.start, self.cache_dir, environ={})
+        (self.project / ".env.prod").write_text("NAME=changed, longer than before\n")
+        layered = load_layers("prod", self.start, self.cache_dir, environ={})
+        self.assertFalse(layered.from_cache)
+        self.assertEqual(layered.values["NAME"], "changed, longer than before")
+
+    @patch('h7_env_manager.env_manager._dotenv_loaded', False)
+    @patch('h7_env_manager.env_manager._env_files', [])
+    @patch.object(EnvManager, 'layered_env', True)
+    @patch.object(EnvManager, 'env_profile', 'prod')
+    def test_env_manager_loads_profile(self):
+        """Test that EnvManager loads the layered view of its profile"""
+        environ = {"H7_ENV_CACHE_DIR": str(self.cache_dir)}
+        with patch.dict(os.environ, environ):
+            layers = EnvManager.load_env_profile(start_path=self.start)
+            self.assertEqual(EnvManager.get_required_env_var("NAME"), "prod")
+            self.assertEqual(env_manager._env_files, layers)
+            self.assertEqual(layers[-1], self.project / ".env.prod")
+
+    @patch('h7_env_manager.env_manager._dotenv_loaded', False)
+    @patch('h7_env_manager.env_manager._env_files', [])
+    @patch('h7_env_manager.env_manager._env_parser', None)
+    @patch.object(EnvManager, 'dotenv_parser', 'python-dotenv')
+    def test_watcher_reloads_layers_with_the_native_parser(self):
+        """Test that a hot reload parses the layers like the initial layered load"""
+        (self.project / ".env.prod").write_text("NAME=prod\nQUOTED=plain\n")
+        with patch.dict(os.environ, {"H7_ENV_CACHE_DIR": str(self.cache_dir)}):
+            EnvManager.load_env_profile("prod", start_path=self.start)
+            watcher = EnvManager.watch_env_file(interval=3600)
+            try:
+                # python-dotenv skips this statement, the native parser reads it as "a"
+                (self.project / ".env.prod").write_text('NAME=prod\nQUOTED="a" b\n')
+                change = watcher.check()
+                self.assertEqual(change.changed, {"QUOTED": ("plain", "a")})
+                self.assertEqual(change.removed, {})
+                self.assertEqual(os.environ["QUOTED"], "a")
+            finally:
+                EnvManager.stop_watching_env_file()
+
+    def test_layers_inside_running_archive(self):
+        """Test that the layers packed in the running zipapp are read and cached from the archive"""
+        archive = Path(self.temp_dir.name).resolve() / "app.pyz"
+        with zipfile.ZipFile(archive, "w") as zip_file:
+            zip_file.writestr("__main__.py", "")
+            zip_file.writestr(".env", "NAME=base\nHOST=localhost\n")
+            zip_file.writestr(".env.prod", "NAME=prod\n")
+        with patch.object(sys.modules["__main__"], "__file__", str(archive / "__main__.py"), create=True):
+            first = load_layers("prod", cache_dir=self.cache_dir, environ={})
+            second = load_layers("prod", cache_dir=self.cache_dir, environ={})
+        self.assertEqual(first.layers, [archive / ".env", archive / ".env.prod"])
+        self.assertEqual(first.values, {"NAME": "prod", "HOST": "localhost"})
+        self.assertTrue(second.from_cache)
+        self.assertEqual(second.values, first.values)
+
+    @unittest.skipIf(os.name == "nt", "POSIX permissions")
+    def test_cache_is_private_to_the_user(self):
+        """Test that the bindings cache, which may hold secrets, is only readable by the user"""
+        load_layers("prod", self.start, self.cache_dir, environ={})
+        cache_files = list(self.cache_dir.iterdir())
+        self.assertEqual(len(cache_files), 1)
+        self.assertEqual(os.stat(self.cache_dir).st_mode & 0o777, 0o700)
+        self.assertEqual(os.stat(cache_files[0]).st_mode & 0o777, 0o600)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,233 @@
+import json
+import os
+import sys
+import tempfile
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from unittest.mock import patch
+
+# Add the src directory to the path so we can import the package
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from h7_env_manager import EnvManager, Setting, SettingsError, env_manager
+from h7_env_manager.secrets import (
+    FileSecretProvider,
+    HttpSecretProvider,
+    SecretCache,
+    SecretError,
+    SecretProvider,
+)
+
+
+class DictSecretProvider(SecretProvider):
+    """Provider serving a dict and recording each batch it was asked for."""
+
+    def __init__(self, values):
+        self.values = values
+        self.batches = []
+
+    def fetch_many(self, paths):
+        self.batches.append(sorted(paths))
+        missing = [path for path in paths if path not in self.values]
+        if missing:
+            raise SecretError(f"No secret {missing}")
+        return {path: self.values[path] for path in paths}
+
+
+class SecretServer(ThreadingHTTPServer):
+    """Local stand-in of a secret service, counting requests and connections."""
+
+    daemon_threads = True
+
+    def __init__(self, secrets):
+        self.secrets = secrets
+        self.requests = []
+        self.connections = 0
+        super().__init__(("127.0.0.1", 0), SecretRequestHandler)
+
+
+class SecretRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        super().setup()
+        self.server.connections += 1
+
+    def do_POST(self):
+        paths = json.loads(self.rfile.read(int(self.headers["Content-Length"])))["paths"]
+        self.server.requests.append(paths)
+        body = json.dumps({path: self.server.secrets[path] for path in paths if path in self.server.secrets})
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body.encode())
+
+    def log_message(self, format, *args):
+        pass
+
+
+class TestSecretProviders(unittest.TestCase):
+
+    def test_file_provider(self):
+        """Test that secret files are read without their trailing newline and stay inside the directory"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            (Path(temp_dir) / "db").mkdir()
+            (Path(temp_dir) / "db" / "password").write_text("s3cret\n")
+            provider = FileSecretProvider(temp_dir)
+            self.assertEqual(provider.fetch("db/password"), "s3cret")
+            with self.assertRaises(SecretError):
+                provider.fetch("db/missing")
+            with self.assertRaises(SecretError):
+                provider.fetch("../outside")
+
+    def test_http_provider_batches_over_pooled_connection(self):
+        """Test that the HTTP provider fetches batches and reuses its keep-alive connection"""
+        server = SecretServer({"db/password": "s3cret", "api/token": "t0ken"})
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        provider = HttpSecretProvider(f"http://127.0.0.1:{server.server_port}/v1/secrets")
+        try:
+            self.assertEqual(provider.fetch_many(["db/password", "api/token"]),
+                             {"db/password": "s3cret", "api/token": "t0ken"})
+            for _ in range(3):
+                self.assertEqual(provider.fetch("api/token"), "t0ken")
+            with self.assertRaisesRegex(SecretError, "db/missing"):
+                provider.fetch("db/missing")
+            self.assertEqual(len(server.requests), 5)
+            self.assertEqual(server.connections, 1)
+        finally:
+            provider.close()
+            server.shutdown()
+            server.server_close()
+
+        with self.assertRaises(SecretError):
+            provider.fetch("db/password")
+        with self.assertRaises(ValueError):
+            HttpSecretProvider("ftp://example.com/secrets")
+
+
+class TestSecretCache(unittest.TestCase):
+
+    def setUp(self):
+        self.now = 1000.0
+        patcher = patch("h7_env_manager.secrets.time.monotonic", side_effect=lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.provider = DictSecretProvider({"a": "1", "b": "2"})
+        self.cache = SecretCache(self.provider, ttl=100.0, refresh_ahead=0.5)
+
+    def wait_for_refreshes(self):
+        for thread in threading.enumerate():
+            if thread.name == "h7-secret-refresh":
+                thread.join()
+
+    def test_prefetch_and_ttl(self):
+        """Test that prefetched values are served from the cache until they expire"""
+        self.cache.prefetch(["a", "b", "a"])
+        self.assertEqual(self.provider.batches, [["a", "b"]])
+        self.assertEqual((self.cache.get("a"), self.cache.get("b")), ("1", "2"))
+        self.cache.prefetch(["a"])
+        self.assertEqual(len(self.provider.batches), 1)
+
+        self.now += 100.0
+        self.provider.values["a"] = "changed"
+        self.assertEqual(self.cache.get("a"), "changed")
+        self.assertEqual(self.provider.batches[-1], ["a"])
+
+    def test_refresh_ahead_serves_cached_value(self):
+        """Test that a read past refresh_ahead returns the cached value and refreshes due entries in one batch"""
+        self.cache.prefetch(["a", "b"])
+        self.provider.values.update(a="new 1", b="new 2")
+        self.now += 60.0
+        self.assertEqual(self.cache.get("a"), "1")
+        self.wait_for_refreshes()
+        self.assertEqual(self.provider.batches[-1], ["a", "b"])
+        self.assertEqual((self.cache.get("a"), self.cache.get("b")), ("new 1", "new 2"))
+        self.assertEqual(len(self.provider.batches), 2)
+
+    def test_failed_refresh_keeps_value_until_expiry(self):
+        """Test that a failing refresh leaves the cached value in place"""
+        self.cache.prefetch(["a"])
+        del self.provider.values["a"]
+        self.now += 60.0
+        self.assertEqual(self.cache.get("a"), "1")
+        self.wait_for_refreshes()
+        self.assertEqual(self.cache.get("a"), "1")
+        self.wait_for_refreshes()
+        self.now += 40.0
+        with self.assertRaises(SecretError):
+            self.cache.get("a")
+
+
+class TestEnvManagerSecrets(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        self.env_file = Path(self.temp_dir.name) / ".env"
+        self.env_file.write_text("DB_PASSWORD=secret://db/password\nDB_PORT=secret://db/port\nDB_HOST=localhost\n")
+        self.provider = DictSecretProvider({"db/password": "s3cret", "db/port": "5432", "other": "x"})
+        for patcher in (
+            patch("h7_env_manager.env_manager._dotenv_loaded", False),
+            patch("h7_env_manager.env_manager._env_files", []),
+            patch("h7_env_manager.env_manager._secret_cache", None),
+            patch("h7_env_manager.env_manager.find_env_file", return_value=self.env_file),
+            patch.object(EnvManager, "dotenv_parser", "native"),
+            patch.object(EnvManager, "secret_provider", self.provider),
+            patch.dict(os.environ),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        env_manager._parsed_cache.clear()
+
+    def test_getters_resolve_references_fetched_at_load(self):
+        """Test that the references of the .env file are fetched in one batch and resolved by the getters"""
+        self.assertEqual(EnvManager.get_required_env_var("DB_PASSWORD"), "s3cret")
+        self.assertEqual(self.provider.batches, [["db/password", "db/port"]])
+        self.assertEqual(EnvManager.get_optional_env_var("DB_PASSWORD"), "s3cret")
+        self.assertEqual(EnvManager.get_optional_int_env_var("DB_PORT"), 5432)
+        self.assertEqual(EnvManager.get_optional_env_var("DB_HOST"), "localhost")
+        self.assertEqual(len(self.provider.batches), 1)
+
+        os.environ["OTHER_SECRET"] = "secret://other"
+        self.assertEqual(EnvManager.get_optional_env_var("OTHER_SECRET"), "x")
+        self.assertEqual(self.provider.batches[-1], ["other"])
+
+    def test_settings_snapshot_resolves_references(self):
+        """Test that settings snapshots hold the secrets, converted like other values"""
+        schema = {"password": Setting("DB_PASSWORD"), "port": Setting("DB_PORT", type=int),
+                  "host": Setting("DB_HOST")}
+        snapshot = EnvManager.load_settings(schema)
+        self.assertEqual((snapshot.password, snapshot.port, snapshot.host), ("s3cret", 5432, "localhost"))
+
+        os.environ["MISSING_SECRET"] = "secret://nowhere"
+        with self.assertRaises(SettingsError) as caught:
+            EnvManager.load_settings({"missing": Setting("MISSING_SECRET"), "port": Setting("DB_PORT", type=int)})
+        self.assertEqual(len(caught.exception.errors), 1)
+        self.assertIn("MISSING_SECRET", caught.exception.errors[0])
+
+    def test_failed_prefetch_only_fails_the_unresolvable_lookups(self):
+        """Test that a failing batch at load time neither fails unrelated lookups nor marks secrets resolved"""
+        self.env_file.write_text("DB_PASSWORD=secret://db/password\nBROKEN=secret://nowhere\nDB_HOST=localhost\n")
+        self.assertEqual(EnvManager.get_optional_env_var("DB_HOST"), "localhost")
+        self.assertEqual(self.provider.batches, [["db/password", "nowhere"]])
+        for _ in range(2):
+            with self.assertRaisesRegex(ValueError, "BROKEN"):
+                EnvManager.get_optional_env_var("BROKEN")
+        self.assertEqual(EnvManager.get_required_env_var("DB_PASSWORD"), "s3cret")
+
+    def test_unresolvable_references(self):
+        """Test that missing secrets and a missing provider raise ValueError naming the variable"""
+        os.environ["MISSING_SECRET"] = "secret://nowhere"
+        with self.assertRaisesRegex(ValueError, "MISSING_SECRET"):
+            EnvManager.get_required_env_var("MISSING_SECRET")
+        with patch.object(EnvManager, "secret_provider", None), patch("h7_env_manager.env_manager._secret_cache", None):
+            with self.assertRaisesRegex(ValueError, "secret_provider"):
+                EnvManager.get_optional_env_var("DB_PASSWORD")
+
+
+if __name__ == '__main__':
+    unittest.main()
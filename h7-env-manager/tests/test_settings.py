@@ -0,0 +1,67 @@
+import os
+import sys
+import unittest
+from unittest.mock import patch
+
+# Add the src directory to the path so we can import the package
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from h7_env_manager import EnvManager, Setting, SettingsError
+
+
+class AppSettings:
+    api_key = Setting("API_KEY")
+    port = Setting("PORT", int, default=8080)
+    debug = Setting(type=bool, default=False)
+    timeout = Setting("REQUEST_TIMEOUT", "duration", default="30s")
+    hosts = Setting("ALLOWED_HOSTS", list, default=[])
+
+
+@patch('h7_env_manager.env_manager._dotenv_loaded', True)  # Skip loading dotenv
+class TestSettings(unittest.TestCase):
+
+    def test_load_settings(self):
+        """Test that every declared setting is converted into the snapshot"""
+        environ = {"API_KEY": "secret", "PORT": "9000", "DEBUG": "TRUE", "ALLOWED_HOSTS": "a,b"}
+        with patch.dict(os.environ, environ, clear=True):
+            settings = EnvManager.load_settings(AppSettings)
+
+        self.assertEqual(type(settings).__name__, "AppSettings")
+        self.assertEqual(settings.api_key, "secret")
+        self.assertEqual(settings.port, 9000)
+        self.assertTrue(settings.debug)
+        self.assertEqual(settings.timeout, 30.0)
+        self.assertEqual(settings.hosts, ["a", "b"])
+
+    def test_snapshot_is_immutable_and_slotted(self):
+        """Test that the snapshot has no __dict__ and rejects assignment"""
+        with patch.dict(os.environ, {"API_KEY": "secret"}, clear=True):
+            settings = EnvManager.load_settings(AppSettings)
+
+        self.assertFalse(hasattr(settings, "__dict__"))
+        with self.assertRaises(AttributeError):
+            settings.port = 1
+        self.assertEqual(settings._asdict()["port"], 8080)
+
+    def test_all_errors_reported_together(self):
+        """Test that missing and invalid variables are reported in a single error"""
+        with patch.dict(os.environ, {"PORT": "eighty", "REQUEST_TIMEOUT": "soon"}, clear=True):
+            with self.assertRaises(SettingsError) as context:
+                EnvManager.load_settings(AppSettings)
+
+        errors = context.exception.errors
+        self.assertEqual(len(errors), 3)
+        self.assertIn("API_KEY", errors[0])
+        self.assertIn("PORT", errors[1])
+        self.assertIn("REQUEST_TIMEOUT", errors[2])
+        self.assertIsInstance(context.exception, ValueError)
+
+    def test_mapping_schema(self):
+        """Test that a plain mapping can be used as the schema"""
+        with patch.dict(os.environ, {"WORKERS": "3"}, clear=True):
+            settings = EnvManager.load_settings({"workers": Setting(type=int)})
+        self.assertEqual(settings.workers, 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
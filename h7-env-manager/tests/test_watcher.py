@@ -0,0 +1,99 @@
+import os
+import sys
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+# Add the src directory to the path so we can import the package
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from h7_env_manager import EnvManager, env_manager
+from h7_env_manager.dotenv_parser import parse_dotenv
+from h7_env_manager.watcher import EnvFileWatcher
+
+
+def rewrite(path: Path, content: str):
+    """Rewrite a file and push its mtime forward so the change is always visible."""
+    mtime_ns = os.stat(path).st_mtime_ns
+    path.write_text(content)
+    os.utime(path, ns=(mtime_ns + 10_000_000, mtime_ns + 10_000_000))
+
+
+class TestEnvFileWatcher(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.env_file = Path(self.temp_dir.name) / ".env"
+        self.env_file.write_text("WATCH_KEEP=1\nWATCH_CHANGE=old\nWATCH_REMOVE=gone\n")
+        env_patcher = patch.dict(os.environ, {"WATCH_KEEP": "1", "WATCH_CHANGE": "old", "WATCH_REMOVE": "gone"})
+        env_patcher.start()
+        self.addCleanup(env_patcher.stop)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_check_applies_diff_and_notifies(self):
+        """Test that a changed file is diffed, applied to os.environ and reported"""
+        watcher = EnvFileWatcher([self.env_file], parse_dotenv)
+        changes = []
+        watcher.add_callback(changes.append)
+        self.assertIsNone(watcher.check())
+
+        rewrite(self.env_file, "WATCH_KEEP=1\nWATCH_CHANGE=new\nWATCH_ADD=added\n")
+        change = watcher.check()
+
+        self.assertEqual(change.added, {"WATCH_ADD": "added"})
+        self.assertEqual(change.changed, {"WATCH_CHANGE": ("old", "new")})
+        self.assertEqual(change.removed, {"WATCH_REMOVE": "gone"})
+        self.assertEqual(change.paths, (self.env_file,))
+        self.assertEqual(changes, [change])
+        self.assertEqual(os.environ["WATCH_CHANGE"], "new")
+        self.assertEqual(os.environ["WATCH_ADD"], "added")
+        self.assertNotIn("WATCH_REMOVE", os.environ)
+
+    def test_change_reports_every_changed_layer(self):
+        """Test that layers changed within one poll are all reported, in precedence order"""
+        local_file = Path(self.temp_dir.name) / ".env.local"
+        local_file.write_text("WATCH_LOCAL=1\n")
+        watcher = EnvFileWatcher([self.env_file, local_file], parse_dotenv)
+        rewrite(self.env_file, "WATCH_KEEP=1\nWATCH_CHANGE=both\nWATCH_REMOVE=gone\n")
+        rewrite(local_file, "WATCH_LOCAL=2\n")
+        change = watcher.check()
+        self.assertEqual(change.paths, (self.env_file, local_file))
+        self.assertEqual(change.changed, {"WATCH_CHANGE": ("old", "both"), "WATCH_LOCAL": ("1", "2")})
+
+    def test_unchanged_file_is_not_parsed(self):
+        """Test that polling an unchanged file only stats it"""
+        calls = []
+
+        def read_file(path):
+            calls.append(path)
+            return parse_dotenv(path)
+
+        watcher = EnvFileWatcher([self.env_file], read_file)
+        watcher.check()
+        watcher.check()
+        self.assertEqual(len(calls), 1)
+
+    @patch('h7_env_manager.env_manager._dotenv_loaded', True)  # Skip loading dotenv
+    @patch('h7_env_manager.env_manager._env_files', [])
+    @patch.object(EnvManager, 'dotenv_parser', 'native')
+    def test_background_watcher_fires_callback(self):
+        """Test that EnvManager.watch_env_file picks up a change on its own thread"""
+        changed = threading.Event()
+        with patch('h7_env_manager.env_manager.find_env_file', return_value=self.env_file):
+            watcher = EnvManager.watch_env_file(interval=0.01, callback=lambda change: changed.set())
+        try:
+            self.assertTrue(watcher.running)
+            rewrite(self.env_file, "WATCH_KEEP=2\n")
+            self.assertTrue(changed.wait(5))
+            self.assertEqual(EnvManager.get_optional_env_var("WATCH_KEEP"), "2")
+        finally:
+            EnvManager.stop_watching_env_file()
+        self.assertIsNone(env_manager._watcher)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,109 @@
+"""
+Micro-benchmark for the ancestor walk used by find_project_root.
+
+Compares the original per-marker ``Path.exists()`` implementation against the
+single-``scandir`` walk on synthetic trees of increasing depth, reporting the
+number of filesystem syscalls issued per lookup and the mean wall time.
+
+Usage:
+    python benchmarks/bench_path_finder.py [--depths 5 20 50] [--repeat 200]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, List
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from h7_file_finder.path_finder import (
+    DEFAULT_MARKERS,
+    clear_project_root_cache,
+    find_markers,
+    find_project_root,
+)
+
+
+def legacy_find_project_root(start_path: Path, markers: List[str]) -> Path:
+    """The implementation shipped in h7-file-finder 1.0.1."""
+    current_path = Path(start_path).resolve()
+    while current_path.parent != current_path:
+        if any((current_path / marker).exists() for marker in markers):
+            return current_path
+        current_path = current_path.parent
+    raise FileNotFoundError(start_path)
+
+
+@contextmanager
+def count_syscalls(counts: Dict[str, int]):
+    """Count calls to os.stat and os.scandir made inside the block."""
+    originals = {name: getattr(os, name) for name in ("stat", "scandir")}
+
+    def wrap(name):
+        original = originals[name]
+
+        def counted(*args, **kwargs):
+            counts[name] = counts.get(name, 0) + 1
+            return original(*args, **kwargs)
+        return counted
+
+    for name in originals:
+        setattr(os, name, wrap(name))
+    try:
+        yield counts
+    finally:
+        for name, original in originals.items():
+            setattr(os, name, original)
+
+
+def measure(func, repeat: int) -> Dict[str, float]:
+    func()  # warm-up, also primes the project root cache
+    counts: Dict[str, int] = {}
+    with count_syscalls(counts):
+        func()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    elapsed = time.perf_counter() - start
+    return {"syscalls": sum(counts.values()), "mean_us": elapsed / repeat * 1e6}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--depths", type=int, nargs="+", default=[1, 5, 20, 50])
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    # Only ``.git`` sits at the root, so every other default marker is probed at every level
+    markers = [marker for marker in DEFAULT_MARKERS if marker != ".git"] + [".git"]
+
+    print(f"{'depth':>5} {'implementation':<28} {'syscalls':>9} {'mean us':>10}")
+    for depth in args.depths:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            base = Path(temp_dir).resolve()
+            (base / ".git").mkdir()
+            leaf = base
+            for level in range(depth):
+                leaf = leaf / f"level_{level}"
+                leaf.mkdir()
+                for index in range(8):
+                    (leaf / f"module_{index}.py").write_text("")
+
+            cases = {
+                "legacy exists() probes": lambda leaf=leaf: legacy_find_project_root(leaf, markers),
+                "scandir walk": lambda leaf=leaf: find_project_root(leaf, markers, use_cache=False),
+                "scandir walk (cached)": lambda leaf=leaf: find_project_root(leaf, markers),
+                "find_markers (all at once)": lambda leaf=leaf: find_markers(markers, leaf),
+            }
+            clear_project_root_cache()
+            for name, func in cases.items():
+                result = measure(func, args.repeat)
+                print(f"{depth:>5} {name:<28} {result['syscalls']:>9} {result['mean_us']:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
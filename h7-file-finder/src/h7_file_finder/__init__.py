@@ -2,15 +2,66 @@
 Documentation for the h7_file_finder package.
 
 This package provides utilities for finding files and directories in a project.
+The package-level names are imported lazily, on first access.
 """
 
+# typing.TYPE_CHECKING without importing typing, which costs more than the package itself
+TYPE_CHECKING = False
+
 # Package version
 __version__ = "1.0.0"
 
-# Import main functions to make them available at package level
-from .path_finder import (
-    find_project_root as find_project_root,
-    find_file_in_project as find_file_in_project,
-    find_env_file as find_env_file,
-    find_root_folder as find_root_folder
-)
+# Package-level name -> module defining it (relative names are submodules)
+_LAZY_ATTRIBUTES = {
+    "find_project_root": ".path_finder",
+    "find_file_in_project": ".path_finder",
+    "find_env_file": ".path_finder",
+    "find_root_folder": ".path_finder",
+    "find_markers": ".path_finder",
+    "clear_project_root_cache": ".path_finder",
+    "set_project_root_cache_size": ".path_finder",
+    "PathBackend": ".path_finder",
+    "ZipBackend": ".path_finder",
+    "ResourceBackend": ".path_finder",
+    "running_archive": ".path_finder",
+    "FileIndex": ".file_index",
+    "find_files": ".file_index",
+    "metrics": ".instrumentation",
+    "MetricsRegistry": ".instrumentation",
+}
+
+__all__ = ["__version__"]
+__all__.extend(_LAZY_ATTRIBUTES)
+
+if TYPE_CHECKING:
+    from .file_index import FileIndex as FileIndex
+    from .file_index import find_files as find_files
+    from .instrumentation import MetricsRegistry as MetricsRegistry
+    from .instrumentation import metrics as metrics
+    from .path_finder import PathBackend as PathBackend
+    from .path_finder import ResourceBackend as ResourceBackend
+    from .path_finder import ZipBackend as ZipBackend
+    from .path_finder import clear_project_root_cache as clear_project_root_cache
+    from .path_finder import find_env_file as find_env_file
+    from .path_finder import find_file_in_project as find_file_in_project
+    from .path_finder import find_markers as find_markers
+    from .path_finder import find_project_root as find_project_root
+    from .path_finder import find_root_folder as find_root_folder
+    from .path_finder import running_archive as running_archive
+    from .path_finder import set_project_root_cache_size as set_project_root_cache_size
+
+
+def __getattr__(name):
+    module_name = _LAZY_ATTRIBUTES.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    if module_name.startswith("."):
+        module_name = __name__ + module_name
+    # The import statement machinery, unlike importlib.import_module, shows up in -X importtime
+    value = getattr(__import__(module_name, fromlist=[name]), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_ATTRIBUTES))
@@ -0,0 +1,107 @@
+"""
+Asyncio-native variants of the h7_file_finder lookups.
+
+The filesystem probes run on a small, bounded thread pool so they never block the
+event loop. Concurrent calls with the same arguments on the same loop share one
+in-flight lookup instead of each walking the tree.
+"""
+
+import asyncio
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from pathlib import Path
+from typing import Callable, Dict, Hashable, List, Optional, Tuple, Union
+
+from . import path_finder
+
+DEFAULT_MAX_WORKERS = 4
+
+_max_workers = DEFAULT_MAX_WORKERS
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+# Lookups currently running, keyed by (event loop, lookup key)
+_inflight: Dict[Tuple[asyncio.AbstractEventLoop, Hashable], "asyncio.Future"] = {}
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=_max_workers, thread_name_prefix="h7-file-finder")
+    return _executor
+
+
+def set_max_workers(max_workers: int):
+    """Resize the thread pool used for filesystem probes.
+
+    Lookups already running finish on the previous pool.
+    """
+    global _executor, _max_workers
+
+    if max_workers < 1:
+        raise ValueError("max_workers must be at least 1")
+    with _executor_lock:
+        previous, _executor, _max_workers = _executor, None, max_workers
+    if previous is not None:
+        previous.shutdown(wait=False)
+
+
+def _reinit_after_fork():
+    """Forget the parent's pool and lookups; their threads do not exist in a forked child."""
+    global _executor, _executor_lock
+
+    _executor = None
+    _executor_lock = threading.Lock()
+    _inflight.clear()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reinit_after_fork)
+
+
+async def _run_shared(key: Hashable, func: Callable, *args):
+    loop = asyncio.get_running_loop()
+    inflight_key = (loop, key)
+    future = _inflight.get(inflight_key)
+    if future is None:
+        future = loop.run_in_executor(_get_executor(), partial(func, *args))
+        _inflight[inflight_key] = future
+        future.add_done_callback(lambda _: _inflight.pop(inflight_key, None))
+    # Shielded so one cancelled waiter does not cancel the lookup for the others
+    return await asyncio.shield(future)
+
+
+def _start_key(start_path: Optional[Union[str, Path]]) -> str:
+    # Relative paths and the default start depend on the working directory at call time
+    return os.path.join(os.getcwd(), start_path) if start_path is not None else os.getcwd()
+
+
+async def find_project_root(start_path: Optional[Union[str, Path]] = None,
+                            markers: Optional[List[str]] = None,
+                            use_cache: bool = True,
+                            backend: Optional[path_finder.PathBackend] = None) -> Path:
+    key = ("find_project_root", _start_key(start_path), tuple(markers or ()), use_cache, backend)
+    return await _run_shared(key, path_finder.find_project_root, start_path, markers, use_cache, backend)
+
+
+async def find_file_in_project(filename: str,
+                               start_path: Optional[Union[str, Path]] = None,
+                               search_parents: bool = True,
+                               backend: Optional[path_finder.PathBackend] = None) -> Path:
+    key = ("find_file_in_project", filename, _start_key(start_path), search_parents, backend)
+    return await _run_shared(key, path_finder.find_file_in_project, filename, start_path, search_parents, backend)
+
+
+async def find_env_file() -> Path:
+    return await find_file_in_project(".env")
+
+
+async def find_root_folder(folder_name: str) -> Path:
+    if not folder_name:
+        raise ValueError("folder_name cannot be None or empty")
+    return (await find_project_root()) / folder_name
@@ -0,0 +1,256 @@
+"""
+Recursive file search backed by a persistent directory index.
+
+The index records, for every directory below a root, its mtime together with the
+names of its files and sub-directories. Refreshing an index stats every directory
+but only lists the ones whose mtime changed, so repeated searches over a large,
+mostly unchanged tree cost one ``stat`` per directory instead of a full walk.
+"""
+
+import fnmatch
+import json
+import os
+import re
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import (
+    Callable,
+    Dict,
+    FrozenSet,
+    Iterable,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+
+from .path_finder import find_project_root
+
+DEFAULT_IGNORE_DIRS = frozenset({
+    ".git", ".hg", ".svn", "node_modules", "__pycache__", ".venv", "venv",
+    ".tox", ".nox", ".mypy_cache", ".pytest_cache", ".ruff_cache", ".eggs",
+})
+
+# A directory containing this file is a virtual environment and is pruned wherever it lives
+_VENV_MARKER = "pyvenv.cfg"
+
+# Directories modified this close to the scan may change again within the same mtime tick
+_RACY_WINDOW_NS = 2_000_000_000
+# 2: symlinks to directories are listed as directories
+_INDEX_FORMAT_VERSION = 2
+
+
+class _DirEntry(NamedTuple):
+    mtime_ns: int
+    files: Tuple[str, ...]
+    subdirs: Tuple[str, ...]
+
+
+def _join(parent: str, name: str) -> str:
+    return f"{parent}/{name}" if parent else name
+
+
+def _match_segments(matchers: Sequence[Optional[Callable]], parts: Sequence[str]) -> bool:
+    """Match path segments one by one; a None matcher is ``**`` and spans any number of segments."""
+    if not matchers:
+        return not parts
+    head, rest = matchers[0], matchers[1:]
+    if head is None:
+        return any(_match_segments(rest, parts[start:]) for start in range(len(parts) + 1))
+    return bool(parts) and head(parts[0]) is not None and _match_segments(rest, parts[1:])
+
+
+def _compile_patterns(patterns: Iterable[str]):
+    """Compile glob patterns into matchers for the file name and the relative path.
+
+    Path patterns are matched one segment at a time, so ``*``, ``?`` and ``[...]``
+    never match a ``/``, and ``**`` matches any number of directories.
+    """
+    name_patterns = []
+    path_patterns = []
+    for pattern in patterns:
+        if "/" in pattern:
+            path_patterns.append([None if segment == "**" else re.compile(fnmatch.translate(segment)).match
+                                  for segment in pattern.split("/")])
+        else:
+            name_patterns.append(fnmatch.translate(pattern))
+
+    name_regex = re.compile("|".join(name_patterns)).match if name_patterns else None
+    path_regex = None
+    if path_patterns:
+        def path_regex(relative_path: str) -> bool:
+            parts = relative_path.split("/")
+            return any(_match_segments(matchers, parts) for matchers in path_patterns)
+    return name_regex, path_regex
+
+
+class FileIndex:
+    """Index of the files found below ``root``, excluding pruned directories."""
+
+    def __init__(self, root: Union[str, Path], ignore_dirs: Iterable[str] = DEFAULT_IGNORE_DIRS):
+        self.root = Path(root).resolve()
+        self.ignore_dirs = frozenset(ignore_dirs)
+        self._dirs: Dict[str, _DirEntry] = {}
+
+    def __len__(self) -> int:
+        return sum(len(entry.files) for entry in self._dirs.values())
+
+    def _scan(self, relative_dir: str) -> Optional[Tuple[str, _DirEntry, bool, Tuple[int, int]]]:
+        directory = os.path.join(self.root, relative_dir)
+        try:
+            st = os.stat(directory)
+        except OSError:
+            return None
+        mtime_ns = st.st_mtime_ns
+        identity = (st.st_dev, st.st_ino)
+
+        previous = self._dirs.get(relative_dir)
+        if previous is not None and previous.mtime_ns == mtime_ns:
+            return relative_dir, previous, False, identity
+
+        files = []
+        subdirs = []
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    try:
+                        # Symlinks to directories are followed like directories
+                        if entry.is_dir():
+                            if entry.name not in self.ignore_dirs:
+                                subdirs.append(entry.name)
+                        else:
+                            files.append(entry.name)
+                    except OSError:
+                        continue
+        except OSError:
+            return None
+
+        if _VENV_MARKER in files and relative_dir:
+            files, subdirs = [], []
+        if time.time_ns() - mtime_ns < _RACY_WINDOW_NS:
+            mtime_ns = -1  # force a rescan next time
+        return relative_dir, _DirEntry(mtime_ns, tuple(sorted(files)), tuple(sorted(subdirs))), True, identity
+
+    def refresh(self, workers: Optional[int] = None) -> int:
+        """Bring the index up to date and return how many directories were re-listed.
+
+        Each level of the tree is scanned in parallel on a thread pool; directories
+        whose mtime is unchanged reuse their recorded listing. A symlink to one of
+        its own ancestors is not descended into.
+        """
+        directories: Dict[str, _DirEntry] = {}
+        rescanned = 0
+        # (relative directory, (st_dev, st_ino) of its ancestors)
+        frontier: List[Tuple[str, FrozenSet[Tuple[int, int]]]] = [("", frozenset())]
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            while frontier:
+                next_frontier = []
+                results = pool.map(self._scan, [relative_dir for relative_dir, _ in frontier])
+                for (_, ancestors), result in zip(frontier, results):
+                    if result is None:
+                        continue
+                    relative_dir, entry, scanned, identity = result
+                    if identity in ancestors:
+                        continue
+                    directories[relative_dir] = entry
+                    rescanned += scanned
+                    lineage = ancestors | {identity}
+                    next_frontier.extend((_join(relative_dir, name), lineage) for name in entry.subdirs)
+                frontier = next_frontier
+        self._dirs = directories
+        return rescanned
+
+    def match(self, patterns: Union[str, Iterable[str]]) -> List[Path]:
+        """Return the indexed files matching any of the glob ``patterns``.
+
+        Patterns without a ``/`` match the file name; the others match the path
+        relative to the root one segment at a time, e.g. ``config/*.yaml`` or
+        ``config/**/*.yaml``.
+        """
+        if isinstance(patterns, str):
+            patterns = [patterns]
+        match_name, match_path = _compile_patterns(patterns)
+
+        matches = []
+        for relative_dir, entry in self._dirs.items():
+            for name in entry.files:
+                relative_path = _join(relative_dir, name)
+                if (match_name and match_name(name)) or (match_path and match_path(relative_path)):
+                    matches.append(relative_path)
+        return [self.root / relative_path for relative_path in sorted(matches)]
+
+    def save(self, index_path: Union[str, Path]):
+        """Write the index to ``index_path`` as zlib-compressed JSON."""
+        payload = {
+            "version": _INDEX_FORMAT_VERSION,
+            "root": str(self.root),
+            "ignore_dirs": sorted(self.ignore_dirs),
+            "dirs": {relative_dir: list(entry) for relative_dir, entry in self._dirs.items()},
+        }
+        data = zlib.compress(json.dumps(payload, separators=(",", ":")).encode("utf-8"))
+        index_path = Path(index_path)
+        temp_path = index_path.with_name(f"{index_path.name}.{os.getpid()}.tmp")
+        temp_path.write_bytes(data)
+        os.replace(temp_path, index_path)
+
+    @classmethod
+    def load(cls, index_path: Union[str, Path]) -> "FileIndex":
+        """Read an index written by :meth:`save`.
+
+        Raises:
+            ValueError: If the file is not a valid index
+        """
+        try:
+            payload = json.loads(zlib.decompress(Path(index_path).read_bytes()).decode("utf-8"))
+            if payload["version"] != _INDEX_FORMAT_VERSION:
+                raise ValueError(f"Unsupported index version {payload['version']}")
+            index = cls(payload["root"], payload["ignore_dirs"])
+            index._dirs = {
+                relative_dir: _DirEntry(mtime_ns, tuple(files), tuple(subdirs))
+                for relative_dir, (mtime_ns, files, subdirs) in payload["dirs"].items()
+            }
+        except (zlib.error, KeyError, TypeError, UnicodeDecodeError) as e:
+            raise ValueError(f"Invalid file index '{index_path}': {e}") from e
+        return index
+
+
+def find_files(patterns: Union[str, Iterable[str]],
+               root: Optional[Union[str, Path]] = None,
+               ignore_dirs: Iterable[str] = DEFAULT_IGNORE_DIRS,
+               index_path: Optional[Union[str, Path]] = None,
+               workers: Optional[int] = None) -> List[Path]:
+    """Find every file below ``root`` matching the glob ``patterns``.
+
+    Args:
+        patterns: A glob pattern or a list of them
+        root: Directory to search, defaults to the project root
+        ignore_dirs: Directory names that are not descended into
+        index_path: Optional index file; when it exists only directories whose
+                    mtime changed since it was written are listed again, and it is
+                    rewritten with the refreshed index
+        workers: Size of the thread pool used for the walk
+    Returns:
+        The matching files, sorted by path
+    """
+    root = Path(root).resolve() if root is not None else find_project_root()
+    ignore_dirs = frozenset(ignore_dirs)
+
+    index = None
+    if index_path is not None and os.path.exists(index_path):
+        try:
+            index = FileIndex.load(index_path)
+        except (OSError, ValueError):
+            index = None
+        if index is not None and (index.root != root or index.ignore_dirs != ignore_dirs):
+            index = None
+    if index is None:
+        index = FileIndex(root, ignore_dirs)
+
+    index.refresh(workers)
+    if index_path is not None:
+        index.save(index_path)
+    return index.match(patterns)
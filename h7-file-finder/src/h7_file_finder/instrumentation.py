@@ -0,0 +1,178 @@
+"""
+Opt-in counters and timings shared by h7_file_finder, h7_env_manager and h7_logger_manager.
+
+Instrumented call sites check ``metrics.enabled`` before doing any work, so a
+disabled registry costs one attribute lookup per call. Metric names follow the
+Prometheus conventions (``_total`` for counters, ``_seconds`` for timings).
+
+Example:
+    from h7_file_finder import metrics
+
+    metrics.enable()
+    ...
+    metrics.snapshot()       # {"counters": {...}, "timings": {...}}
+    metrics.to_prometheus()  # text exposition format
+"""
+
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+# Label pairs of a metric, e.g. (("handler", "RotatingFileHandler"),)
+Labels = Tuple[Tuple[str, str], ...]
+
+_MetricKey = Tuple[str, Labels]
+
+
+class _Timer:
+    __slots__ = ("_labels", "_name", "_registry", "_start")
+
+    def __init__(self, registry: "MetricsRegistry", name: str, labels: Labels):
+        self._registry = registry
+        self._name = name
+        self._labels = labels
+        self._start = 0.0
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._registry.observe(self._name, time.perf_counter() - self._start, self._labels)
+
+
+class _NullTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return None
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class MetricsRegistry:
+    """Thread-safe registry of counters and timing summaries (count, sum, max)."""
+
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        self._counters: Dict[_MetricKey, float] = {}
+        self._timings: Dict[_MetricKey, List[float]] = {}
+        self._lock = threading.Lock()
+
+    def enable(self, enabled: bool = True):
+        self.enabled = enabled
+
+    def disable(self):
+        self.enabled = False
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._timings.clear()
+
+    def inc(self, name: str, value: float = 1, labels: Labels = ()):
+        if not self.enabled:
+            return
+        key = (name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name: str, seconds: float, labels: Labels = ()):
+        if not self.enabled:
+            return
+        key = (name, labels)
+        with self._lock:
+            timing = self._timings.get(key)
+            if timing is None:
+                self._timings[key] = [1, seconds, seconds]
+            else:
+                timing[0] += 1
+                timing[1] += seconds
+                timing[2] = max(timing[2], seconds)
+
+    def timer(self, name: str, labels: Labels = ()):
+        """Context manager recording the duration of its block, a no-op when disabled."""
+        if not self.enabled:
+            return _NULL_TIMER
+        return _Timer(self, name, labels)
+
+    def counter(self, name: str, labels: Labels = ()) -> float:
+        return self._counters.get((name, labels), 0)
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Return the current values as plain dicts.
+
+        Labelled metrics are keyed by ``name{label="value",...}`` as in Prometheus.
+        """
+        with self._lock:
+            counters = dict(self._counters)
+            timings = {key: list(value) for key, value in self._timings.items()}
+        return {
+            "counters": {_format_key(name, labels): value for (name, labels), value in sorted(counters.items())},
+            "timings": {
+                _format_key(name, labels): {"count": count, "sum": total, "max": maximum}
+                for (name, labels), (count, total, maximum) in sorted(timings.items())
+            },
+        }
+
+    def to_prometheus(self, prefix: str = "h7_") -> str:
+        """Render the metrics in the Prometheus text exposition format; timings become summaries."""
+        with self._lock:
+            counters = sorted(self._counters.items())
+            timings = sorted((key, list(value)) for key, value in self._timings.items())
+
+        lines: List[str] = []
+        last_name: Optional[str] = None
+        for (name, labels), value in counters:
+            if name != last_name:
+                lines.append(f"# TYPE {prefix}{name} counter")
+                last_name = name
+            lines.append(f"{_format_key(prefix + name, labels)} {_format_value(value)}")
+        for (name, labels), (count, total, _) in timings:
+            if name != last_name:
+                lines.append(f"# TYPE {prefix}{name} summary")
+                last_name = name
+            lines.append(f"{_format_key(prefix + name + '_count', labels)} {_format_value(count)}")
+            lines.append(f"{_format_key(prefix + name + '_sum', labels)} {_format_value(total)}")
+        last_name = None
+        for (name, labels), (_, _, maximum) in timings:
+            if name != last_name:
+                lines.append(f"# TYPE {prefix}{name}_max gauge")
+                last_name = name
+            lines.append(f"{_format_key(prefix + name + '_max', labels)} {_format_value(maximum)}")
+        return "\n".join(lines) + "\n" if lines else ""
+
+
+def _format_key(name: str, labels: Labels) -> str:
+    if not labels:
+        return name
+    rendered = ",".join(f'{label}="{_escape(value)}"' for label, value in labels)
+    return f"{name}{{{rendered}}}"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if isinstance(value, int) or float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+# The registry shared by the three packages
+metrics = MetricsRegistry()
+
+
+def _reinit_after_fork():
+    metrics._lock = threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reinit_after_fork)
@@ -1,23 +1,507 @@
+import os
+import sys
+import threading
+from collections import OrderedDict
 from pathlib import Path
-from typing import List, Optional, Union
+from typing import (
+    Callable,
+    Collection,
+    Dict,
+    Hashable,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    Union,
+)
 
+from .instrumentation import metrics
 
-def find_project_root(start_path: Optional[Union[str, Path]] = None,
-                      markers: Optional[List[str]] = None) -> Path:
-    default_markers = [".env", ".git", "pyproject.toml", "setup.py", "requirements.txt"]
-    markers = markers or default_markers
+DEFAULT_MARKERS = (".env", ".git", "pyproject.toml", "setup.py", "requirements.txt")
+DEFAULT_ROOT_CACHE_SIZE = 256
+
+_StatSignature = Optional[Tuple[int, int]]
+# (start directory, markers, PathBackend.cache_key())
+_CacheKey = Tuple[Path, Tuple[str, ...], Hashable]
+
+
+def _stat_signature(path: Path) -> _StatSignature:
+    if metrics.enabled:
+        metrics.inc("file_finder_stat_calls_total")
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_ino, st.st_mtime_ns
+
+
+class _RootCache:
+    """Process-wide LRU cache of project roots keyed by (directory, markers, backend).
+
+    Every entry remembers, with their inode and mtime, the marker that identified the
+    root and the directories walked through below the root. A hit stats them again and
+    the entry is discarded as soon as the marker is replaced, touched or removed, or a
+    name is added to or removed from one of those directories, e.g. the marker of a
+    nested project.
+    """
+
+    def __init__(self, maxsize: int = DEFAULT_ROOT_CACHE_SIZE):
+        self.maxsize = maxsize
+        self._entries: OrderedDict[_CacheKey, Tuple[Path, Tuple[Tuple[Path, _StatSignature], ...]]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, directory: Path, markers: Tuple[str, ...], backend_key: Hashable = None) -> Optional[Path]:
+        key = (directory, markers, backend_key)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+
+        root, checks = entry
+        for path, signature in checks:
+            if _stat_signature(path) != signature:
+                self._discard_root(root, markers, backend_key)
+                return None
+        return root
+
+    def put(self, directories: Sequence[Path], markers: Tuple[str, ...], root: Path, marker_path: Path,
+            backend_key: Hashable = None, signature_path: Optional[Callable[[Path], Path]] = None):
+        """Cache ``root`` for each of ``directories``, the walk from the start directory up to the root."""
+        if self.maxsize <= 0:
+            return
+        signatures: Dict[Path, _StatSignature] = {}
+
+        def check(path: Path) -> Tuple[Path, _StatSignature]:
+            if signature_path is not None:
+                path = signature_path(path)
+            if path not in signatures:
+                signatures[path] = _stat_signature(path)
+            return path, signatures[path]
+
+        marker_check = check(marker_path)
+        below_root = [check(directory) for directory in directories if directory != root]
+        with self._lock:
+            for index, directory in enumerate(directories):
+                key = (directory, markers, backend_key)
+                # The directories between this one and the root, deduplicated for archives
+                self._entries[key] = (root, tuple(dict.fromkeys([marker_check, *below_root[index:]])))
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def resize(self, maxsize: int):
+        with self._lock:
+            self.maxsize = maxsize
+            while len(self._entries) > max(maxsize, 0):
+                self._entries.popitem(last=False)
 
-    if start_path is None:
-        start_path = Path.cwd()
-    else:
-        start_path = Path(start_path).resolve()
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
 
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _discard_root(self, root: Path, markers: Tuple[str, ...], backend_key: Hashable):
+        with self._lock:
+            stale = [key for key, entry in self._entries.items()
+                     if key[1:] == (markers, backend_key) and entry[0] == root]
+            for key in stale:
+                del self._entries[key]
+
+
+_root_cache = _RootCache()
+
+
+def _reinit_after_fork():
+    # Another thread may have held the cache locks at fork time
+    _root_cache._lock = threading.Lock()
+    ZipBackend._instances_lock = threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reinit_after_fork)
+
+
+def clear_project_root_cache():
+    """Drop every cached project root."""
+    _root_cache.clear()
+
+
+def set_project_root_cache_size(maxsize: int):
+    """Bound the project root cache to ``maxsize`` entries (0 disables caching)."""
+    _root_cache.resize(maxsize)
+
+
+def _iter_ancestors(start_path: Path) -> Iterator[Path]:
     current_path = start_path
     while current_path.parent != current_path:  # Stop at root
-        if any((current_path / marker).exists() for marker in markers):
-            return current_path
+        yield current_path
         current_path = current_path.parent
 
+
+def _probe(directory: Path, names: Collection[str]) -> Set[str]:
+    if metrics.enabled:
+        metrics.inc("file_finder_stat_calls_total", len(names))
+    return {name for name in names if os.path.exists(os.path.join(directory, name))}
+
+
+def _scan_directory(directory: Path, wanted: Dict[str, str]) -> Set[str]:
+    """Return the names of ``wanted`` present in ``directory``.
+
+    ``wanted`` maps the case-normalised name to the name as requested. A single
+    name is probed with one stat; several names share one ``os.scandir`` listing
+    matched with set lookups. Unreadable directories fall back to probing.
+    """
+    if len(wanted) == 1:
+        return _probe(directory, wanted.values())
+
+    found = set()
+    if metrics.enabled:
+        metrics.inc("file_finder_scandir_calls_total")
+    try:
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                name = wanted.get(os.path.normcase(entry.name))
+                # exists() follows symlinks, so a dangling link is not a match
+                if name is not None and (not entry.is_symlink() or os.path.exists(entry.path)):
+                    found.add(name)
+    except OSError:
+        return _probe(directory, wanted.values())
+    return found
+
+
+def _walk_for_names(directories: Iterable[Path], names: Sequence[str], stop_at_first: bool,
+                    backend: Optional["PathBackend"] = None) -> Iterator[Tuple[Path, Set[str]]]:
+    """Yield ``(directory, matched names)`` for each directory containing any of ``names``.
+
+    Without a backend the directories are looked up on the filesystem.
+    """
+    if backend is not None:
+        for directory in directories:
+            found = backend.find_names(directory, names)
+            if found:
+                yield directory, found
+                if stop_at_first:
+                    return
+        return
+
+    listed = {os.path.normcase(name): name for name in names if os.sep not in name and "/" not in name}
+    nested = [name for name in names if name not in listed.values()]
+
+    for directory in directories:
+        found = _scan_directory(directory, listed) if listed else set()
+        if nested:
+            found |= _probe(directory, nested)
+        if found:
+            yield directory, found
+            if stop_at_first:
+                return
+
+
+class PathBackend:
+    """Where the finders look up names: the filesystem, a zip archive or a package's resources.
+
+    Subclasses implement ``find_names``. Paths inside an archive are written like
+    zipimport writes them, e.g. ``/srv/app.pyz/config/settings.toml``.
+    """
+
+    def find_names(self, directory: Path, names: Sequence[str]) -> Set[str]:
+        """Return the subset of ``names`` present in ``directory``."""
+        raise NotImplementedError
+
+    def default_start(self) -> Path:
+        """Directory the finders start from when no start path is given."""
+        return Path.cwd()
+
+    def signature_path(self, path: Path) -> Path:
+        """File whose inode and mtime tell whether ``path`` changed, for the project root cache."""
+        return path
+
+    def read_bytes(self, path: Path) -> bytes:
+        """Return the content of a file found through this backend."""
+        return Path(path).read_bytes()
+
+    def cache_key(self) -> Hashable:
+        """Identity of the tree looked up, part of the project root cache key."""
+        return self
+
+
+class FilesystemBackend(PathBackend):
+    """The real filesystem, used by default."""
+
+    def find_names(self, directory: Path, names: Sequence[str]) -> Set[str]:
+        return next((found for _, found in _walk_for_names([directory], names, stop_at_first=True)), set())
+
+    def cache_key(self) -> Hashable:
+        return None
+
+
+_FILESYSTEM = FilesystemBackend()
+
+
+class ZipBackend(PathBackend):
+    """The content of a zip archive, such as a zipapp or a PEX file.
+
+    The names of the archive are read once into a set holding every file and
+    every directory, so each lookup is a set membership test. Directories outside
+    the archive, e.g. the one holding it, are looked up on the filesystem. Use
+    ``ZipBackend.for_archive`` to share one index per archive file.
+
+    Args:
+        archive: Path of the zip file
+
+    Raises:
+        ValueError: If the file is not a zip archive
+    """
+
+    _instances: Dict[str, Tuple[_StatSignature, "ZipBackend"]] = {}  # noqa: RUF012
+    _instances_lock = threading.Lock()
+
+    def __init__(self, archive: Union[str, Path]):
+        import zipfile
+
+        self.archive = Path(archive).resolve()
+        self._prefix = str(self.archive) + os.sep
+        try:
+            with zipfile.ZipFile(self.archive) as zip_file:
+                filenames = zip_file.namelist()
+        except (OSError, zipfile.BadZipFile) as e:
+            raise ValueError(f"{archive} is not a readable zip archive: {e}") from e
+        if metrics.enabled:
+            metrics.inc("file_finder_zip_index_builds_total")
+        self.names: Set[str] = {""}
+        for filename in filenames:
+            name = filename.rstrip("/")
+            # Add the name, then its parent directories until one is known already
+            while name not in self.names:
+                self.names.add(name)
+                name = name.rpartition("/")[0]
+
+    @classmethod
+    def for_archive(cls, archive: Union[str, Path]) -> "ZipBackend":
+        """Return the shared backend of ``archive``, indexing it again only if the file changed."""
+        key = os.path.realpath(archive)
+        signature = _stat_signature(Path(key))
+        with cls._instances_lock:
+            entry = cls._instances.get(key)
+        if entry is not None and entry[0] == signature:
+            return entry[1]
+        backend = cls(key)
+        with cls._instances_lock:
+            cls._instances[key] = (signature, backend)
+        return backend
+
+    def _inner_name(self, path: Path) -> Optional[str]:
+        """Return the name of ``path`` inside the archive, "" for its root, or None outside it."""
+        text = str(path)
+        if text == self._prefix[:-1]:
+            return ""
+        if not text.startswith(self._prefix):
+            return None
+        return text[len(self._prefix):].replace(os.sep, "/")
+
+    def contains(self, path: Union[str, Path]) -> bool:
+        """Return True if ``path`` is a file or directory inside the archive."""
+        name = self._inner_name(Path(path))
+        return name is not None and name in self.names
+
+    def find_names(self, directory: Path, names: Sequence[str]) -> Set[str]:
+        prefix = self._inner_name(directory)
+        if prefix is None:
+            return _FILESYSTEM.find_names(directory, names)
+        if metrics.enabled:
+            metrics.inc("file_finder_zip_lookups_total", len(names))
+        if prefix:
+            prefix += "/"
+        return {name for name in names if prefix + name.replace(os.sep, "/") in self.names}
+
+    def default_start(self) -> Path:
+        return self.archive
+
+    def signature_path(self, path: Path) -> Path:
+        return self.archive if self._inner_name(path) is not None else path
+
+    def cache_key(self) -> Hashable:
+        return ("zip", self.archive)
+
+    def read_bytes(self, path: Path) -> bytes:
+        import zipfile
+
+        name = self._inner_name(Path(path))
+        if name is None:
+            return Path(path).read_bytes()
+        with zipfile.ZipFile(self.archive) as zip_file:
+            try:
+                return zip_file.read(name)
+            except KeyError:
+                raise FileNotFoundError(f"{path} not found in {self.archive}") from None
+
+
+class ResourceBackend(PathBackend):
+    """The files of an importable package, on the filesystem or inside a zip archive.
+
+    Lookups start in the package directory, as ``importlib.resources`` sees it.
+
+    Args:
+        package: Dotted name of the package
+
+    Raises:
+        ValueError: If the name is not a package, or its files are neither on the
+                    filesystem nor in a zip archive
+    """
+
+    def __init__(self, package: str):
+        import importlib
+
+        module = importlib.import_module(package)
+        locations = getattr(module.__spec__, "submodule_search_locations", None)
+        if not locations:
+            raise ValueError(f"'{package}' is not a package")
+        self.package = package
+        self.location = Path(next(iter(locations)))
+        backend = _backend_for(self.location)
+        if backend is None and not os.path.isdir(self.location):
+            raise ValueError(f"The files of package '{package}' are not on the filesystem or in a zip archive")
+        self.backend: PathBackend = backend or _FILESYSTEM
+
+    def find_names(self, directory: Path, names: Sequence[str]) -> Set[str]:
+        return self.backend.find_names(directory, names)
+
+    def default_start(self) -> Path:
+        return self.location
+
+    def signature_path(self, path: Path) -> Path:
+        return self.backend.signature_path(path)
+
+    def cache_key(self) -> Hashable:
+        return self.backend.cache_key()
+
+    def read_bytes(self, path: Path) -> bytes:
+        return self.backend.read_bytes(path)
+
+
+def _archive_of(path: Path) -> Optional[Path]:
+    """Return the zip file ``path`` lies in, or None if it lies in none."""
+    import zipfile
+
+    for candidate in (path, *path.parents):
+        if os.path.isdir(candidate):
+            return None
+        if os.path.isfile(candidate):
+            return candidate if zipfile.is_zipfile(candidate) else None
+    return None
+
+
+def _backend_for(start_path: Path) -> Optional[PathBackend]:
+    """Return the backend of a path inside a zip archive; None for the filesystem."""
+    if os.path.isdir(start_path):
+        return None
+    archive = _archive_of(start_path)
+    return ZipBackend.for_archive(archive) if archive is not None else None
+
+
+# __main__.__file__ -> the archive holding it, or None; looked up once per program
+_main_archives: Dict[str, Optional[Path]] = {}
+
+
+def running_archive() -> Optional[ZipBackend]:
+    """Return the backend of the zipapp or PEX file the program runs from, or None."""
+    main_file = getattr(sys.modules.get("__main__"), "__file__", None)
+    if not main_file:
+        return None
+    if main_file not in _main_archives:
+        _main_archives[main_file] = _archive_of(Path(os.path.abspath(main_file)))
+    archive = _main_archives[main_file]
+    return ZipBackend.for_archive(archive) if archive is not None else None
+
+
+def _search_start(start_path: Optional[Union[str, Path]],
+                  backend: Optional[PathBackend]) -> Tuple[Path, Optional[PathBackend]]:
+    """Return the directory to start from and the backend to search with; None means the filesystem.
+
+    Without a backend, a program running from a zip archive searches that archive:
+    from its root by default, and for start paths inside it. Other zip files, e.g.
+    wheels, are only searched through an explicit ``ZipBackend``.
+    """
+    start = Path(start_path).resolve() if start_path is not None else None
+    if backend is None:
+        backend = running_archive()
+        if backend is not None and start is not None and backend._inner_name(start) is None:
+            backend = None
+    if start is None:
+        start = backend.default_start() if backend is not None else Path.cwd()
+    if isinstance(backend, FilesystemBackend):
+        backend = None
+    return start, backend
+
+
+def find_markers(markers: Optional[List[str]] = None,
+                 start_path: Optional[Union[str, Path]] = None,
+                 backend: Optional[PathBackend] = None) -> Dict[str, Path]:
+    """Locate the nearest occurrence of every marker in a single ancestor walk.
+
+    Returns a mapping of marker name to its path; markers that were not found
+    are omitted. The walk stops as soon as every marker has been found.
+    """
+    markers = markers or list(DEFAULT_MARKERS)
+    if metrics.enabled:
+        metrics.inc("file_finder_marker_lookups_total")
+
+    start_path, backend = _search_start(start_path, backend)
+
+    remaining = list(dict.fromkeys(markers))
+    located: Dict[str, Path] = {}
+    directories = _iter_ancestors(start_path)
+    while remaining:
+        match = next(_walk_for_names(directories, remaining, stop_at_first=True, backend=backend), None)
+        if match is None:
+            break
+        directory, found = match
+        for name in found:
+            located[name] = directory / name
+        remaining = [name for name in remaining if name not in found]
+    return {marker: located[marker] for marker in markers if marker in located}
+
+
+def find_project_root(start_path: Optional[Union[str, Path]] = None,
+                      markers: Optional[List[str]] = None,
+                      use_cache: bool = True,
+                      backend: Optional[PathBackend] = None) -> Path:
+    markers = markers or list(DEFAULT_MARKERS)
+    marker_key = tuple(markers)
+
+    start_path, backend = _search_start(start_path, backend)
+    backend_key = backend.cache_key() if backend is not None else None
+
+    if metrics.enabled:
+        metrics.inc("file_finder_root_lookups_total")
+    if use_cache:
+        cached_root = _root_cache.get(start_path, marker_key, backend_key)
+        if metrics.enabled:
+            metrics.inc("file_finder_root_cache_hits_total" if cached_root is not None
+                        else "file_finder_root_cache_misses_total")
+        if cached_root is not None:
+            return cached_root
+
+    visited: List[Path] = []
+
+    def directories() -> Iterator[Path]:
+        for directory in _iter_ancestors(start_path):
+            visited.append(directory)
+            yield directory
+
+    for current_path, found in _walk_for_names(directories(), markers, stop_at_first=True, backend=backend):
+        if use_cache:
+            marker = next(marker for marker in markers if marker in found)
+            _root_cache.put(visited, marker_key, current_path, current_path / marker, backend_key,
+                            backend.signature_path if backend is not None else None)
+        return current_path
+
     raise FileNotFoundError(
         f"Project root not found. Searched for markers: {markers} "
         f"starting from {start_path}"
@@ -25,25 +509,19 @@ def find_project_root(start_path: Optional[Union[str, Path]] = None,
 
 def find_file_in_project(filename: str,
                          start_path: Optional[Union[str, Path]] = None,
-                         search_parents: bool = True) -> Path:
-    if start_path is None:
-        start_path = Path.cwd()
-    else:
-        start_path = Path(start_path).resolve()
-
-    current_path = start_path
-
-    # First check in the start directory
-    target_file = current_path / filename
-    if target_file.exists():
-        return target_file
+                         search_parents: bool = True,
+                         backend: Optional[PathBackend] = None) -> Path:
+    if metrics.enabled:
+        metrics.inc("file_finder_file_lookups_total")
+    start_path, backend = _search_start(start_path, backend)
 
+    # The start directory is always checked, even when it is the filesystem root
+    directories: Iterable[Path] = [start_path]
     if search_parents:
-        while current_path.parent != current_path:
-            target_file = current_path / filename
-            if target_file.exists():
-                return target_file
-            current_path = current_path.parent
+        directories = _iter_ancestors(start_path) if start_path.parent != start_path else directories
+
+    for current_path, _ in _walk_for_names(directories, [filename], stop_at_first=True, backend=backend):
+        return current_path / filename
 
     raise FileNotFoundError(
         f"File '{filename}' not found starting from {start_path}"
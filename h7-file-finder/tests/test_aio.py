@@ -0,0 +1,90 @@
+import asyncio
+import os
+import sys
+import tempfile
+import threading
+import time
+import unittest
+import zipfile
+from pathlib import Path
+from unittest.mock import patch
+
+# Add the src directory to the path so we can import the package
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from h7_file_finder import aio, path_finder
+
+
+class TestAio(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.root = Path(self.temp_dir.name).resolve()
+        (self.root / "sub").mkdir()
+        (self.root / ".env").write_text("KEY=value")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_lookups_match_sync_versions(self):
+        """Test that the awaitable lookups return the same paths as the blocking ones"""
+        async def lookups():
+            root = await aio.find_project_root(self.root / "sub", markers=[".env"])
+            env_file = await aio.find_file_in_project(".env", self.root / "sub")
+            return root, env_file
+
+        root, env_file = asyncio.run(lookups())
+        self.assertEqual(root, self.root)
+        self.assertEqual(env_file, self.root / ".env")
+
+    def test_lookups_through_backend(self):
+        """Test that the awaitable lookups pass the backend on"""
+        archive = self.root / "bundle.zip"
+        with zipfile.ZipFile(archive, "w") as zip_file:
+            zip_file.writestr("setup.py", "")
+            zip_file.writestr("pkg/data.txt", "")
+        backend = path_finder.ZipBackend.for_archive(archive)
+
+        async def lookups():
+            root = await aio.find_project_root(archive / "pkg", markers=["setup.py"], backend=backend)
+            data = await aio.find_file_in_project("data.txt", archive / "pkg", backend=backend)
+            return root, data
+
+        self.assertEqual(asyncio.run(lookups()), (archive, archive / "pkg" / "data.txt"))
+
+    def test_concurrent_lookups_share_one_walk(self):
+        """Test that concurrent calls with the same key run the lookup once"""
+        calls = []
+        real_find = path_finder.find_project_root
+
+        def slow_find(*args):
+            calls.append(threading.current_thread().name)
+            time.sleep(0.05)
+            return real_find(*args)
+
+        async def lookups():
+            return await asyncio.gather(*[
+                aio.find_project_root(self.root / "sub", markers=[".env"]) for _ in range(10)
+            ])
+
+        with patch.object(path_finder, "find_project_root", slow_find):
+            results = asyncio.run(lookups())
+
+        self.assertEqual(len(calls), 1)
+        self.assertTrue(calls[0].startswith("h7-file-finder"))
+        self.assertEqual(set(results), {self.root})
+        self.assertEqual(aio._inflight, {})
+
+    def test_errors_propagate_to_every_waiter(self):
+        """Test that a failed shared lookup raises in each caller"""
+        async def lookups():
+            return await asyncio.gather(*[
+                aio.find_file_in_project("missing.xyz", self.root, False) for _ in range(3)
+            ], return_exceptions=True)
+
+        results = asyncio.run(lookups())
+        self.assertTrue(all(isinstance(result, FileNotFoundError) for result in results))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,96 @@
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+# Add the src directory to the path so we can import the package
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from h7_file_finder import FileIndex, find_files
+
+
+class TestFindFiles(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.root = Path(self.temp_dir.name).resolve()
+        for relative_path in [
+            "settings.yaml",
+            "config/app.yaml",
+            "config/local/db.yaml",
+            "assets/logo.png",
+            "node_modules/lib/package.yaml",
+            ".venv/lib/site.yaml",
+            "custom_env/pyvenv.cfg",
+            "custom_env/lib/other.yaml",
+        ]:
+            path = self.root / relative_path
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text("")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_name_patterns_prune_ignored_directories(self):
+        """Test that name patterns match anywhere except inside ignored directories and venvs"""
+        found = find_files("*.yaml", root=self.root)
+        self.assertEqual(found, [
+            self.root / "config/app.yaml",
+            self.root / "config/local/db.yaml",
+            self.root / "settings.yaml",
+        ])
+
+    def test_path_patterns_match_relative_path(self):
+        """Test that patterns containing a slash match the path relative to the root"""
+        found = find_files(["config/*.yaml", "*.png"], root=self.root)
+        self.assertIn(self.root / "config/app.yaml", found)
+        self.assertIn(self.root / "assets/logo.png", found)
+        self.assertNotIn(self.root / "settings.yaml", found)
+
+    def test_path_pattern_wildcards_stay_within_a_segment(self):
+        """Test that * in a path pattern does not cross a slash, while ** spans directories"""
+        self.assertEqual(find_files("config/*.yaml", root=self.root), [self.root / "config/app.yaml"])
+        self.assertEqual(find_files("config/**/*.yaml", root=self.root),
+                         [self.root / "config/app.yaml", self.root / "config/local/db.yaml"])
+        self.assertEqual(find_files("*/local/db.yaml", root=self.root), [self.root / "config/local/db.yaml"])
+
+    def test_symlinked_directories_are_followed(self):
+        """Test that a symlink to a directory is indexed as a directory, without looping on cycles"""
+        try:
+            os.symlink(self.root / "config", self.root / "assets" / "linked", target_is_directory=True)
+            os.symlink(self.root, self.root / "config" / "loop", target_is_directory=True)
+        except (OSError, NotImplementedError):
+            self.skipTest("symlinks not supported")
+        index = FileIndex(self.root)
+        index.refresh()
+        self.assertIn(self.root / "assets/linked/app.yaml", index.match("assets/linked/*.yaml"))
+        self.assertEqual(index.match("linked"), [])
+        self.assertEqual(index.match("loop"), [])
+        self.assertEqual(index.match("app.yaml"), [self.root / "assets/linked/app.yaml", self.root / "config/app.yaml"])
+
+    def test_index_round_trip_and_incremental_refresh(self):
+        """Test that a saved index only re-lists directories whose mtime changed"""
+        index_path = self.root / "files.idx"
+        find_files("*.yaml", root=self.root, index_path=index_path)
+
+        index = FileIndex.load(index_path)
+        # Pretend the scan is old enough for every mtime to be trusted
+        index._dirs = {
+            relative_dir: entry._replace(mtime_ns=os.stat(self.root / relative_dir).st_mtime_ns)
+            for relative_dir, entry in index._dirs.items()
+        }
+        (self.root / "config/local/new.yaml").write_text("")
+        self.assertEqual(index.refresh(), 1)
+        self.assertIn(self.root / "config/local/new.yaml", index.match("new.yaml"))
+
+    def test_load_rejects_invalid_index(self):
+        """Test that loading garbage raises ValueError"""
+        index_path = self.root / "broken.idx"
+        index_path.write_bytes(b"not an index")
+        with self.assertRaises(ValueError):
+            FileIndex.load(index_path)
+
+
+if __name__ == '__main__':
+    unittest.main()
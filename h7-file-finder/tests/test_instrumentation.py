@@ -0,0 +1,98 @@
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+# Add the src directory to the path so we can import the package
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from h7_file_finder import MetricsRegistry, find_project_root, metrics, path_finder
+
+
+class TestMetricsRegistry(unittest.TestCase):
+
+    def setUp(self):
+        self.registry = MetricsRegistry(enabled=True)
+
+    def test_disabled_registry_records_nothing(self):
+        """Test that a disabled registry ignores counters and timings"""
+        registry = MetricsRegistry()
+        registry.inc("calls_total")
+        registry.observe("call_seconds", 0.5)
+        with registry.timer("block_seconds"):
+            pass
+        self.assertEqual(registry.snapshot(), {"counters": {}, "timings": {}})
+        self.assertEqual(registry.to_prometheus(), "")
+
+    def test_snapshot(self):
+        """Test that counters and timings are aggregated per name and labels"""
+        self.registry.inc("calls_total")
+        self.registry.inc("calls_total", 2)
+        self.registry.inc("drops_total", labels=(("reason", "full"),))
+        self.registry.observe("call_seconds", 0.25)
+        self.registry.observe("call_seconds", 0.75)
+        self.assertEqual(self.registry.counter("calls_total"), 3)
+        self.assertEqual(self.registry.snapshot(), {
+            "counters": {"calls_total": 3, 'drops_total{reason="full"}': 1},
+            "timings": {"call_seconds": {"count": 2, "sum": 1.0, "max": 0.75}},
+        })
+
+    def test_timer(self):
+        """Test that timer records one observation per block"""
+        with self.registry.timer("block_seconds", (("step", "load"),)):
+            pass
+        timing = self.registry.snapshot()["timings"]['block_seconds{step="load"}']
+        self.assertEqual(timing["count"], 1)
+        self.assertGreaterEqual(timing["sum"], 0.0)
+
+    def test_to_prometheus(self):
+        """Test the Prometheus text exposition output"""
+        self.registry.inc("drops_total", labels=(("reason", 'say "hi"'),))
+        self.registry.observe("call_seconds", 0.5)
+        self.assertEqual(self.registry.to_prometheus(), (
+            "# TYPE h7_drops_total counter\n"
+            'h7_drops_total{reason="say \\"hi\\""} 1\n'
+            "# TYPE h7_call_seconds summary\n"
+            "h7_call_seconds_count 1\n"
+            "h7_call_seconds_sum 0.5\n"
+            "# TYPE h7_call_seconds_max gauge\n"
+            "h7_call_seconds_max 0.5\n"
+        ))
+
+    def test_reset(self):
+        """Test that reset clears every metric"""
+        self.registry.inc("calls_total")
+        self.registry.reset()
+        self.assertEqual(self.registry.counter("calls_total"), 0)
+
+class TestPathFinderMetrics(unittest.TestCase):
+
+    def setUp(self):
+        path_finder.clear_project_root_cache()
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.root = Path(self.temp_dir.name).resolve()
+        self.deep = self.root / "a" / "b"
+        self.deep.mkdir(parents=True)
+        (self.root / ".root_marker").write_text("marker")
+        metrics.reset()
+        metrics.enable()
+
+    def tearDown(self):
+        metrics.disable()
+        metrics.reset()
+        self.temp_dir.cleanup()
+        path_finder.clear_project_root_cache()
+
+    def test_root_lookup_counters(self):
+        """Test that root lookups count directory listings and cache hits"""
+        markers = [".root_marker", "setup.py"]
+        find_project_root(start_path=self.deep, markers=markers)
+        find_project_root(start_path=self.deep, markers=markers)
+        self.assertEqual(metrics.counter("file_finder_root_lookups_total"), 2)
+        self.assertEqual(metrics.counter("file_finder_root_cache_misses_total"), 1)
+        self.assertEqual(metrics.counter("file_finder_root_cache_hits_total"), 1)
+        self.assertEqual(metrics.counter("file_finder_scandir_calls_total"), 3)
+
+if __name__ == '__main__':
+    unittest.main()
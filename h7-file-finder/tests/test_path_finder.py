@@ -2,11 +2,17 @@ import unittest
 from pathlib import Path
 import os
 import sys
+import tempfile
+import time
+import zipfile
+from unittest.mock import patch
 
 # Add the src directory to the path so we can import the package
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
 
-from h7_file_finder import find_project_root, find_file_in_project
+from h7_file_finder import find_project_root, find_file_in_project, find_markers
+from h7_file_finder import metrics, path_finder
+from h7_file_finder.path_finder import ResourceBackend, ZipBackend, running_archive
 
 class TestPathFinder(unittest.TestCase):
     
@@ -41,5 +47,228 @@ class TestPathFinder(unittest.TestCase):
                                 start_path=Path(__file__).parent,
                                 search_parents=False)
 
+class TestAncestorWalk(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.root = Path(self.temp_dir.name).resolve()
+        self.child = self.root / "pkg"
+        self.leaf = self.child / "sub"
+        self.leaf.mkdir(parents=True)
+        (self.root / ".git").mkdir()
+        (self.root / "pyproject.toml").write_text("")
+        (self.child / ".env").write_text("KEY=value")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_find_markers_returns_nearest_of_each(self):
+        """Test that find_markers locates every marker in one walk"""
+        found = find_markers([".env", ".git", "pyproject.toml", "setup.py"], start_path=self.leaf)
+        self.assertEqual(found, {
+            ".env": self.child / ".env",
+            ".git": self.root / ".git",
+            "pyproject.toml": self.root / "pyproject.toml",
+        })
+
+    def test_directory_listed_once_per_level(self):
+        """Test that the walk lists each ancestor once instead of probing every marker"""
+        listed = []
+        real_scandir = os.scandir
+
+        def recording_scandir(path):
+            listed.append(Path(path))
+            return real_scandir(path)
+
+        with patch("h7_file_finder.path_finder.os.scandir", recording_scandir):
+            root = find_project_root(start_path=self.leaf, markers=["setup.py", ".git"], use_cache=False)
+        self.assertEqual(root, self.root)
+        self.assertEqual(listed, [self.leaf, self.child, self.root])
+
+    def test_dangling_symlink_is_not_a_marker(self):
+        """Test that a broken symlink does not count as an existing marker"""
+        try:
+            os.symlink(self.root / "missing", self.leaf / "setup.py")
+        except (OSError, NotImplementedError):
+            self.skipTest("symlinks not supported")
+        root = find_project_root(start_path=self.leaf, markers=["setup.py", ".git"], use_cache=False)
+        self.assertEqual(root, self.root)
+
+    def test_find_file_in_project_searches_parents(self):
+        """Test that find_file_in_project walks up to the nearest match"""
+        self.assertEqual(find_file_in_project(".env", start_path=self.leaf), self.child / ".env")
+        with self.assertRaises(FileNotFoundError):
+            find_file_in_project(".env", start_path=self.leaf, search_parents=False)
+
+class TestProjectRootCache(unittest.TestCase):
+
+    def setUp(self):
+        path_finder.clear_project_root_cache()
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.root = Path(self.temp_dir.name).resolve()
+        self.deep = self.root / "a" / "b" / "c"
+        self.deep.mkdir(parents=True)
+        (self.root / ".root_marker").write_text("marker")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+        path_finder.set_project_root_cache_size(path_finder.DEFAULT_ROOT_CACHE_SIZE)
+        path_finder.clear_project_root_cache()
+
+    def test_intermediate_directories_are_cached(self):
+        """Test that one walk caches the root for every directory it passed through"""
+        root = find_project_root(start_path=self.deep, markers=[".root_marker"])
+        self.assertEqual(root, self.root)
+        self.assertEqual(len(path_finder._root_cache), 4)
+        self.assertEqual(path_finder._root_cache.get(self.root / "a", (".root_marker",)), self.root)
+
+    def test_cache_invalidated_when_marker_removed(self):
+        """Test that a cached root is dropped once its marker disappears"""
+        find_project_root(start_path=self.deep, markers=[".root_marker"])
+        (self.root / ".root_marker").unlink()
+        (self.root / "a" / ".root_marker").write_text("marker")
+        root = find_project_root(start_path=self.deep, markers=[".root_marker"])
+        self.assertEqual(root, self.root / "a")
+
+    def test_cache_invalidated_by_marker_below_root(self):
+        """Test that a marker added between the start directory and the cached root is found"""
+        self.assertEqual(find_project_root(start_path=self.deep, markers=[".root_marker"]), self.root)
+        (self.root / "a" / "b" / ".root_marker").write_text("nested")
+        self.assertEqual(find_project_root(start_path=self.deep, markers=[".root_marker"]), self.root / "a" / "b")
+        self.assertEqual(find_project_root(start_path=self.root / "a", markers=[".root_marker"]), self.root)
+
+    def test_cache_keyed_by_backend(self):
+        """Test that lookups through different backends do not share cache entries"""
+        deep = self.deep
+
+        class LeafBackend(path_finder.PathBackend):
+            def find_names(self, directory, names):
+                return set(names) if directory == deep else set()
+
+        backend = LeafBackend()
+        self.assertEqual(find_project_root(start_path=self.deep, markers=[".root_marker"], backend=backend), self.deep)
+        self.assertEqual(find_project_root(start_path=self.deep, markers=[".root_marker"]), self.root)
+        self.assertEqual(find_project_root(start_path=self.deep, markers=[".root_marker"], backend=backend), self.deep)
+
+    def test_cache_is_bounded(self):
+        """Test that the least recently used entries are evicted"""
+        path_finder.set_project_root_cache_size(2)
+        find_project_root(start_path=self.deep, markers=[".root_marker"])
+        self.assertEqual(len(path_finder._root_cache), 2)
+        self.assertIsNone(path_finder._root_cache.get(self.deep, (".root_marker",)))
+        self.assertEqual(path_finder._root_cache.get(self.root, (".root_marker",)), self.root)
+
+class TestArchiveBackends(unittest.TestCase):
+
+    def setUp(self):
+        path_finder.clear_project_root_cache()
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.base = Path(self.temp_dir.name).resolve()
+        (self.base / ".env").write_text("KEY=value")
+        self.archive = self.base / "app.pyz"
+        self.write_archive({
+            "pyproject.toml": "",
+            "zipped_pkg/__init__.py": "",
+            "zipped_pkg/sub/module.py": "",
+            "zipped_pkg/data.txt": "packaged data",
+            "config/settings.toml": "debug = true",
+        })
+
+    def tearDown(self):
+        path_finder.clear_project_root_cache()
+        self.temp_dir.cleanup()
+
+    def write_archive(self, files):
+        # A zipapp starts with a shebang line before the zip data
+        with open(self.archive, "wb") as stream:
+            stream.write(b"#!/usr/bin/env python3\n")
+            with zipfile.ZipFile(stream, "w") as zip_file:
+                for name, content in files.items():
+                    zip_file.writestr(name, content)
+
+    def run_from_archive(self):
+        """Pretend the program runs from the archive, as ``python app.pyz`` does."""
+        patcher = patch.object(sys.modules["__main__"], "__file__", str(self.archive / "__main__.py"), create=True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_lookups_inside_running_archive(self):
+        """Test that start paths inside the running archive find markers and files in it, then next to it"""
+        self.run_from_archive()
+        start = self.archive / "zipped_pkg" / "sub"
+        self.assertEqual(find_project_root(start_path=start), self.archive)
+        self.assertEqual(find_project_root(start_path=start), self.archive)
+        settings = find_file_in_project("config/settings.toml", start_path=start)
+        self.assertEqual(settings, self.archive / "config" / "settings.toml")
+        backend = ZipBackend.for_archive(self.archive)
+        self.assertEqual(backend.read_bytes(settings), b"debug = true")
+        self.assertTrue(backend.contains(self.archive / "zipped_pkg" / "sub"))
+        self.assertFalse(backend.contains(self.archive / "missing"))
+        # .env is not in the archive; the walk continues in the directory holding it
+        self.assertEqual(find_file_in_project(".env", start_path=start), self.base / ".env")
+        self.assertEqual(find_markers([".env", "pyproject.toml"], start_path=start),
+                         {".env": self.base / ".env", "pyproject.toml": self.archive / "pyproject.toml"})
+        with self.assertRaises(FileNotFoundError):
+            find_file_in_project("module.py", start_path=self.archive / "zipped_pkg", search_parents=False)
+
+    def test_default_start_is_running_archive(self):
+        """Test that lookups without a start path search the running archive, not the cwd"""
+        self.run_from_archive()
+        self.assertEqual(find_project_root(), self.archive)
+        self.assertEqual(path_finder.find_env_file(), self.base / ".env")
+        self.assertEqual(find_file_in_project("config/settings.toml"), self.archive / "config" / "settings.toml")
+
+    def test_other_zip_files_are_plain_files(self):
+        """Test that a zip file the program does not run from is only searched through an explicit backend"""
+        with patch("h7_file_finder.path_finder.os.path.isdir", side_effect=AssertionError("isdir called")):
+            self.assertEqual(find_project_root(start_path=self.archive, use_cache=False), self.base)
+            with self.assertRaises(FileNotFoundError):
+                find_file_in_project("config/settings.toml", start_path=self.archive)
+        backend = ZipBackend.for_archive(self.archive)
+        self.assertEqual(find_file_in_project("config/settings.toml", start_path=self.archive, backend=backend),
+                         self.archive / "config" / "settings.toml")
+
+    def test_index_built_once_per_archive_version(self):
+        """Test that the archive index is shared and only rebuilt after the archive changes"""
+        metrics.reset()
+        metrics.enable()
+        self.addCleanup(metrics.reset)
+        self.addCleanup(metrics.disable)
+        self.run_from_archive()
+        start = self.archive / "zipped_pkg"
+        for _ in range(3):
+            find_file_in_project("data.txt", start_path=start)
+            find_project_root(start_path=start, use_cache=False)
+        self.assertEqual(metrics.counter("file_finder_zip_index_builds_total"), 1)
+        self.assertIs(ZipBackend.for_archive(self.archive), ZipBackend.for_archive(str(self.archive)))
+
+        self.write_archive({"setup.py": "", "zipped_pkg/other.txt": ""})
+        os.utime(self.archive, ns=(time.time_ns(), time.time_ns() + 10**9))
+        self.assertEqual(find_file_in_project("other.txt", start_path=start), start / "other.txt")
+        self.assertEqual(metrics.counter("file_finder_zip_index_builds_total"), 2)
+        with self.assertRaises(ValueError):
+            ZipBackend(self.base / ".env")
+
+    def test_resource_backend_and_running_archive(self):
+        """Test lookups from a package imported from the archive and detection of the running zipapp"""
+        sys.path.insert(0, str(self.archive))
+        try:
+            backend = ResourceBackend("zipped_pkg")
+            self.assertEqual(backend.location, self.archive / "zipped_pkg")
+            found = find_file_in_project("data.txt", backend=backend)
+            self.assertEqual(backend.read_bytes(found), b"packaged data")
+            self.assertEqual(find_project_root(backend=backend), self.archive)
+        finally:
+            sys.path.remove(str(self.archive))
+            sys.modules.pop("zipped_pkg", None)
+        with self.assertRaises(ValueError):
+            ResourceBackend("os")
+
+        with patch.object(sys.modules["__main__"], "__file__", str(self.archive / "__main__.py"), create=True):
+            self.assertEqual(running_archive().archive, self.archive)
+        with patch.object(sys.modules["__main__"], "__file__", __file__, create=True):
+            self.assertIsNone(running_archive())
+
+
 if __name__ == '__main__':
     unittest.main()
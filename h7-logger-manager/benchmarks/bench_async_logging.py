@@ -0,0 +1,100 @@
+"""
+Benchmark: per-call logging latency of the synchronous and async LoggerManager modes.
+
+Several threads log DEBUG records (file handler only, the console handler filters
+them out) and every call is timed individually. The synchronous mode pays for
+formatting, the write and the rotation check on the calling thread; the async mode
+only pays for putting the record on the queue.
+
+Usage:
+    python benchmarks/bench_async_logging.py [--threads 4] [--records 20000]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import List
+
+for src in ('../src', '../../h7-env-manager/src', '../../h7-file-finder/src'):
+    sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), src)))
+
+from h7_env_manager import EnvManager  # noqa: E402
+
+from h7_logger_manager import LoggerManager  # noqa: E402
+
+MODES = {
+    "sync": {"async_logging": False},
+    "async (block)": {"async_logging": True, "async_overflow_policy": "block"},
+    "async (drop)": {"async_logging": True, "async_overflow_policy": "drop"},
+}
+
+
+def percentile(samples: List[int], fraction: float) -> float:
+    return samples[min(len(samples) - 1, int(len(samples) * fraction))] / 1000
+
+
+def run_mode(name: str, options: dict, logs_dir: Path, threads: int, records: int) -> dict:
+    LoggerManager._loggers = {}
+    LoggerManager._async_pipeline = None
+    for option, value in options.items():
+        setattr(LoggerManager, option, value)
+    logger_name = "bench_" + "".join(char for char in name if char.isalnum())
+    logger = LoggerManager.setup_logger(logger_name, logs_dir=logs_dir)
+
+    latencies: List[List[int]] = [[] for _ in range(threads)]
+    barrier = threading.Barrier(threads + 1)
+
+    def worker(samples: List[int]):
+        barrier.wait()
+        clock = time.perf_counter_ns
+        for index in range(records):
+            start = clock()
+            logger.debug("request %d handled for user %s in %.3f ms", index, "user@example.com", 1.234)
+            samples.append(clock() - start)
+
+    workers = [threading.Thread(target=worker, args=(samples,)) for samples in latencies]
+    for thread in workers:
+        thread.start()
+    start = time.perf_counter()
+    barrier.wait()
+    for thread in workers:
+        thread.join()
+    LoggerManager.shutdown()
+    elapsed = time.perf_counter() - start
+
+    samples = sorted(sample for thread_samples in latencies for sample in thread_samples)
+    dropped = LoggerManager._async_pipeline.dropped if LoggerManager._async_pipeline else 0
+    return {
+        "p50_us": percentile(samples, 0.50),
+        "p99_us": percentile(samples, 0.99),
+        "max_us": samples[-1] / 1000,
+        "records_per_s": len(samples) / elapsed,
+        "dropped": dropped,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--threads", type=int, default=4)
+    parser.add_argument("--records", type=int, default=20000, help="records per thread")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        project = Path(temp_dir)
+        (project / ".env").write_text("LOGGER_NAME=bench\nDEBUG_MODE=true\n")
+        os.chdir(project)
+        EnvManager.dotenv_parser = "native"
+
+        print(f"{'mode':<15} {'p50 us':>8} {'p99 us':>8} {'max us':>9} {'records/s':>11} {'dropped':>8}")
+        for name, options in MODES.items():
+            result = run_mode(name, options, project / "logs", args.threads, args.records)
+            print(f"{name:<15} {result['p50_us']:>8.1f} {result['p99_us']:>8.1f} {result['max_us']:>9.1f} "
+                  f"{result['records_per_s']:>11.0f} {result['dropped']:>8}")
+
+
+if __name__ == "__main__":
+    main()
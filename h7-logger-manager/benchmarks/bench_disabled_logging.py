@@ -0,0 +1,98 @@
+"""
+Benchmark: cost of disabled logging calls through the stdlib Logger and FastLogger.
+
+A LoggerManager logger gets its console handler at INFO and its file handler raised
+to INFO too, so DEBUG calls are dropped by every handler while the logger itself
+still allows them. The stdlib Logger then creates a LogRecord for nothing; FastLogger
+returns after comparing its cached threshold. Each case is also timed with an
+expensive argument, passed eagerly (an f-string) or lazily (a callable or ``lazy``).
+A logger level above DEBUG, which the stdlib already short-circuits, is shown for
+comparison.
+
+Usage:
+    python benchmarks/bench_disabled_logging.py [--calls 1000000]
+"""
+
+import argparse
+import logging
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+for src in ('../src', '../../h7-env-manager/src', '../../h7-file-finder/src'):
+    sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), src)))
+
+from h7_env_manager import EnvManager  # noqa: E402
+
+from h7_logger_manager import FastLogger, LoggerManager, lazy  # noqa: E402
+from h7_logger_manager.fast_logger import set_handler_level  # noqa: E402
+
+PAYLOAD = {"user": "user@example.com", "items": list(range(20)), "total": 1.234}
+
+
+def time_calls(func, calls: int) -> float:
+    """Mean nanoseconds per call of ``func``, best of three rounds."""
+    best = float("inf")
+    for _ in range(3):
+        start = time.perf_counter_ns()
+        for _ in range(calls):
+            func()
+        best = min(best, (time.perf_counter_ns() - start) / calls)
+    return best
+
+
+def run_cases(stdlib: logging.Logger, fast: FastLogger, calls: int) -> dict:
+    return {
+        "constant message": (
+            time_calls(lambda: stdlib.debug("request handled"), calls),
+            time_calls(lambda: fast.debug("request handled"), calls),
+        ),
+        "%-style arguments": (
+            time_calls(lambda: stdlib.debug("request %d for %s", 17, "user@example.com"), calls),
+            time_calls(lambda: fast.debug("request %d for %s", 17, "user@example.com"), calls),
+        ),
+        "expensive argument": (
+            time_calls(lambda: stdlib.debug(f"payload {PAYLOAD!r}"), calls),
+            time_calls(lambda: fast.debug(lambda: f"payload {PAYLOAD!r}"), calls),
+        ),
+        "lazy() argument": (
+            time_calls(lambda: stdlib.debug("payload %s", repr(PAYLOAD)), calls),
+            time_calls(lambda: fast.debug("payload %s", lazy(repr, PAYLOAD)), calls),
+        ),
+    }
+
+
+def print_cases(title: str, cases: dict):
+    print(f"\n{title}")
+    print(f"{'case':<20} {'stdlib ns':>10} {'fast ns':>10} {'speedup':>8}")
+    for name, (stdlib_ns, fast_ns) in cases.items():
+        print(f"{name:<20} {stdlib_ns:>10.1f} {fast_ns:>10.1f} {stdlib_ns / fast_ns:>7.1f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--calls", type=int, default=1000000, help="calls per case and round")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        project = Path(temp_dir)
+        (project / ".env").write_text("LOGGER_NAME=bench\nDEBUG_MODE=true\n")
+        os.chdir(project)
+        EnvManager.dotenv_parser = "native"
+        try:
+            fast = LoggerManager.setup_fast_logger("bench_disabled", logs_dir=project / "logs")
+            stdlib = fast.logger
+            for handler in stdlib.handlers:
+                set_handler_level(handler, logging.INFO)
+            print_cases("DEBUG below every handler level", run_cases(stdlib, fast, args.calls))
+
+            fast.setLevel(logging.INFO)
+            print_cases("DEBUG below the logger level", run_cases(stdlib, fast, args.calls))
+        finally:
+            LoggerManager.close_all()
+
+
+if __name__ == "__main__":
+    main()
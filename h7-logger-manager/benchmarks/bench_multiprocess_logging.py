@@ -0,0 +1,97 @@
+"""
+Benchmark: throughput of the multi-process logging mode with 8 to 32 producer processes.
+
+Every producer process sets up the same logger and logs DEBUG records (file handler
+only). In "aggregated" mode the records go to the single aggregator process, which
+does all writing and rotation; in "direct" mode every process writes and rotates
+the shared log file itself, the unsafe setup the aggregator replaces. The lines
+found in the log files afterwards show how many records survived.
+
+Usage:
+    python benchmarks/bench_multiprocess_logging.py [--producers 8 16 32] [--records 5000]
+"""
+
+import argparse
+import logging
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+for src in ('../src', '../../h7-env-manager/src', '../../h7-file-finder/src'):
+    sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), src)))
+
+from h7_env_manager import EnvManager  # noqa: E402
+
+from h7_logger_manager import LoggerManager, logger_manager  # noqa: E402
+
+
+def produce(logs_dir: Path, records: int, start_event):
+    # Rotation races in direct mode raise errors from the handlers; only count the damage
+    logging.raiseExceptions = False
+    LoggerManager._loggers = {}
+    logger = LoggerManager.setup_logger("bench_mp", logs_dir=logs_dir)
+    logger.handlers[0].setLevel(100)
+    start_event.wait()
+    for index in range(records):
+        logger.debug("request %d handled for user %s in %.3f ms", index, "user@example.com", 1.234)
+    for handler in logger.handlers:
+        handler.close()
+
+
+def count_lines(logs_dir: Path) -> int:
+    total = 0
+    for path in logs_dir.iterdir():
+        with open(path, "rb") as stream:
+            total += sum(chunk.count(b"\n") for chunk in iter(lambda: stream.read(1 << 20), b""))
+    return total
+
+
+def run(mode: str, producers: int, records: int, logs_dir: Path) -> dict:
+    logs_dir.mkdir()
+    if mode == "aggregated":
+        LoggerManager.start_log_aggregator()
+    context = multiprocessing.get_context("fork")
+    start_event = context.Event()
+    processes = [context.Process(target=produce, args=(logs_dir, records, start_event)) for _ in range(producers)]
+    for process in processes:
+        process.start()
+    start = time.perf_counter()
+    start_event.set()
+    for process in processes:
+        process.join()
+    if mode == "aggregated":
+        LoggerManager.stop_log_aggregator()
+    elapsed = time.perf_counter() - start
+
+    expected = producers * records
+    written = count_lines(logs_dir)
+    return {"records_per_s": expected / elapsed, "lost": expected - written, "files": len(list(logs_dir.iterdir()))}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--producers", type=int, nargs="+", default=[8, 16, 32])
+    parser.add_argument("--records", type=int, default=5000, help="records per producer")
+    parser.add_argument("--max-bytes", type=int, default=1024 * 1024, help="rotation size of the log files")
+    args = parser.parse_args()
+    logger_manager.LOG_FILE_MAX_BYTES = args.max_bytes
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        project = Path(temp_dir)
+        (project / ".env").write_text("LOGGER_NAME=bench\nDEBUG_MODE=true\n")
+        os.chdir(project)
+        EnvManager.dotenv_parser = "native"
+
+        print(f"{'mode':<11} {'producers':>9} {'records/s':>11} {'lost':>8} {'files':>6}")
+        for producers in args.producers:
+            for mode in ("aggregated", "direct"):
+                result = run(mode, producers, args.records, project / f"logs_{mode}_{producers}")
+                print(f"{mode:<11} {producers:>9} {result['records_per_s']:>11.0f} "
+                      f"{result['lost']:>8} {result['files']:>6}")
+
+
+if __name__ == "__main__":
+    main()
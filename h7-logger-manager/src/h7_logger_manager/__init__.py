@@ -2,10 +2,50 @@
 Documentation for the h7_logger_manager package.
 
 This package provides utilities for logging management in a project.
+The package-level names are imported lazily, on first access, so importing the
+package does not load h7_env_manager, h7_file_finder or logging.handlers.
 """
 
+# typing.TYPE_CHECKING without importing typing, which costs more than the package itself
+TYPE_CHECKING = False
+
 # Package version
 __version__ = "1.0.0"
 
-# Import main class to make it available at package level
-from .logger_manager import LoggerManager as LoggerManager
+# Package-level name -> module defining it (relative names are submodules)
+_LAZY_ATTRIBUTES = {
+    "LoggerManager": ".logger_manager",
+    "FastLogger": ".fast_logger",
+    "lazy": ".fast_logger",
+    # The metrics registry shared by the h7 packages
+    "metrics": "h7_file_finder.instrumentation",
+    "MetricsRegistry": "h7_file_finder.instrumentation",
+}
+
+__all__ = ["__version__"]
+__all__.extend(_LAZY_ATTRIBUTES)
+
+if TYPE_CHECKING:
+    from h7_file_finder.instrumentation import MetricsRegistry as MetricsRegistry
+    from h7_file_finder.instrumentation import metrics as metrics
+
+    from .fast_logger import FastLogger as FastLogger
+    from .fast_logger import lazy as lazy
+    from .logger_manager import LoggerManager as LoggerManager
+
+
+# Defined here rather than shared through h7_file_finder, which importing the package must not load
+def __getattr__(name):
+    module_name = _LAZY_ATTRIBUTES.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    if module_name.startswith("."):
+        module_name = __name__ + module_name
+    # The import statement machinery, unlike importlib.import_module, shows up in -X importtime
+    value = getattr(__import__(module_name, fromlist=[name]), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_ATTRIBUTES))
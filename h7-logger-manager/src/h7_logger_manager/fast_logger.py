@@ -0,0 +1,226 @@
+"""
+Logger wrapper that skips disabled calls before any record, message or argument is built.
+
+``Logger.isEnabledFor`` only knows the logger levels: a DEBUG call on a logger whose
+handlers are all at INFO still creates a LogRecord, runs the filters and walks the
+handlers before being dropped. FastLogger caches the lowest level that any handler
+would emit (taking the logger levels, ``logging.disable``, propagation and the handlers
+behind the async queue into account), so a disabled call costs one comparison.
+
+The cached threshold is invalidated by a global generation counter. LoggerManager
+bumps it whenever it adds or removes handlers, and so do ``FastLogger.setLevel`` and
+:func:`set_handler_level`; code changing levels directly on loggers or handlers, or
+calling ``logging.disable``, calls :func:`invalidate_level_cache` afterwards.
+
+Messages and arguments may be computed lazily, only when the record is emitted:
+
+    logger = FastLogger(LoggerManager.setup_logger())
+    logger.debug(lambda: f"state={expensive_dump()}")
+    logger.debug("payload %s", lazy(json.dumps, payload, indent=2))
+"""
+
+import logging
+import sys
+from typing import Any, Callable, Optional
+
+# Bumped on every change that may affect the level of a logger or handler
+_generation = 0
+
+# Threshold of a logger that emits nothing
+_NEVER = logging.CRITICAL + 1000
+
+# Logger._log takes a stacklevel from Python 3.8
+_HAS_STACKLEVEL = sys.version_info >= (3, 8)
+
+# Frames of this wrapper between the caller and Logger._log that stacklevel must skip:
+# from 3.11 findCaller counts from the wrapper frame calling Logger._log, before that
+# from the frame above it
+_WRAPPER_FRAMES = 2 if sys.version_info >= (3, 11) else 1
+
+
+def invalidate_level_cache():
+    """Make every FastLogger recompute its threshold on its next call."""
+    global _generation
+    _generation += 1
+
+
+def set_handler_level(handler: logging.Handler, level):
+    """Set the level of a handler and invalidate the cached thresholds."""
+    handler.setLevel(level)
+    invalidate_level_cache()
+
+
+class lazy:
+    """
+    Message argument computed by calling ``func(*args, **kwargs)`` when the record is emitted.
+    A disabled call never calls it; an emitted record calls it once, whatever the number of handlers.
+    """
+
+    __slots__ = ("args", "func", "kwargs")
+
+    def __init__(self, func: Callable[..., Any], *args, **kwargs):
+        """Store the call made when the record is emitted."""
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+
+    def __call__(self) -> Any:
+        """Return ``func(*args, **kwargs)``."""
+        return self.func(*self.args, **self.kwargs)
+
+
+def _handler_levels(handler: logging.Handler):
+    """Levels of the handlers that will see records passed to ``handler``."""
+    # Records put on the async queue are routed to the real handlers of the logger
+    routed = getattr(handler, "routed", None)
+    if routed:
+        return [max(handler.level, routed_handler.level) for routed_handler in routed]
+    return [handler.level]
+
+
+def emit_threshold(logger: logging.Logger) -> int:
+    """Return the lowest level at which a record logged on ``logger`` reaches a handler."""
+    if logger.disabled:
+        return _NEVER
+    threshold = max(logger.getEffectiveLevel(), logger.manager.disable + 1)
+
+    levels = []
+    current: Optional[logging.Logger] = logger
+    while current is not None:
+        for handler in current.handlers:
+            levels.extend(_handler_levels(handler))
+        if not current.propagate:
+            break
+        current = current.parent
+    if not levels and logging.lastResort is not None:
+        # Logger.callHandlers falls back on logging.lastResort without any handler
+        levels.append(logging.lastResort.level)
+    if not levels:
+        return _NEVER
+    return max(threshold, min(levels))
+
+
+class FastLogger:
+    """
+    Wrapper of a logging.Logger whose disabled calls return before building anything.
+
+    Messages may be callables returning the message, and arguments may be :class:`lazy`;
+    both are only called for records that are emitted. Other Logger attributes are
+    available through the wrapper.
+
+    Args:
+        logger: The logger to wrap, e.g. from LoggerManager.setup_logger
+    """
+
+    __slots__ = ("_generation", "_threshold", "logger")
+
+    def __init__(self, logger: logging.Logger):
+        """Wrap logger; its threshold is computed on the first call."""
+        self.logger = logger
+        self._threshold = _NEVER
+        # Stale, so the first call computes the threshold
+        self._generation = -1
+
+    def __getattr__(self, name):
+        """Return the attributes of the wrapped logger."""
+        return getattr(self.logger, name)
+
+    def __repr__(self) -> str:
+        """Name the wrapped logger."""
+        return f"<FastLogger {self.logger.name}>"
+
+    @property
+    def threshold(self) -> int:
+        """Lowest level that would currently be emitted."""
+        if self._generation != _generation:
+            self._refresh()
+        return self._threshold
+
+    def _refresh(self):
+        generation = _generation
+        self._threshold = emit_threshold(self.logger)
+        self._generation = generation
+
+    def isEnabledFor(self, level: int) -> bool:
+        """Return whether a record at level would reach a handler."""
+        return level >= self.threshold
+
+    def setLevel(self, level):
+        """Set the level of the wrapped logger and invalidate the cached thresholds."""
+        self.logger.setLevel(level)
+        invalidate_level_cache()
+
+    def _log(self, level: int, msg, args, exc_info=None, extra=None, stack_info=False, stacklevel=1):
+        if level < self.threshold:
+            return
+        if callable(msg):
+            msg = msg()
+        if args:
+            args = tuple(arg() if type(arg) is lazy else arg for arg in args)
+        if _HAS_STACKLEVEL:
+            self.logger._log(level, msg, args, exc_info=exc_info, extra=extra, stack_info=stack_info,
+                             stacklevel=stacklevel + _WRAPPER_FRAMES)
+        else:
+            self._log_from_caller(level, msg, args, exc_info, extra, stack_info, stacklevel)
+
+    def _log_from_caller(self, level: int, msg, args, exc_info, extra, stack_info, stacklevel):
+        """Logger._log for Python 3.7, whose findCaller cannot skip the frames of this wrapper."""
+        # This method, _log and the level method sit above the caller
+        frame = sys._getframe(2 + stacklevel)
+        if exc_info:
+            if isinstance(exc_info, BaseException):
+                exc_info = (type(exc_info), exc_info, exc_info.__traceback__)
+            elif not isinstance(exc_info, tuple):
+                exc_info = sys.exc_info()
+        sinfo = None
+        if stack_info:
+            import traceback
+
+            sinfo = "Stack (most recent call last):\n" + "".join(traceback.format_stack(frame)).rstrip("\n")
+        logger = self.logger
+        record = logger.makeRecord(logger.name, level, frame.f_code.co_filename, frame.f_lineno, msg, args,
+                                   exc_info, frame.f_code.co_name, extra, sinfo)
+        logger.handle(record)
+
+    # Each method compares the cached threshold inline: a disabled call is one call and two comparisons
+    def debug(self, msg, *args, **kwargs):
+        """Log msg % args at DEBUG level, if enabled."""
+        if self._generation == _generation and self._threshold > logging.DEBUG:
+            return
+        self._log(logging.DEBUG, msg, args, **kwargs)
+
+    def info(self, msg, *args, **kwargs):
+        """Log msg % args at INFO level, if enabled."""
+        if self._generation == _generation and self._threshold > logging.INFO:
+            return
+        self._log(logging.INFO, msg, args, **kwargs)
+
+    def warning(self, msg, *args, **kwargs):
+        """Log msg % args at WARNING level, if enabled."""
+        if self._generation == _generation and self._threshold > logging.WARNING:
+            return
+        self._log(logging.WARNING, msg, args, **kwargs)
+
+    def error(self, msg, *args, **kwargs):
+        """Log msg % args at ERROR level, if enabled."""
+        if self._generation == _generation and self._threshold > logging.ERROR:
+            return
+        self._log(logging.ERROR, msg, args, **kwargs)
+
+    def exception(self, msg, *args, exc_info=True, **kwargs):
+        """Log msg % args at ERROR level with the current exception, if enabled."""
+        if self._generation == _generation and self._threshold > logging.ERROR:
+            return
+        self._log(logging.ERROR, msg, args, exc_info=exc_info, **kwargs)
+
+    def critical(self, msg, *args, **kwargs):
+        """Log msg % args at CRITICAL level, if enabled."""
+        if self._generation == _generation and self._threshold > logging.CRITICAL:
+            return
+        self._log(logging.CRITICAL, msg, args, **kwargs)
+
+    def log(self, level: int, msg, *args, **kwargs):
+        """Log msg % args at level, if enabled."""
+        if self._generation == _generation and self._threshold > level:
+            return
+        self._log(level, msg, args, **kwargs)
@@ -0,0 +1,178 @@
+"""
+Logger filters that cut the volume of hot-path logging before records are formatted.
+
+The filters are attached to the logger itself, so they run on the raw record, before
+any handler formats the message, queues it or writes it:
+
+    SamplingFilter: keeps a random fraction of the records of each configured level
+    RateLimitFilter: token bucket per call site (file and line)
+    DeduplicationFilter: collapses consecutive identical messages into one
+                         "Last message repeated N times" record
+"""
+
+import logging
+import random
+import threading
+import time
+from typing import Dict, Mapping, Optional, Tuple
+
+from h7_file_finder.instrumentation import metrics
+
+# Attribute marking the summary records of DeduplicationFilter, which every filter lets through
+_SUMMARY_ATTRIBUTE = "_h7_summary"
+
+
+def parse_sample_rates(entries) -> Dict[int, float]:
+    """
+    Parse "LEVEL:RATE" entries, e.g. ["DEBUG:0.1", "INFO:0.5"], into a level to rate mapping.
+
+    Raises:
+        ValueError: If an entry is malformed, names an unknown level or has a rate outside [0, 1]
+    """
+    rates = {}
+    for entry in entries:
+        level_name, separator, rate_text = entry.partition(":")
+        level = logging.getLevelName(level_name.strip().upper())
+        if not separator or not isinstance(level, int):
+            raise ValueError(f"Invalid sample rate '{entry}', expected 'LEVEL:RATE'")
+        rate = float(rate_text)
+        if not 0.0 <= rate <= 1.0:
+            raise ValueError(f"Invalid sample rate '{entry}', the rate must be between 0 and 1")
+        rates[level] = rate
+    return rates
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Keep each record of a configured level with the given probability.
+
+    Args:
+        rates: Fraction of records to keep per level, e.g. {logging.DEBUG: 0.1};
+               levels without a rate are always kept
+    """
+
+    def __init__(self, rates: Mapping[int, float]):
+        """Create the filter for the given rates."""
+        super().__init__()
+        self.rates = dict(rates)
+        self._random = random.random
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        """Return whether the record is kept by the sampling of its level."""
+        rate = self.rates.get(record.levelno)
+        if rate is None or rate >= 1.0 or getattr(record, _SUMMARY_ATTRIBUTE, False):
+            return True
+        if self._random() < rate:
+            return True
+        if metrics.enabled:
+            metrics.inc("logger_records_dropped_total", labels=(("reason", "sampled"),))
+        return False
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    Limit each call site to ``rate`` records per second, with bursts of up to ``burst``.
+
+    Records above ``max_level`` are never limited. The number of records discarded is
+    available as ``suppressed``.
+    """
+
+    def __init__(self, rate: float, burst: Optional[int] = None, max_level: int = logging.INFO):
+        """
+        Create the filter; ``burst`` defaults to the rate, and to at least one record.
+
+        Raises:
+            ValueError: If the rate is not positive
+        """
+        super().__init__()
+        if rate <= 0:
+            raise ValueError("The rate limit must be positive")
+        self.rate = rate
+        self.burst = float(burst if burst is not None else max(1.0, rate))
+        self.max_level = max_level
+        self.suppressed = 0
+        # call site -> (tokens, time of the last refill)
+        self._buckets: Dict[Tuple[str, int], Tuple[float, float]] = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        """Return whether the call site of the record has a token left, taking it."""
+        if record.levelno > self.max_level or getattr(record, _SUMMARY_ATTRIBUTE, False):
+            return True
+        site = (record.pathname, record.lineno)
+        now = time.monotonic()
+        with self._lock:
+            tokens, last = self._buckets.get(site, (self.burst, now))
+            tokens = min(self.burst, tokens + (now - last) * self.rate)
+            if tokens >= 1.0:
+                self._buckets[site] = (tokens - 1.0, now)
+                return True
+            self._buckets[site] = (tokens, now)
+            self.suppressed += 1
+        if metrics.enabled:
+            metrics.inc("logger_records_dropped_total", labels=(("reason", "rate_limited"),))
+        return False
+
+
+class DeduplicationFilter(logging.Filter):
+    """
+    Drop records identical to the previous one of the logger (same level, message and arguments).
+
+    When a different record arrives, or the same one after ``window`` seconds, a
+    "Last message repeated N times" record is logged first. The message is compared
+    before formatting, on the format string and its arguments.
+    """
+
+    def __init__(self, window: float = 60.0):
+        """Create the filter; ``window`` is the longest run of repeats collapsed into one summary."""
+        super().__init__()
+        self.window = window
+        self._last: Optional[logging.LogRecord] = None
+        self._repeated = 0
+        self._first_repeat = 0.0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _same(first: logging.LogRecord, second: logging.LogRecord) -> bool:
+        try:
+            return (first.levelno == second.levelno and first.name == second.name
+                    and first.msg == second.msg and first.args == second.args)
+        except Exception:
+            return False
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        """Return whether the record differs from the previous one, logging the pending summary first."""
+        if getattr(record, _SUMMARY_ATTRIBUTE, False):
+            return True
+        with self._lock:
+            last, repeated = self._last, self._repeated
+            if last is not None and self._same(last, record):
+                if repeated == 0:
+                    self._first_repeat = record.created
+                if record.created - self._first_repeat < self.window:
+                    self._repeated += 1
+                    if metrics.enabled:
+                        metrics.inc("logger_records_dropped_total", labels=(("reason", "deduplicated"),))
+                    return False
+            self._last = record
+            self._repeated = 0
+        if repeated:
+            self._log_summary(last, repeated)
+        return True
+
+    def flush(self):
+        """Log the summary of the pending repeats, e.g. before shutting down."""
+        with self._lock:
+            last, repeated = self._last, self._repeated
+            self._last, self._repeated = None, 0
+        if repeated:
+            self._log_summary(last, repeated)
+
+    @staticmethod
+    def _log_summary(record: logging.LogRecord, repeated: int):
+        summary = logging.LogRecord(
+            record.name, record.levelno, record.pathname, record.lineno,
+            "Last message repeated %d times", (repeated,), None, record.funcName,
+        )
+        setattr(summary, _SUMMARY_ATTRIBUTE, True)
+        logging.getLogger(record.name).handle(summary)
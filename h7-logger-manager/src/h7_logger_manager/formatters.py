@@ -0,0 +1,297 @@
+"""
+Structured log formatters: JSON lines and length-prefixed msgpack records.
+
+Both formatters emit the fields time, level, logger and message, followed by any
+``extra`` fields passed to the logging call, and exc_info / stack_info when present.
+An extra field named like one of these fields is emitted with an ``extra_`` prefix,
+e.g. ``extra={"level": 3}`` becomes ``"extra_level": 3``.
+The per-level and per-logger fragments are encoded once and reused, and the
+timestamp text is computed once per second, so formatting a record is mostly
+string joining.
+"""
+
+import json
+import logging
+import struct
+import time
+from typing import Any, BinaryIO, Dict, Iterator, Tuple
+
+# Attributes every LogRecord has; anything else on a record came from ``extra``
+_RECORD_ATTRIBUTES = frozenset(vars(logging.makeLogRecord({}))) | {"message", "asctime"}
+
+# Fields the formatters write themselves; extra fields with these names are prefixed
+_RESERVED_FIELDS = frozenset({"time", "level", "logger", "message", "exc_info", "stack_info"})
+
+_json_encode = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"), default=str).encode
+
+
+class _TimestampCache:
+    """ISO-8601 timestamps with the date/time text formatted once per second."""
+
+    def __init__(self, utc: bool = False):
+        self._convert = time.gmtime if utc else time.localtime
+        self._suffix = "Z" if utc else ""
+        self._cached: Tuple[int, str] = (-1, "")
+
+    def __call__(self, created: float, msecs: float) -> str:
+        second = int(created)
+        cached_second, text = self._cached
+        if second != cached_second:
+            text = time.strftime("%Y-%m-%dT%H:%M:%S", self._convert(second))
+            self._cached = (second, text)
+        return f"{text}.{int(msecs):03d}{self._suffix}"
+
+
+def _extra_fields(record: logging.LogRecord) -> Iterator[Tuple[str, Any]]:
+    for key, value in record.__dict__.items():
+        if key not in _RECORD_ATTRIBUTES and not key.startswith("_"):
+            yield (f"extra_{key}" if key in _RESERVED_FIELDS else key), value
+
+
+class JsonFormatter(logging.Formatter):
+    """Format records as single-line JSON objects."""
+
+    def __init__(self, utc: bool = False):
+        """Create the formatter; timestamps are in UTC with a Z suffix when utc is true."""
+        super().__init__()
+        self._timestamp = _TimestampCache(utc)
+        self._level_fragments: Dict[int, str] = {}
+        self._logger_fragments: Dict[str, str] = {}
+
+    def _level_fragment(self, record: logging.LogRecord) -> str:
+        fragment = self._level_fragments.get(record.levelno)
+        if fragment is None:
+            fragment = self._level_fragments[record.levelno] = f',"level":{_json_encode(record.levelname)}'
+        return fragment
+
+    def _logger_fragment(self, record: logging.LogRecord) -> str:
+        fragment = self._logger_fragments.get(record.name)
+        if fragment is None:
+            fragment = self._logger_fragments[record.name] = f',"logger":{_json_encode(record.name)}'
+        return fragment
+
+    def format(self, record: logging.LogRecord) -> str:
+        """Return the record as one JSON object, without a trailing newline."""
+        parts = [
+            '{"time":"', self._timestamp(record.created, record.msecs), '"',
+            self._level_fragment(record),
+            self._logger_fragment(record),
+            ',"message":', _json_encode(record.getMessage()),
+        ]
+        for key, value in _extra_fields(record):
+            parts += [",", _json_encode(key), ":", _json_encode(value)]
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            parts += [',"exc_info":', _json_encode(record.exc_text)]
+        if record.stack_info:
+            parts += [',"stack_info":', _json_encode(record.stack_info)]
+        parts.append("}")
+        return "".join(parts)
+
+
+def _pack_int(obj: int) -> bytes:
+    if 0 <= obj < 0x80:
+        return bytes((obj,))
+    if -32 <= obj < 0:
+        return struct.pack(">b", obj)
+    if 0 <= obj < 1 << 64:
+        return b"\xcf" + struct.pack(">Q", obj)
+    if -(1 << 63) <= obj < 0:
+        return b"\xd3" + struct.pack(">q", obj)
+    return packb(str(obj))
+
+
+def _pack_str(obj: str) -> bytes:
+    data = obj.encode("utf-8", "surrogateescape")
+    size = len(data)
+    if size < 32:
+        return bytes((0xa0 | size,)) + data
+    if size < 1 << 8:
+        return b"\xd9" + bytes((size,)) + data
+    if size < 1 << 16:
+        return b"\xda" + struct.pack(">H", size) + data
+    return b"\xdb" + struct.pack(">I", size) + data
+
+
+def _pack_array(obj) -> bytes:
+    header = bytes((0x90 | len(obj),)) if len(obj) < 16 else b"\xdd" + struct.pack(">I", len(obj))
+    return header + b"".join(packb(item) for item in obj)
+
+
+def _pack_map(obj: dict) -> bytes:
+    header = bytes((0x80 | len(obj),)) if len(obj) < 16 else b"\xdf" + struct.pack(">I", len(obj))
+    return header + b"".join(packb(str(key)) + packb(value) for key, value in obj.items())
+
+
+# Checked in order: bool before int, since bool is a subclass of int
+_PACKERS = (
+    (type(None), lambda obj: b"\xc0"),
+    (bool, lambda obj: b"\xc3" if obj else b"\xc2"),
+    (int, _pack_int),
+    (float, lambda obj: b"\xcb" + struct.pack(">d", obj)),
+    (str, _pack_str),
+    ((bytes, bytearray), lambda obj: b"\xc6" + struct.pack(">I", len(obj)) + bytes(obj)),
+    ((list, tuple), _pack_array),
+    (dict, _pack_map),
+)
+
+
+def packb(obj: Any) -> bytes:
+    """Encode ``obj`` with the msgpack format; unsupported types are packed as their str()."""
+    for types, pack in _PACKERS:
+        if isinstance(obj, types):
+            return pack(obj)
+    return _pack_str(str(obj))
+
+
+def _unpack_str(data: bytes, offset: int, size: int) -> Tuple[str, int]:
+    return data[offset:offset + size].decode("utf-8", "surrogateescape"), offset + size
+
+
+def _unpack_bytes(data: bytes, offset: int, size: int) -> Tuple[bytes, int]:
+    return data[offset:offset + size], offset + size
+
+
+def _unpack_array(data: bytes, offset: int, size: int) -> Tuple[list, int]:
+    items = []
+    for _ in range(size):
+        item, offset = _unpack(data, offset)
+        items.append(item)
+    return items, offset
+
+
+def _unpack_map(data: bytes, offset: int, size: int) -> Tuple[dict, int]:
+    result = {}
+    for _ in range(size):
+        key, offset = _unpack(data, offset)
+        result[key], offset = _unpack(data, offset)
+    return result, offset
+
+
+def _sized(width: int, unpack_body):
+    """Unpacker of a value whose size is stored in the next ``width`` bytes."""
+
+    def unpack(data: bytes, offset: int):
+        size = int.from_bytes(data[offset:offset + width], "big")
+        return unpack_body(data, offset + width, size)
+
+    return unpack
+
+
+def _fixed(fmt: str):
+    """Unpacker of a value stored with the struct format ``fmt``."""
+    codec = struct.Struct(fmt)
+
+    def unpack(data: bytes, offset: int):
+        return codec.unpack_from(data, offset)[0], offset + codec.size
+
+    return unpack
+
+
+# Type codes other than the fixint, fixstr, fixarray and fixmap ranges
+_UNPACKERS = {
+    0xc0: lambda data, offset: (None, offset),
+    0xc2: lambda data, offset: (False, offset),
+    0xc3: lambda data, offset: (True, offset),
+    0xc6: _sized(4, _unpack_bytes),
+    0xcb: _fixed(">d"),
+    0xcf: _fixed(">Q"),
+    0xd3: _fixed(">q"),
+    0xd9: _sized(1, _unpack_str),
+    0xda: _sized(2, _unpack_str),
+    0xdb: _sized(4, _unpack_str),
+    0xdd: _sized(4, _unpack_array),
+    0xdf: _sized(4, _unpack_map),
+}
+
+
+def _unpack(data: bytes, offset: int) -> Tuple[Any, int]:
+    code = data[offset]
+    offset += 1
+    if code < 0x80:
+        return code, offset
+    if code >= 0xe0:
+        return code - 0x100, offset
+    if 0xa0 <= code <= 0xbf:
+        return _unpack_str(data, offset, code & 0x1f)
+    if 0x90 <= code <= 0x9f:
+        return _unpack_array(data, offset, code & 0x0f)
+    if code <= 0x8f:
+        return _unpack_map(data, offset, code & 0x0f)
+    unpack = _UNPACKERS.get(code)
+    if unpack is None:
+        raise ValueError(f"Unsupported msgpack type 0x{code:02x}")
+    return unpack(data, offset)
+
+
+def unpackb(data: bytes) -> Any:
+    """Decode one value written by :func:`packb`."""
+    return _unpack(data, 0)[0]
+
+
+class MsgpackFormatter(logging.Formatter):
+    """
+    Format records as length-prefixed msgpack maps for binary log files.
+
+    ``format_bytes`` returns a 4-byte big-endian length followed by the msgpack
+    encoded record; ``format`` returns the same fields as JSON text, for handlers
+    that can only write strings.
+    """
+
+    _PREFIX = struct.Struct(">I")
+
+    def __init__(self, utc: bool = False):
+        """Create the formatter; timestamps are in UTC with a Z suffix when utc is true."""
+        super().__init__()
+        self._timestamp = _TimestampCache(utc)
+        self._json = JsonFormatter(utc)
+        self._level_fragments: Dict[int, bytes] = {}
+        self._logger_fragments: Dict[str, bytes] = {}
+
+    def format(self, record: logging.LogRecord) -> str:
+        """Return the fields of the record as JSON text."""
+        return self._json.format(record)
+
+    def format_bytes(self, record: logging.LogRecord) -> bytes:
+        """Return the length-prefixed msgpack encoding of the record."""
+        fields = [packb(record.getMessage())]
+        extras = list(_extra_fields(record))
+        for key, value in extras:
+            fields += [packb(key), packb(value)]
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            fields += [b"\xa8exc_info", packb(record.exc_text)]
+        if record.stack_info:
+            fields += [b"\xaastack_info", packb(record.stack_info)]
+
+        count = 4 + len(extras) + bool(record.exc_text) + bool(record.stack_info)
+        header = bytes((0x80 | count,)) if count < 16 else b"\xdf" + struct.pack(">I", count)
+
+        level = self._level_fragments.get(record.levelno)
+        if level is None:
+            level = self._level_fragments[record.levelno] = b"\xa5level" + packb(record.levelname)
+        logger = self._logger_fragments.get(record.name)
+        if logger is None:
+            logger = self._logger_fragments[record.name] = b"\xa6logger" + packb(record.name)
+
+        body = b"".join([
+            header,
+            b"\xa4time", packb(self._timestamp(record.created, record.msecs)),
+            level,
+            logger,
+            b"\xa7message",
+            *fields,
+        ])
+        return self._PREFIX.pack(len(body)) + body
+
+
+def iter_binary_records(stream: BinaryIO) -> Iterator[Dict[str, Any]]:
+    """Yield the records of a binary log file written with :class:`MsgpackFormatter`."""
+    while True:
+        prefix = stream.read(4)
+        if len(prefix) < 4:
+            return
+        size = struct.unpack(">I", prefix)[0]
+        yield unpackb(stream.read(size))
@@ -0,0 +1,157 @@
+"""
+Shared file handlers for loggers writing to the same log file, with a cap on open descriptors.
+
+Every logger created by LoggerManager for a given log file gets the same handler
+from the pool, so loggers sharing a log file prefix share one file and one rotation.
+With ``max_open`` set, the pool tracks which handlers hold an open file (or socket)
+and closes the least recently used ones beyond the cap; a closed handler reopens its
+file on its next record, as FileHandler does with ``delay=True``.
+"""
+
+import logging
+import threading
+from collections import OrderedDict
+from logging.handlers import SocketHandler
+from typing import Callable, Dict, Optional
+
+from .handlers import FlightRecorderHandler
+from .log_index import CheckpointIndexMixin
+
+
+def close_handles(handler: logging.Handler):
+    """
+    Close the file, index file or socket held by a handler without closing the handler.
+    The handler reopens it on its next record. Called with the handler lock held, or
+    where no other thread can use the handler (e.g. after a fork).
+    """
+    if isinstance(handler, FlightRecorderHandler):
+        handler = handler.target
+    if isinstance(handler, CheckpointIndexMixin):
+        handler._close_index()
+    if isinstance(handler, logging.FileHandler) and handler.stream is not None:
+        stream, handler.stream = handler.stream, None
+        try:
+            stream.close()
+        except (OSError, ValueError):
+            pass
+    elif isinstance(handler, SocketHandler) and handler.sock is not None:
+        sock, handler.sock = handler.sock, None
+        sock.close()
+
+
+class _TouchFilter:
+    """Handler filter marking the handler as used; it never rejects a record."""
+
+    def __init__(self, pool: "HandlerPool", key: str):
+        self.pool = pool
+        self.key = key
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if self.pool.max_open is not None:
+            self.pool.touch(self.key)
+        return True
+
+
+class HandlerPool:
+    """
+    Reference-counted handlers keyed by log file path.
+
+    Args:
+        max_open: Number of handlers allowed to hold an open descriptor at once; None
+                  leaves them all open
+    """
+
+    def __init__(self, max_open: Optional[int] = None):
+        """Create an empty pool."""
+        self.max_open = max_open
+        self._handlers: Dict[str, logging.Handler] = {}
+        self._keys: Dict[int, str] = {}
+        self._references: Dict[str, int] = {}
+        # Handlers that may hold a descriptor, least recently used first
+        self._open: OrderedDict[str, logging.Handler] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def acquire(self, key: str, factory: Callable[[], logging.Handler]) -> logging.Handler:
+        """Return the handler for ``key``, creating it with ``factory`` for its first user."""
+        with self._lock:
+            handler = self._handlers.get(key)
+            if handler is None:
+                handler = self._handlers[key] = factory()
+                handler.addFilter(_TouchFilter(self, key))
+                self._keys[id(handler)] = key
+                self._references[key] = 0
+            self._references[key] += 1
+            return handler
+
+    def release(self, handler: logging.Handler) -> bool:
+        """
+        Drop one reference to a handler returned by acquire, closing it after the last one.
+
+        Returns:
+            bool: True if the handler was closed; False if it is still in use or not from this pool
+        """
+        with self._lock:
+            key = self._keys.get(id(handler))
+            if key is None or self._handlers.get(key) is not handler:
+                return False
+            references = self._references[key] - 1
+            if references > 0:
+                self._references[key] = references
+                return False
+            del self._handlers[key], self._references[key], self._keys[id(handler)]
+            self._open.pop(key, None)
+        handler.close()
+        return True
+
+    def touch(self, key: str):
+        """Mark the handler for ``key`` as in use and close the least recently used ones beyond max_open."""
+        evicted = []
+        with self._lock:
+            if key in self._open:
+                self._open.move_to_end(key)
+                return
+            handler = self._handlers.get(key)
+            if handler is None:
+                return
+            self._open[key] = handler
+            while self.max_open is not None and len(self._open) > max(self.max_open, 1):
+                evicted.append(self._open.popitem(last=False)[1])
+        for handler in evicted:
+            handler.acquire()
+            try:
+                close_handles(handler)
+            finally:
+                handler.release()
+
+    def owns(self, handler: logging.Handler) -> bool:
+        """Return True if the handler was returned by acquire and is not closed yet."""
+        with self._lock:
+            key = self._keys.get(id(handler))
+            return key is not None and self._handlers.get(key) is handler
+
+    @property
+    def open_count(self) -> int:
+        """Number of handlers that may currently hold an open descriptor."""
+        return len(self._open)
+
+    def __len__(self) -> int:
+        """Return the number of pooled handlers."""
+        return len(self._handlers)
+
+    def close_all(self):
+        """Close every handler, whatever its reference count."""
+        with self._lock:
+            handlers = list(self._handlers.values())
+            self._handlers.clear()
+            self._keys.clear()
+            self._references.clear()
+            self._open.clear()
+        for handler in handlers:
+            handler.close()
+
+    def reinit_after_fork(self):
+        """Replace the lock, which another thread may have held at fork, and close the inherited descriptors."""
+        self._lock = threading.Lock()
+        self._open.clear()
+        for handler in self._handlers.values():
+            close_handles(handler)
@@ -0,0 +1,566 @@
+"""File handlers used by LoggerManager in addition to the stdlib ones."""
+
+import atexit
+import datetime
+import logging
+import os
+import queue
+import re
+import threading
+import time
+import weakref
+from logging.handlers import BaseRotatingHandler, RotatingFileHandler
+from typing import List, Optional, Tuple
+
+from .log_index import DEFAULT_INDEX_INTERVAL, CheckpointIndexMixin, index_path
+
+COMPRESSION_SUFFIXES = {"gzip": ".gz", "zstd": ".zst"}
+
+
+class BufferedRotatingFileHandler(CheckpointIndexMixin, RotatingFileHandler):
+    """
+    RotatingFileHandler that collects formatted records in memory and writes them in batches.
+
+    The buffer is written when it holds ``buffer_size`` characters, when a record at
+    ``flush_level`` or above arrives (so errors reach the disk immediately), or when
+    ``flush_interval`` seconds have passed since the last write. A shared background
+    thread enforces the interval for idle handlers. Rollover is checked once per
+    batch, before it is written, with the usual maxBytes / backupCount semantics.
+    With an ``index_interval`` the handler keeps a checkpoint index, see :mod:`.log_index`.
+    """
+
+    def __init__(self, filename, mode='a', maxBytes=0, backupCount=0, encoding=None, delay=False,
+                 buffer_size: int = 64 * 1024, flush_interval: float = 1.0, flush_level: int = logging.ERROR,
+                 index_interval: Optional[int] = None):
+        """Create the handler; the other arguments are those of RotatingFileHandler."""
+        super().__init__(filename, mode, maxBytes, backupCount, encoding, delay)
+        self.index_interval = index_interval
+        self.buffer_size = buffer_size
+        self.flush_interval = flush_interval
+        self.flush_level = flush_level
+        self._buffer: List[str] = []
+        self._buffered_chars = 0
+        self._last_write = time.monotonic()
+        _flusher.register(self)
+
+    def emit(self, record: logging.LogRecord):
+        """Buffer the formatted record and write the buffer if it is full, urgent or due."""
+        # Called by Handler.handle with the handler lock held
+        try:
+            msg = self.format(record) + self.terminator
+        except Exception:
+            self.handleError(record)
+            return
+        self._buffer.append(msg)
+        self._buffered_chars += len(msg)
+        self._index_record(record.created)
+        if (self._buffered_chars >= self.buffer_size
+                or record.levelno >= self.flush_level
+                or time.monotonic() - self._last_write >= self.flush_interval):
+            self._write_buffer()
+
+    def _write_buffer(self):
+        if not self._buffer:
+            return
+        data = "".join(self._buffer)
+        self._buffer.clear()
+        self._buffered_chars = 0
+        self._last_write = time.monotonic()
+        try:
+            if self.stream is None:
+                self.stream = self._open()
+            if self.maxBytes > 0 and self.stream.tell() > 0 and self.stream.tell() + len(data) >= self.maxBytes:
+                self.doRollover()
+            self.stream.write(data)
+            self.stream.flush()
+            self._index_checkpoint()
+        except Exception:
+            # Report the failure once per batch instead of once per record
+            self.handleError(logging.makeLogRecord({"msg": "Failed to write a batch of log records"}))
+
+    def flush_if_due(self):
+        """Write the buffer if the flush interval passed since the last write."""
+        if self._buffer and time.monotonic() - self._last_write >= self.flush_interval:
+            self.flush()
+
+    def flush(self):
+        """Write the buffered records and flush the stream."""
+        self.acquire()
+        try:
+            self._write_buffer()
+            super().flush()
+        finally:
+            self.release()
+
+    def doRollover(self):
+        """Rotate the checkpoint indexes together with the log files."""
+        self._rotate_indexes()
+        super().doRollover()
+
+    def close(self):
+        """Write the buffered records, close the file and stop the interval flushes."""
+        self.acquire()
+        try:
+            self._write_buffer()
+            self._close_index()
+            super().close()
+        finally:
+            self.release()
+        _flusher.unregister(self)
+
+    def discard_buffer(self):
+        """Drop buffered records without writing them, e.g. the parent's records in a forked child."""
+        self._buffer.clear()
+        self._buffered_chars = 0
+
+
+class IndexedRotatingFileHandler(CheckpointIndexMixin, RotatingFileHandler):
+    """RotatingFileHandler keeping a checkpoint index every ``index_interval`` bytes, see :mod:`.log_index`."""
+
+    def __init__(self, filename, mode='a', maxBytes=0, backupCount=0, encoding=None, delay=False,
+                 index_interval: Optional[int] = DEFAULT_INDEX_INTERVAL):
+        """Create the handler; the other arguments are those of RotatingFileHandler."""
+        super().__init__(filename, mode, maxBytes, backupCount, encoding, delay)
+        self.index_interval = index_interval
+
+    def emit(self, record: logging.LogRecord):
+        """Write the record and add a checkpoint once index_interval bytes were written since the last one."""
+        super().emit(record)
+        self._index_record(record.created)
+        self._index_checkpoint()
+
+    def doRollover(self):
+        """Rotate the checkpoint indexes together with the log files."""
+        self._rotate_indexes()
+        super().doRollover()
+
+    def close(self):
+        """Close the checkpoint index, then the file."""
+        self.acquire()
+        try:
+            self._close_index()
+        finally:
+            self.release()
+        super().close()
+
+
+class BinaryRotatingFileHandler(RotatingFileHandler):
+    """
+    RotatingFileHandler writing the bytes returned by the formatter's ``format_bytes``.
+
+    Used with :class:`~h7_logger_manager.formatters.MsgpackFormatter`, whose records
+    carry their own length prefix, so no terminator is written between them.
+    """
+
+    def __init__(self, filename, maxBytes=0, backupCount=0, delay=False):
+        """Create the handler; the arguments are those of RotatingFileHandler."""
+        super().__init__(filename, 'ab', maxBytes, backupCount, delay=delay)
+
+    def _open(self):
+        return open(self.baseFilename, 'ab')
+
+    def emit(self, record: logging.LogRecord):
+        """Write the bytes of the record, rotating first if they would take the file past maxBytes."""
+        try:
+            data = self.formatter.format_bytes(record)
+            if self.stream is None:
+                self.stream = self._open()
+            if self.maxBytes > 0 and self.stream.tell() > 0 and self.stream.tell() + len(data) >= self.maxBytes:
+                self.doRollover()
+            self.stream.write(data)
+            self.stream.flush()
+        except Exception:
+            self.handleError(record)
+
+
+class FlightRecorderHandler(logging.Handler):
+    """
+    Keep the most recent low-level records in a fixed-size ring buffer instead of writing them.
+
+    Records at ``buffer_level`` or below (DEBUG by default) replace the oldest entry of
+    a preallocated ring of ``capacity`` records and are not passed on. Other records go
+    to ``target`` directly. A record at ``trigger_level`` or above first dumps the
+    buffered records to ``target``, oldest first, so the failure is written together
+    with the debug records that led to it; ``dump()`` does the same on request.
+
+    The records are buffered as they are: arguments mutated after the logging call
+    show their later value in a dump.
+    """
+
+    def __init__(self, target: logging.Handler, capacity: int = 1000,
+                 buffer_level: int = logging.DEBUG, trigger_level: int = logging.ERROR):
+        """
+        Create the recorder in front of target.
+
+        Raises:
+            ValueError: If the capacity is not positive
+        """
+        super().__init__()
+        if capacity <= 0:
+            raise ValueError("The flight recorder capacity must be positive")
+        self.target = target
+        self.capacity = capacity
+        self.buffer_level = buffer_level
+        self.trigger_level = trigger_level
+        self._ring: List[Optional[logging.LogRecord]] = [None] * capacity
+        self._next = 0
+        self._count = 0
+
+    def emit(self, record: logging.LogRecord):
+        """Buffer a low-level record, or pass the record on after dumping the buffer for a trigger."""
+        # Called by Handler.handle with the handler lock held
+        if record.levelno <= self.buffer_level:
+            self._ring[self._next] = record
+            self._next = (self._next + 1) % self.capacity
+            if self._count < self.capacity:
+                self._count += 1
+            return
+        if record.levelno >= self.trigger_level:
+            self._dump()
+        self.target.handle(record)
+
+    def _dump(self):
+        start = (self._next - self._count) % self.capacity
+        records = [self._ring[(start + offset) % self.capacity] for offset in range(self._count)]
+        self._ring = [None] * self.capacity
+        self._next = self._count = 0
+        for record in records:
+            self.target.handle(record)
+
+    def dump(self):
+        """Write the buffered records to the target, oldest first, and empty the buffer."""
+        self.acquire()
+        try:
+            self._dump()
+        finally:
+            self.release()
+
+    def buffered(self) -> int:
+        """Return the number of records in the buffer."""
+        return self._count
+
+    def flush(self):
+        """Flush the target; the buffered records stay in the buffer."""
+        self.target.flush()
+
+    def close(self):
+        """Discard the buffered records and close the recorder, leaving the target open."""
+        # The buffered records are only worth writing next to an error. Like MemoryHandler,
+        # the target is left open; it may be shared with other loggers.
+        self.acquire()
+        try:
+            self._ring = [None] * self.capacity
+            self._next = self._count = 0
+        finally:
+            self.release()
+        super().close()
+
+
+class _IntervalFlusher:
+    """Single daemon thread that writes out idle buffered handlers after their flush interval."""
+
+    def __init__(self, tick: float = 0.25):
+        self.tick = tick
+        self._handlers: weakref.WeakSet[BufferedRotatingFileHandler] = weakref.WeakSet()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def register(self, handler: BufferedRotatingFileHandler):
+        with self._lock:
+            self._handlers.add(handler)
+            self.tick = min(self.tick, max(handler.flush_interval, 0.01))
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="h7-log-flusher", daemon=True)
+                self._thread.start()
+
+    def unregister(self, handler: BufferedRotatingFileHandler):
+        with self._lock:
+            self._handlers.discard(handler)
+
+    def _run(self):
+        while True:
+            time.sleep(self.tick)
+            with self._lock:
+                handlers = list(self._handlers)
+            for handler in handlers:
+                handler.flush_if_due()
+
+    def reinit_after_fork(self):
+        self._lock = threading.Lock()
+        self._thread = None
+        handlers = list(self._handlers)
+        for handler in handlers:
+            handler.discard_buffer()
+        if handlers:
+            self._thread = threading.Thread(target=self._run, name="h7-log-flusher", daemon=True)
+            self._thread.start()
+
+
+_flusher = _IntervalFlusher()
+
+
+class TimedSizeRotatingFileHandler(CheckpointIndexMixin, BaseRotatingHandler):
+    """
+    File handler for ``<prefix>_<YYYYMMDD>.<ext>`` files that follows the date and rotates by size.
+
+    At the first record after midnight the handler switches to the file of the new
+    day. Within a day, a file reaching ``maxBytes`` is renamed to the next backup
+    number (``.1``, ``.2``, ...; numbers only grow, so no backup is ever renamed
+    again) and a fresh file is started. Finished files are compressed on a
+    background thread, and the oldest finished files are deleted while they take
+    more than ``max_total_bytes`` together.
+
+    Args:
+        filename: Path of today's file, named ``<prefix>_<YYYYMMDD>.<ext>``
+        maxBytes: Size at which the current file is rotated; 0 rotates only at midnight
+        compression: "gzip", "zstd" (requires the zstandard package) or None
+        max_total_bytes: Disk space allowed for the rotated files; None keeps them all
+        index_interval: Bytes between two checkpoints of the index, see :mod:`.log_index`;
+                        None writes no index
+    Raises:
+        ValueError: If the file name has no date, or the compression is unknown or unavailable
+    """
+
+    _NAME_RE = re.compile(r"^(?P<prefix>.+)_(?P<date>\d{8})(?P<ext>\.[^.]+)$")
+
+    def __init__(self, filename, maxBytes=0, encoding=None, delay=False,
+                 compression: Optional[str] = "gzip", max_total_bytes: Optional[int] = None,
+                 index_interval: Optional[int] = None):
+        """Open today's file and queue the finished files a previous process left uncompressed."""
+        filename = os.path.abspath(os.fspath(filename))
+        match = self._NAME_RE.match(os.path.basename(filename))
+        if match is None:
+            raise ValueError(f"Log file name '{filename}' does not follow <prefix>_<YYYYMMDD>.<ext>")
+        if compression is not None and compression not in COMPRESSION_SUFFIXES:
+            raise ValueError(f"Unknown compression '{compression}', expected one of {tuple(COMPRESSION_SUFFIXES)}")
+        if compression == "zstd" and not zstd_available():
+            raise ValueError("zstd compression requires the 'zstandard' package")
+
+        self.directory = os.path.dirname(filename)
+        self.prefix = match.group("prefix")
+        self.extension = match.group("ext")
+        self.maxBytes = maxBytes
+        self.compression = compression
+        self.max_total_bytes = max_total_bytes
+        self.index_interval = index_interval
+        self._rotated_re = re.compile(
+            rf"^{re.escape(self.prefix)}_(\d{{8}}){re.escape(self.extension)}(?:\.(\d+))?(?:\.gz|\.zst)?$"
+        )
+
+        self._date, self._next_date_change = self._current_date(time.time())
+        super().__init__(self._dated_filename(self._date), 'a', encoding, delay)
+        self._backup_number = self._last_backup_number()
+        self._schedule_leftovers()
+
+    @staticmethod
+    def _current_date(now: float) -> Tuple[str, float]:
+        """Return today's YYYYMMDD and the timestamp of the next local midnight."""
+        today = datetime.date.fromtimestamp(now)
+        midnight = datetime.datetime.combine(today + datetime.timedelta(days=1), datetime.time())
+        return today.strftime("%Y%m%d"), midnight.timestamp()
+
+    def _dated_filename(self, date: str) -> str:
+        return os.path.join(self.directory, f"{self.prefix}_{date}{self.extension}")
+
+    def _rotated_files(self) -> List[Tuple[str, Optional[int], str]]:
+        """(date, backup number, path) of every finished file of this handler."""
+        files = []
+        try:
+            names = os.listdir(self.directory)
+        except OSError:
+            return files
+        for name in names:
+            match = self._rotated_re.match(name)
+            path = os.path.join(self.directory, name)
+            if match is None or path == self.baseFilename:
+                continue
+            files.append((match.group(1), int(match.group(2)) if match.group(2) else None, path))
+        return files
+
+    def _last_backup_number(self) -> int:
+        return max((number for date, number, _ in self._rotated_files()
+                    if date == self._date and number is not None), default=0)
+
+    def _schedule_leftovers(self):
+        """Compress finished files a previous process left uncompressed, e.g. when it was killed."""
+        for _, _, path in self._rotated_files():
+            if not path.endswith((".gz", ".zst")):
+                _compressor.submit(self, path)
+
+    def emit(self, record: logging.LogRecord):
+        """Write the record, switching to the file of a new day or to a fresh file as needed."""
+        try:
+            msg = self.format(record) + self.terminator
+            if record.created >= self._next_date_change:
+                self._change_date(record.created)
+            if self.stream is None:
+                self.stream = self._open()
+            if self.maxBytes > 0 and self.stream.tell() > 0 and self.stream.tell() + len(msg) >= self.maxBytes:
+                self.doRollover()
+                self.stream = self._open()
+            self.stream.write(msg)
+            self.flush()
+            self._index_record(record.created)
+            self._index_checkpoint()
+        except Exception:
+            self.handleError(record)
+
+    def _close_stream(self):
+        if self.stream is not None:
+            stream, self.stream = self.stream, None
+            stream.close()
+
+    def _change_date(self, now: float):
+        self._close_stream()
+        self._close_index()
+        finished = self.baseFilename
+        self._date, self._next_date_change = self._current_date(now)
+        self.baseFilename = self._dated_filename(self._date)
+        self._backup_number = self._last_backup_number()
+        if finished != self.baseFilename and os.path.exists(finished):
+            _compressor.submit(self, finished)
+
+    def doRollover(self):
+        """Move the current file to the next backup number and queue it for compression."""
+        self._close_stream()
+        self._close_index()
+        if not os.path.exists(self.baseFilename):
+            return
+        self._backup_number += 1
+        backup = f"{self.baseFilename}.{self._backup_number}"
+        os.rename(self.baseFilename, backup)
+        if os.path.exists(index_path(self.baseFilename)):
+            os.replace(index_path(self.baseFilename), index_path(backup))
+        _compressor.submit(self, backup)
+
+    def close(self):
+        """Close the checkpoint index, then the file."""
+        self.acquire()
+        try:
+            self._close_index()
+        finally:
+            self.release()
+        super().close()
+
+    def enforce_retention(self):
+        """Delete the oldest finished files until they fit in max_total_bytes."""
+        if self.max_total_bytes is None:
+            return
+        files = []
+        for date, number, path in self._rotated_files():
+            try:
+                # The un-numbered file of a day is the last one written that day
+                files.append(((date, number if number is not None else float("inf")), os.path.getsize(path), path))
+            except OSError:
+                continue
+        total = sum(size for _, size, _ in files)
+        for _, size, path in sorted(files):
+            if total <= self.max_total_bytes:
+                break
+            try:
+                os.unlink(path)
+            except OSError:
+                continue
+            total -= size
+            _remove_index(path)
+
+
+def _remove_index(log_path: str):
+    try:
+        os.unlink(index_path(log_path))
+    except OSError:
+        pass
+
+
+def zstd_available() -> bool:
+    """Return whether the zstandard package is installed, without importing it."""
+    import importlib.util
+
+    return importlib.util.find_spec("zstandard") is not None
+
+
+def compress_file(path: str, compression: str) -> str:
+    """Compress ``path`` next to itself, keep its mtime, remove the original and return the new path."""
+    # Imported here, on the background thread, as the compressors are only needed after a rotation
+    import shutil
+
+    target = path + COMPRESSION_SUFFIXES[compression]
+    temp_target = target + ".tmp"
+    with open(path, "rb") as source:
+        if compression == "zstd":
+            import zstandard
+
+            with open(temp_target, "wb") as raw, zstandard.ZstdCompressor().stream_writer(raw) as destination:
+                shutil.copyfileobj(source, destination, 1024 * 1024)
+        else:
+            import gzip
+
+            with gzip.open(temp_target, "wb") as destination:
+                shutil.copyfileobj(source, destination, 1024 * 1024)
+    st = os.stat(path)
+    os.utime(temp_target, ns=(st.st_atime_ns, st.st_mtime_ns))
+    os.replace(temp_target, target)
+    os.unlink(path)
+    return target
+
+
+class _BackgroundCompressor:
+    """Single daemon thread compressing rotated files and applying retention, off the logging threads."""
+
+    def __init__(self):
+        self._queue: queue.Queue[Tuple[TimedSizeRotatingFileHandler, str]] = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def submit(self, handler: TimedSizeRotatingFileHandler, path: str):
+        self._queue.put((handler, path))
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="h7-log-compressor", daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            handler, path = self._queue.get()
+            try:
+                if handler.compression is not None and os.path.exists(path):
+                    compress_file(path, handler.compression)
+                    # The offsets of the index do not apply to the compressed file
+                    _remove_index(path)
+                handler.enforce_retention()
+            except Exception:
+                handler.handleError(logging.makeLogRecord({"msg": f"Failed to compress rotated log file {path}"}))
+            finally:
+                self._queue.task_done()
+
+    def wait(self):
+        """Block until every submitted file is compressed."""
+        if self._thread is not None:
+            self._queue.join()
+
+    def reinit_after_fork(self):
+        # Pending files belong to the parent, which compresses them itself
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread = None
+
+
+_compressor = _BackgroundCompressor()
+
+
+def wait_for_compression():
+    """Block until the background thread compressed every rotated file submitted so far."""
+    _compressor.wait()
+
+
+# Finish compressing at exit instead of leaving half-written archives behind
+atexit.register(wait_for_compression)
+
+
+def _reinit_after_fork():
+    _flusher.reinit_after_fork()
+    _compressor.reinit_after_fork()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reinit_after_fork)
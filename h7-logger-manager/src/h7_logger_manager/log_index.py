@@ -0,0 +1,131 @@
+"""
+Sidecar checkpoint indexes of the text log files, used by :mod:`h7_logger_manager.log_query`.
+
+Next to ``app_20250101.log`` an indexing handler keeps ``app_20250101.log.idx``: a
+sequence of fixed-size ``(time, offset)`` checkpoints, one every ``index_interval``
+bytes of log. ``offset`` is a record boundary in the log file and ``time`` is the
+latest ``record.created`` of every record logged before it. Since ``time`` is an
+upper bound, records written slightly out of order (several threads, a queue or a
+write buffer) never end up before a checkpoint that a query for them would skip.
+
+Index files are renamed together with their log file on rotation, and dropped when
+the log file is compressed, as the offsets no longer apply. The binary output format
+is not indexed.
+"""
+
+import os
+import struct
+from typing import BinaryIO, List, Optional, Tuple
+
+INDEX_SUFFIX = ".idx"
+
+# Little-endian float64 time and uint64 byte offset
+_CHECKPOINT = struct.Struct("<dQ")
+
+# Default distance between two checkpoints
+DEFAULT_INDEX_INTERVAL = 64 * 1024
+
+
+def index_path(log_path: str) -> str:
+    """Return the path of the checkpoint index of a log file."""
+    return log_path + INDEX_SUFFIX
+
+
+def read_checkpoints(log_path: str) -> Tuple[List[float], List[int]]:
+    """
+    Return the checkpoint times and offsets of a log file, or two empty lists without index.
+
+    Checkpoints beyond the end of the log file, left by an index that outlived its log
+    file, are dropped.
+    """
+    try:
+        with open(index_path(log_path), "rb") as stream:
+            data = stream.read()
+        size = os.path.getsize(log_path)
+    except OSError:
+        return [], []
+    data = data[:len(data) - len(data) % _CHECKPOINT.size]
+    times, offsets = [], []
+    for checkpoint_time, offset in _CHECKPOINT.iter_unpack(data):
+        if offset > size:
+            break
+        times.append(checkpoint_time)
+        offsets.append(offset)
+    return times, offsets
+
+
+class CheckpointIndexMixin:
+    """
+    Mixin for file handlers, writing the checkpoint index of ``baseFilename``.
+
+    The handler calls ``_index_record`` for every record it writes or buffers and
+    ``_index_checkpoint`` after data reached the file. An ``index_interval`` of None
+    disables the index.
+    """
+
+    index_interval: Optional[int] = None
+    _index: Optional[BinaryIO] = None
+    _index_time = 0.0
+    _index_next_offset = 0
+
+    def _index_record(self, created: float):
+        if created > self._index_time:
+            self._index_time = created
+
+    def _index_checkpoint(self):
+        if self.index_interval is None or self.stream is None:
+            return
+        offset = self.stream.tell()
+        if offset < self._index_next_offset:
+            return
+        if self._index is None:
+            self._open_index()
+        self._index.write(_CHECKPOINT.pack(self._index_time, offset))
+        self._index.flush()
+        self._index_next_offset = offset + self.index_interval
+
+    def _open_index(self):
+        path = index_path(self.baseFilename)
+        self._index = open(path, "ab")
+        # Continue an existing index, e.g. after a restart
+        size = self._index.tell()
+        if size >= _CHECKPOINT.size:
+            with open(path, "rb") as stream:
+                stream.seek(size - size % _CHECKPOINT.size - _CHECKPOINT.size)
+                last_time, last_offset = _CHECKPOINT.unpack(stream.read(_CHECKPOINT.size))
+            if last_offset > self.stream.tell():
+                # The index outlived its log file, which was deleted or truncated
+                self._index.close()
+                self._index = open(path, "wb")
+                return
+            self._index_time = max(self._index_time, last_time)
+            self._index_next_offset = max(self._index_next_offset, last_offset + self.index_interval)
+
+    def _close_index(self):
+        """Close the index file; the next checkpoint reopens the index of the current ``baseFilename``."""
+        if self._index is not None:
+            index, self._index = self._index, None
+            index.close()
+        self._index_next_offset = 0
+
+    def _rotate_indexes(self):
+        """Rename the index files like RotatingFileHandler.doRollover renames the log files; call before it."""
+        self._close_index()
+        if self.backupCount <= 0:
+            return
+        for number in range(self.backupCount - 1, 0, -1):
+            _move_index(self.rotation_filename(f"{self.baseFilename}.{number}"),
+                        self.rotation_filename(f"{self.baseFilename}.{number + 1}"))
+        _move_index(self.baseFilename, self.rotation_filename(self.baseFilename + ".1"))
+
+
+def _move_index(source_log: str, destination_log: str):
+    """Move the index of source_log to destination_log, if source_log is about to be renamed."""
+    if not os.path.exists(source_log):
+        return
+    source, destination = index_path(source_log), index_path(destination_log)
+    if os.path.exists(source):
+        os.replace(source, destination)
+    elif os.path.exists(destination):
+        os.unlink(destination)
+
@@ -0,0 +1,281 @@
+"""
+Query the text and json log files written by LoggerManager by time range, level and logger.
+
+Files are read through ``mmap``. When a file has a checkpoint index (see
+``LoggerManager.log_index_interval`` and :mod:`.log_index`), a binary search over
+its checkpoints skips everything logged before the start of the range; the scan
+stops once records are past the end of the range. Files without an index are
+scanned from the beginning, and compressed backups (``.gz``, or ``.zst`` with the
+``zstandard`` package) are decompressed in memory.
+
+Example:
+    from h7_logger_manager.log_query import query_logs
+
+    for entry in query_logs("logs", start=time.time() - 3600, level="WARNING", logger="app.db"):
+        print(entry.text)
+
+Command line:
+    python -m h7_logger_manager.log_query logs --since 1h --level WARNING --logger app.db
+"""
+
+import argparse
+import bisect
+import calendar
+import heapq
+import json
+import logging
+import mmap
+import os
+import re
+import sys
+import time
+from datetime import datetime
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple, Union
+
+from h7_env_manager.converters import to_duration
+
+from .log_index import read_checkpoints
+
+# Seconds a record may be written after a later record: several threads, the async
+# queue and the buffered handler all write records slightly out of time order
+ORDER_TOLERANCE = 5.0
+
+# Start of a record: a text line ("2025-01-01 12:00:00,123 - ...") or a json line
+# ('{"time":"2025-01-01T12:00:00.123Z",...'); other lines continue the previous record
+_RECORD_START_RE = re.compile(rb'(?:\{"time":")?(\d{4}-\d\d-\d\d)[ T](\d\d:\d\d:\d\d)[.,](\d{3})(Z?)')
+
+_LOG_FILE_RE = re.compile(r"^(?P<prefix>.+)_(?P<date>\d{8})\.log(?:\.\d+)?(?P<compression>\.gz|\.zst)?$")
+
+_Time = Union[float, datetime]
+
+
+class LogEntry(NamedTuple):
+    """A record read back from a log file, with its time as epoch seconds."""
+
+    time: float
+    level: str
+    logger: str
+    message: str
+    # The record as written, including the traceback lines of the text format
+    text: str
+    path: str
+
+
+class _SecondCache:
+    """Epoch seconds of "YYYY-MM-DD HH:MM:SS" texts, converted once per distinct second."""
+
+    def __init__(self):
+        self._seconds: Dict[Tuple[bytes, bytes, bool], float] = {}
+
+    def __call__(self, date: bytes, clock: bytes, utc: bool) -> float:
+        key = (date, clock, utc)
+        seconds = self._seconds.get(key)
+        if seconds is None:
+            parsed = time.strptime(f"{date.decode()} {clock.decode()}", "%Y-%m-%d %H:%M:%S")
+            seconds = float(calendar.timegm(parsed) if utc else time.mktime(parsed))
+            self._seconds[key] = seconds
+        return seconds
+
+
+def find_log_files(logs_dir: Union[str, "os.PathLike[str]"], prefix: Optional[str] = None,
+                   end: Optional[float] = None) -> List[str]:
+    """
+    Return the text and json log files in ``logs_dir``, with their backups, for ``prefix`` or any prefix.
+
+    A file is only created on or after the date in its name, so files dated after
+    ``end`` are left out.
+    """
+    last_date = time.strftime("%Y%m%d", time.localtime(end)) if end is not None else None
+    files = []
+    for name in sorted(os.listdir(logs_dir)):
+        match = _LOG_FILE_RE.match(name)
+        if match is None or (prefix is not None and match.group("prefix") != prefix):
+            continue
+        if last_date is not None and match.group("date") > last_date:
+            continue
+        files.append(os.path.join(logs_dir, name))
+    return files
+
+
+def _read_compressed(path: str) -> Optional[bytes]:
+    if path.endswith(".gz"):
+        import gzip
+
+        with gzip.open(path, "rb") as stream:
+            return stream.read()
+    try:
+        import zstandard
+    except ImportError:
+        return None
+    with open(path, "rb") as stream:
+        return zstandard.ZstdDecompressor().stream_reader(stream).read()
+
+
+def _level_number(level: Union[int, str, None]) -> int:
+    if level is None:
+        return logging.NOTSET
+    if isinstance(level, int):
+        return level
+    number = logging.getLevelName(level.upper())
+    if not isinstance(number, int):
+        raise ValueError(f"Unknown log level '{level}'")
+    return number
+
+
+def _to_timestamp(value: Optional[_Time]) -> Optional[float]:
+    if isinstance(value, datetime):
+        return value.timestamp()
+    return value
+
+
+def _parse_entry(text: str, timestamp: float, path: str) -> LogEntry:
+    if text.startswith("{"):
+        fields = json.loads(text)
+        return LogEntry(timestamp, fields.get("level", ""), fields.get("logger", ""),
+                        fields.get("message", ""), text, path)
+    # TEXT_LOG_FORMAT: asctime - name - levelname - message
+    parts = text.split(" - ", 3)
+    if len(parts) < 4:
+        return LogEntry(timestamp, "", "", text, text, path)
+    return LogEntry(timestamp, parts[2], parts[1], parts[3], text, path)
+
+
+def _scan(data, path: str, position: int, start: Optional[float], end: Optional[float],
+          min_level: int, logger: Optional[str], seconds: _SecondCache) -> Iterator[LogEntry]:
+    """Yield the matching records of ``data`` (an mmap or bytes) from ``position`` on."""
+    size = len(data)
+    stop = end + ORDER_TOLERANCE if end is not None else None
+    match_start = _RECORD_START_RE.match
+    find = data.find
+    logger_prefix = logger + "." if logger is not None else None
+
+    # Skip a partial record, e.g. continuation lines at the start of the file
+    match = match_start(data, position)
+    while match is None and position < size:
+        newline = find(b"\n", position)
+        position = size if newline < 0 else newline + 1
+        match = match_start(data, position)
+
+    while match is not None:
+        record_start = position
+        # The record ends before the next line starting a record
+        while True:
+            newline = find(b"\n", position)
+            position = size if newline < 0 else newline + 1
+            next_match = match_start(data, position) if position < size else None
+            if next_match is not None or position >= size:
+                break
+
+        date, clock, milliseconds, utc = match.groups()
+        timestamp = seconds(date, clock, utc == b"Z") + int(milliseconds) / 1000
+        match = next_match
+        if stop is not None and timestamp > stop:
+            return
+        if (start is not None and timestamp < start) or (end is not None and timestamp > end):
+            continue
+
+        text = data[record_start:position].rstrip(b"\r\n").decode("utf-8", "replace")
+        entry = _parse_entry(text, timestamp, path)
+        if min_level:
+            levelno = logging.getLevelName(entry.level)
+            if not isinstance(levelno, int) or levelno < min_level:
+                continue
+        if logger is not None and entry.logger != logger and not entry.logger.startswith(logger_prefix):
+            continue
+        yield entry
+
+
+def query_file(path: str, start: Optional[_Time] = None, end: Optional[_Time] = None,
+               level: Union[int, str, None] = None, logger: Optional[str] = None) -> Iterator[LogEntry]:
+    """
+    Yield the records of one log file within [start, end], at ``level`` or above, from ``logger`` or its children.
+
+    Raises:
+        ValueError: If the level is unknown
+    """
+    start, end = _to_timestamp(start), _to_timestamp(end)
+    min_level = _level_number(level)
+    seconds = _SecondCache()
+
+    if path.endswith((".gz", ".zst")):
+        data = _read_compressed(path)
+        if data is not None:
+            yield from _scan(data, path, 0, start, end, min_level, logger, seconds)
+        return
+
+    position = 0
+    if start is not None:
+        times, offsets = read_checkpoints(path)
+        # Every record before the last checkpoint older than start is older than start
+        checkpoint = bisect.bisect_left(times, start) - 1
+        if checkpoint >= 0:
+            position = offsets[checkpoint]
+    with open(path, "rb") as stream:
+        if os.fstat(stream.fileno()).st_size == 0:
+            return
+        with mmap.mmap(stream.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            yield from _scan(data, path, position, start, end, min_level, logger, seconds)
+
+
+def query_logs(logs_dir: Union[str, "os.PathLike[str]"], start: Optional[_Time] = None,
+               end: Optional[_Time] = None, level: Union[int, str, None] = None,
+               logger: Optional[str] = None, prefix: Optional[str] = None) -> Iterator[LogEntry]:
+    """
+    Yield the matching records of every log file in ``logs_dir``, merged in time order.
+
+    Args:
+        logs_dir: Directory of the log files
+        start: Start of the time range, as a timestamp or datetime; None leaves it open
+        end: End of the time range, same forms as start
+        level: Minimum level, e.g. "WARNING"
+        logger: Logger name; records of its child loggers match too
+        prefix: Only read the files of this log file prefix
+
+    Raises:
+        ValueError: If the level is unknown
+    """
+    start, end = _to_timestamp(start), _to_timestamp(end)
+    _level_number(level)
+    scans = [query_file(path, start, end, level, logger) for path in find_log_files(logs_dir, prefix, end)]
+    return heapq.merge(*scans, key=lambda entry: entry.time)
+
+
+def _parse_time(text: str) -> float:
+    """A local ISO date or time ("2025-01-01", "2025-01-01 12:30"), or a duration ago ("15m", "2h")."""
+    try:
+        return datetime.fromisoformat(text).timestamp()
+    except ValueError:
+        pass
+    return time.time() - to_duration(text)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command line entry point; returns the exit status."""
+    parser = argparse.ArgumentParser(
+        prog="python -m h7_logger_manager.log_query",
+        description="Print the records of LoggerManager log files matching a time range, level and logger.",
+    )
+    parser.add_argument("logs_dir", help="directory of the log files")
+    parser.add_argument("--since", type=_parse_time, help="start, e.g. '2025-01-01 12:00' or '15m' (ago)")
+    parser.add_argument("--until", type=_parse_time, help="end, same formats as --since")
+    parser.add_argument("--level", help="minimum level, e.g. WARNING")
+    parser.add_argument("--logger", help="logger name, including its child loggers")
+    parser.add_argument("--prefix", help="only read the files of this log file prefix")
+    parser.add_argument("--count", action="store_true", help="print the number of matching records only")
+    args = parser.parse_args(argv)
+
+    try:
+        entries = query_logs(args.logs_dir, args.since, args.until, args.level, args.logger, args.prefix)
+        if args.count:
+            print(sum(1 for _ in entries))
+        else:
+            for entry in entries:
+                print(entry.text)
+    except (OSError, ValueError) as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
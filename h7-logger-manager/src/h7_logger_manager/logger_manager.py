@@ -5,14 +5,49 @@ This module provides a LoggerManager class to set up and manage loggers
 throughout the application with consistent configuration and behavior.
 """
 
+import atexit
 import logging
 import os
+import threading
+import time
 from datetime import datetime
 from logging.handlers import RotatingFileHandler
-from typing import Dict
+from typing import Any, Dict, Optional
 
 from h7_env_manager import EnvManager
-from h7_file_finder import find_project_root
+from h7_file_finder import find_project_root, running_archive
+from h7_file_finder.instrumentation import metrics
+
+# The filters, structured formatters and multi-process mode are imported where they
+# are first used, so plain text logging does not pay for json, random or sockets.
+from .fast_logger import FastLogger, invalidate_level_cache
+from .handler_pool import HandlerPool, close_handles
+from .handlers import (
+    BinaryRotatingFileHandler,
+    BufferedRotatingFileHandler,
+    FlightRecorderHandler,
+    IndexedRotatingFileHandler,
+    TimedSizeRotatingFileHandler,
+)
+from .queue_logging import AsyncLoggingPipeline
+
+# Rotation limits of the log files
+LOG_FILE_MAX_BYTES = 5 * 1024 * 1024
+LOG_FILE_BACKUP_COUNT = 10
+# Disk space allowed for the rotated files of a logger in the "timed" mode
+LOG_RETENTION_MAX_BYTES = 512 * 1024 * 1024
+
+# Layout of the "text" output format
+TEXT_LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+# Environment variable read by worker processes to find the log aggregator
+AGGREGATOR_ADDRESS_ENV_VAR = 'LOG_AGGREGATOR_ADDRESS'
+
+# Class attributes copied into the aggregator process, which configure its file handlers
+_AGGREGATOR_SETTINGS = (
+    'file_handler_mode', 'buffer_size', 'buffer_flush_interval', 'buffer_flush_level',
+    'rotation_compression', 'retention_max_bytes', 'output_format', 'output_utc', 'log_index_interval',
+)
 
 
 class LoggerManager:
@@ -24,6 +59,66 @@ class LoggerManager:
     # Dictionary to store loggers by name to avoid recreating them
     _loggers: Dict[str, logging.Logger] = {}  # noqa: RUF012
 
+    # Serialises logger creation so concurrent callers never attach duplicate handlers
+    _lock = threading.RLock()
+
+    # When enabled, loggers only get a QueueHandler and a single background thread
+    # owned by LoggerManager formats and writes every record. When the bounded queue
+    # is full the overflow policy applies: "block", "drop" or "drop-debug-first".
+    async_logging = False
+    async_queue_size = 10000
+    async_overflow_policy = "block"
+
+    _async_pipeline: Optional[AsyncLoggingPipeline] = None
+
+    # File handler used for the log files:
+    #   "rotating": a RotatingFileHandler that writes and flushes every record
+    #   "buffered": batches records in memory and writes them in large chunks, flushing
+    #               when the buffer is full, after the interval, or on a record at
+    #               buffer_flush_level or above
+    #   "timed": switches to the new day's file at midnight and rotates by size; rotated
+    #            files are compressed on a background thread with rotation_compression
+    #            ("gzip", "zstd" or None) and the oldest are deleted beyond
+    #            retention_max_bytes
+    file_handler_mode = "rotating"
+    buffer_size = 64 * 1024
+    buffer_flush_interval = 1.0
+    buffer_flush_level = logging.ERROR
+    rotation_compression = "gzip"
+    retention_max_bytes = LOG_RETENTION_MAX_BYTES
+    # Bytes between two checkpoints of the sidecar .idx index written next to each text
+    # or json log file, which lets log_query jump to a time range; None writes no index
+    log_index_interval: Optional[int] = None
+
+    # Flight recorder mode: when set, the DEBUG records of each logger are kept in a
+    # ring buffer of this many records instead of being written, and dumped to the
+    # log file before the next ERROR record or on dump_flight_recorder()
+    flight_recorder_size: Optional[int] = None
+
+    # Loggers writing to the same log file (same prefix) share one file handler. With
+    # max_open_log_files set, at most that many log files are kept open: the least
+    # recently used ones are closed and reopened on their next record, which bounds the
+    # file descriptors of applications with hundreds of named loggers.
+    max_open_log_files: Optional[int] = None
+    _handler_pool = HandlerPool()
+
+    # Format of the log records:
+    #   "text": the human readable TEXT_LOG_FORMAT lines
+    #   "json": one JSON object per line on the console and in the log file, with
+    #           the fields time, level, logger, message and any ``extra`` fields
+    #   "binary": length-prefixed msgpack records in a .bin log file, see
+    #             formatters.iter_binary_records; the console stays text
+    output_format = "text"
+    # Write the structured timestamps in UTC instead of local time
+    output_utc = False
+
+    # Multi-process mode: when an aggregator address is set (here or in the
+    # LOG_AGGREGATOR_ADDRESS environment variable), the file handler of new loggers
+    # sends records to that log aggregator process, which alone writes and rotates
+    # the log files. start_log_aggregator() starts one and sets both.
+    aggregator_address: Optional[str] = None
+    _aggregator_process = None
+
     @classmethod
     def setup_logger(cls, logger_name=None, log_file_prefix=None, logs_dir=None):
         """
@@ -47,11 +142,35 @@ class LoggerManager:
             logger_name = EnvManager.get_required_env_var('LOGGER_NAME')
 
         # If logger already exists, return it
-        if logger_name in cls._loggers:
-            return cls._loggers[logger_name]
+        logger = cls._loggers.get(logger_name)
+        if logger is not None:
+            return logger
+
+        with cls._lock:
+            logger = cls._loggers.get(logger_name)
+            if logger is None:
+                logger = cls._create_logger(logger_name, log_file_prefix, logs_dir)
+                # Store logger for future use
+                cls._loggers[logger_name] = logger
 
+        return logger
+
+    @classmethod
+    def setup_fast_logger(cls, logger_name=None, log_file_prefix=None, logs_dir=None):
+        """
+        Set up a logger like setup_logger and return it wrapped in a FastLogger, whose
+        disabled calls return before creating a record or computing lazy arguments.
+
+        Returns:
+            FastLogger: Wrapper of the configured logger
+        """
+        return FastLogger(cls.setup_logger(logger_name, log_file_prefix, logs_dir))
+
+    @classmethod
+    def _create_logger(cls, logger_name, log_file_prefix, logs_dir):
+        """Create the logger and its handlers; called with the lock held."""
         # Create logs directory if it doesn't exist
-        logs_dir = logs_dir or (find_project_root() / 'logs')
+        logs_dir = logs_dir or _default_logs_dir()
         if not os.path.exists(logs_dir):
             os.makedirs(logs_dir)
 
@@ -61,29 +180,391 @@ class LoggerManager:
 
         # Only add handlers if the logger doesn't have any
         if not logger.handlers:
-            # Create formatter with timestamp
-            formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+            # Logger-level filters drop records before any handler formats them
+            for log_filter in cls._create_filters():
+                logger.addFilter(log_filter)
+
+            console_formatter, file_formatter = cls._create_formatters()
 
             # Create console handler with a higher log level
             console_handler = logging.StreamHandler()
             console_handler.setLevel(logging.INFO)
-            console_handler.setFormatter(formatter)
+            console_handler.setFormatter(console_formatter)
 
             # Create file handler which logs even debug messages
             timestamp = datetime.now().strftime('%Y%m%d')
             file_prefix = log_file_prefix if log_file_prefix else logger_name
-            log_file = os.path.join(logs_dir, f'{file_prefix}_{timestamp}.log')
-            file_handler = RotatingFileHandler(
-                log_file, maxBytes=5 * 1024 * 1024, backupCount=10, encoding='utf-8'
+            extension = 'bin' if cls.output_format == "binary" else 'log'
+            log_file = os.path.join(logs_dir, f'{file_prefix}_{timestamp}.{extension}')
+            # Loggers writing to the same file share its handler
+            file_handler = cls._handler_pool.acquire(
+                log_file, lambda: cls._create_pooled_handler(log_file, file_formatter)
             )
-            file_handler.setLevel(logging.DEBUG)
-            file_handler.setFormatter(formatter)
-
-            # Add the handlers to the logger
-            logger.addHandler(console_handler)
-            logger.addHandler(file_handler)
+            if cls.flight_recorder_size:
+                file_handler = FlightRecorderHandler(file_handler, cls.flight_recorder_size)
+                file_handler.setLevel(logging.DEBUG)
 
-        # Store logger for future use
-        cls._loggers[logger_name] = logger
+            # Add the handlers to the logger, or behind the queue in async mode
+            handlers = [console_handler, file_handler]
+            if metrics.enabled:
+                _time_handler(console_handler)
+            if cls.async_logging:
+                logger.addHandler(cls._get_async_pipeline().attach(logger_name, handlers))
+            else:
+                for handler in handlers:
+                    logger.addHandler(handler)
+            invalidate_level_cache()
 
         return logger
+
+    @classmethod
+    def _create_pooled_handler(cls, log_file, formatter):
+        """Create the handler shared by every logger writing to log_file, formatting with formatter."""
+        aggregator_address = cls._get_aggregator_address()
+        if aggregator_address:
+            from .multiprocess import AggregatorClientHandler
+
+            # Formatted and written by the aggregator process
+            handler = AggregatorClientHandler(aggregator_address, log_file)
+        else:
+            handler = cls._create_file_handler(log_file)
+            handler.setFormatter(formatter)
+        handler.setLevel(logging.DEBUG)
+        if metrics.enabled:
+            _time_handler(handler)
+        cls._handler_pool.max_open = cls.max_open_log_files
+        return handler
+
+    @classmethod
+    def remove_logger(cls, logger_name):
+        """
+        Detach and close the handlers LoggerManager attached to a logger and forget it.
+        A shared file handler is closed with its last logger. Records already queued in
+        async mode are written first.
+
+        Args:
+            logger_name (str): Name of the logger, as returned by setup_logger
+
+        Returns:
+            bool: False if LoggerManager has no logger of this name
+        """
+        from .filters import DeduplicationFilter, RateLimitFilter, SamplingFilter
+
+        with cls._lock:
+            logger = cls._loggers.pop(logger_name, None)
+            if logger is None:
+                return False
+            for log_filter in list(logger.filters):
+                if isinstance(log_filter, (SamplingFilter, RateLimitFilter, DeduplicationFilter)):
+                    if isinstance(log_filter, DeduplicationFilter):
+                        log_filter.flush()
+                    logger.removeFilter(log_filter)
+            handlers = list(logger.handlers)
+            for handler in handlers:
+                logger.removeHandler(handler)
+            if cls._async_pipeline is not None:
+                handlers += cls._async_pipeline.detach(logger_name)
+            invalidate_level_cache()
+
+        for handler in handlers:
+            if isinstance(handler, FlightRecorderHandler):
+                handler.close()
+                handler = handler.target
+            if cls._handler_pool.owns(handler):
+                # Closed with the last logger writing to its file
+                cls._handler_pool.release(handler)
+            else:
+                handler.close()
+        return True
+
+    @classmethod
+    def close_all(cls):
+        """Remove every logger created by LoggerManager and close all their handlers and files."""
+        for logger_name in list(cls._loggers):
+            cls.remove_logger(logger_name)
+        cls._handler_pool.close_all()
+
+    @classmethod
+    def _create_filters(cls):
+        """
+        Create the volume-reducing filters configured in the environment.
+
+        Variables:
+            LOG_SAMPLE_RATES: fraction of records kept per level, e.g. "DEBUG:0.1,INFO:0.5"
+            LOG_RATE_LIMIT: records per second allowed per call site for INFO and below
+            LOG_RATE_LIMIT_BURST: bucket size of the rate limit, defaults to the rate
+            LOG_DEDUPLICATE: collapse consecutive identical messages (true/false)
+            LOG_DEDUPLICATE_WINDOW: longest run collapsed into one summary, e.g. "60s"
+        """
+        filters = []
+        sample_rates = EnvManager.get_optional_list_env_var('LOG_SAMPLE_RATES', [])
+        if sample_rates:
+            from .filters import SamplingFilter, parse_sample_rates
+
+            filters.append(SamplingFilter(parse_sample_rates(sample_rates)))
+        rate_limit = EnvManager.get_optional_float_env_var('LOG_RATE_LIMIT', 0.0)
+        if rate_limit > 0:
+            from .filters import RateLimitFilter
+
+            burst = EnvManager.get_optional_int_env_var('LOG_RATE_LIMIT_BURST', None)
+            filters.append(RateLimitFilter(rate_limit, burst))
+        if EnvManager.get_optional_bool_env_var('LOG_DEDUPLICATE', False):
+            from .filters import DeduplicationFilter
+
+            window = EnvManager.get_optional_duration_env_var('LOG_DEDUPLICATE_WINDOW', 60.0)
+            filters.append(DeduplicationFilter(window))
+        return filters
+
+    @classmethod
+    def _create_formatters(cls):
+        """Return the (console, file) formatters selected by output_format."""
+        text_formatter = logging.Formatter(TEXT_LOG_FORMAT)
+        if cls.output_format == "text":
+            return text_formatter, text_formatter
+        if cls.output_format == "json":
+            from .formatters import JsonFormatter
+
+            json_formatter = JsonFormatter(utc=cls.output_utc)
+            return json_formatter, json_formatter
+        if cls.output_format == "binary":
+            from .formatters import MsgpackFormatter
+
+            return text_formatter, MsgpackFormatter(utc=cls.output_utc)
+        raise ValueError(f"Unknown output format '{cls.output_format}'")
+
+    @classmethod
+    def _create_file_handler(cls, log_file):
+        """Create the file handler selected by file_handler_mode."""
+        if cls.output_format == "binary":
+            if cls.file_handler_mode != "rotating":
+                raise ValueError("The binary output format only supports the 'rotating' file handler mode")
+            return BinaryRotatingFileHandler(
+                log_file, maxBytes=LOG_FILE_MAX_BYTES, backupCount=LOG_FILE_BACKUP_COUNT
+            )
+        if cls.file_handler_mode == "rotating" and cls.log_index_interval is not None:
+            return IndexedRotatingFileHandler(
+                log_file, maxBytes=LOG_FILE_MAX_BYTES, backupCount=LOG_FILE_BACKUP_COUNT, encoding='utf-8',
+                index_interval=cls.log_index_interval,
+            )
+        if cls.file_handler_mode == "rotating":
+            return RotatingFileHandler(
+                log_file, maxBytes=LOG_FILE_MAX_BYTES, backupCount=LOG_FILE_BACKUP_COUNT, encoding='utf-8'
+            )
+        if cls.file_handler_mode == "buffered":
+            return BufferedRotatingFileHandler(
+                log_file, maxBytes=LOG_FILE_MAX_BYTES, backupCount=LOG_FILE_BACKUP_COUNT, encoding='utf-8',
+                buffer_size=cls.buffer_size, flush_interval=cls.buffer_flush_interval,
+                flush_level=cls.buffer_flush_level, index_interval=cls.log_index_interval,
+            )
+        if cls.file_handler_mode == "timed":
+            return TimedSizeRotatingFileHandler(
+                log_file, maxBytes=LOG_FILE_MAX_BYTES, encoding='utf-8',
+                compression=cls.rotation_compression, max_total_bytes=cls.retention_max_bytes,
+                index_interval=cls.log_index_interval,
+            )
+        raise ValueError(f"Unknown file handler mode '{cls.file_handler_mode}'")
+
+    @classmethod
+    def _create_aggregated_handler(cls, log_file):
+        """Create the formatted file handler for log_file inside the aggregator process."""
+        handler = cls._create_file_handler(log_file)
+        handler.setLevel(logging.DEBUG)
+        handler.setFormatter(cls._create_formatters()[1])
+        return handler
+
+    @classmethod
+    def _get_aggregator_address(cls):
+        if cls.aggregator_address:
+            return cls.aggregator_address
+        return os.environ.get(AGGREGATOR_ADDRESS_ENV_VAR) or None
+
+    @classmethod
+    def start_log_aggregator(cls, address=None, timeout=10.0):
+        """
+        Start the log aggregator process of the multi-process mode.
+        Call it in the parent process before starting the workers: loggers created
+        afterwards, in this process or in workers that inherit its environment,
+        send their file records to the aggregator.
+
+        Args:
+            address (str, optional): "unix:PATH" or "HOST:PORT" to listen on.
+                                     If None, uses a Unix socket in a private temp directory.
+            timeout (float): Seconds to wait for the aggregator to start listening
+
+        Returns:
+            str: The address the aggregator listens on
+        """
+        import multiprocessing
+
+        with cls._lock:
+            if cls._aggregator_process is not None:
+                return cls.aggregator_address
+            settings = {name: getattr(cls, name) for name in _AGGREGATOR_SETTINGS}
+            context = multiprocessing.get_context('spawn')
+            parent_connection, child_connection = context.Pipe(duplex=False)
+            process = context.Process(
+                target=_run_log_aggregator, args=(settings, address, child_connection),
+                name='h7-log-aggregator', daemon=True,
+            )
+            process.start()
+            child_connection.close()
+            if not parent_connection.poll(timeout):
+                process.terminate()
+                raise RuntimeError(f"The log aggregator did not start within {timeout} seconds")
+            started = parent_connection.recv()
+            if isinstance(started, BaseException):
+                process.join()
+                raise started
+
+            cls._aggregator_process = process
+            cls.aggregator_address = started
+            os.environ[AGGREGATOR_ADDRESS_ENV_VAR] = started
+            atexit.register(cls.stop_log_aggregator)
+            return started
+
+    @classmethod
+    def stop_log_aggregator(cls, timeout=10.0):
+        """
+        Stop the aggregator process started by start_log_aggregator, after it wrote
+        the records received so far. Safe to call twice.
+        """
+        with cls._lock:
+            process, cls._aggregator_process = cls._aggregator_process, None
+            if process is None:
+                return
+            cls.aggregator_address = None
+            os.environ.pop(AGGREGATOR_ADDRESS_ENV_VAR, None)
+        from .multiprocess import AggregatorClientHandler
+
+        # Close our own connections first so the aggregator sees every record we sent
+        handlers = [handler for logger in cls._loggers.values() for handler in logger.handlers]
+        if cls._async_pipeline is not None:
+            cls._async_pipeline.stop()
+            for routed in cls._async_pipeline.router.routes.values():
+                handlers.extend(routed)
+        for handler in handlers:
+            if isinstance(handler, FlightRecorderHandler):
+                handler = handler.target
+            if isinstance(handler, AggregatorClientHandler):
+                handler.close()
+        process.terminate()
+        process.join(timeout)
+
+    @classmethod
+    def dump_flight_recorder(cls, logger_name=None):
+        """
+        Write the DEBUG records buffered by the flight recorder mode to the log files.
+
+        Args:
+            logger_name (str, optional): Only dump the records of this logger.
+                                         If None, dumps every logger.
+        """
+        with cls._lock:
+            loggers = [logger for name, logger in cls._loggers.items() if logger_name in (None, name)]
+            routes = cls._async_pipeline.router.routes if cls._async_pipeline is not None else {}
+            handlers = [handler for logger in loggers for handler in logger.handlers]
+            handlers += [handler for logger in loggers for handler in routes.get(logger.name, ())]
+        for handler in handlers:
+            if isinstance(handler, FlightRecorderHandler):
+                handler.dump()
+
+    @classmethod
+    def _get_async_pipeline(cls):
+        """Return the shared async pipeline, creating it on first use; called with the lock held."""
+        if cls._async_pipeline is None:
+            cls._async_pipeline = AsyncLoggingPipeline(cls.async_queue_size, cls.async_overflow_policy)
+            atexit.register(cls.shutdown)
+        return cls._async_pipeline
+
+    @classmethod
+    def shutdown(cls):
+        """
+        Flush pending records and stop the background writer of the async mode.
+        Registered with atexit when the async pipeline is created; safe to call twice.
+        """
+        with cls._lock:
+            pipeline = cls._async_pipeline
+        if pipeline is not None:
+            pipeline.stop()
+
+    @classmethod
+    def _reinit_after_fork(cls):
+        """
+        Reset process-local state in a forked child.
+        The lock may have been held by another thread of the parent, and the file
+        handlers share the parent's open file descriptions; each child reopens its
+        log files lazily on the next record instead.
+        """
+        cls._lock = threading.RLock()
+        if cls._async_pipeline is not None:
+            cls._async_pipeline.reinit_after_fork()
+        cls._handler_pool.reinit_after_fork()
+        handlers = [handler for logger in cls._loggers.values() for handler in logger.handlers]
+        if cls._async_pipeline is not None:
+            for routed in cls._async_pipeline.router.routes.values():
+                handlers.extend(routed)
+        for handler in handlers:
+            # Frames from both processes would also interleave on a shared aggregator connection
+            close_handles(handler)
+        # The aggregator belongs to the parent
+        cls._aggregator_process = None
+
+
+def _default_logs_dir():
+    """Return the logs folder of the project root, next to the zipapp when the root lies inside it."""
+    root = find_project_root()
+    archive = running_archive()
+    if archive is not None and archive.contains(root):
+        # Nothing can be written inside the archive
+        root = archive.archive.parent
+    return root / 'logs'
+
+
+def _time_handler(handler: logging.Handler):
+    """Record the time spent in handler.handle as logger_handler_seconds{handler=<class name>}."""
+    handle = handler.handle
+    labels = (("handler", type(handler).__name__),)
+    clock = time.perf_counter
+
+    def timed_handle(record):
+        if not metrics.enabled:
+            return handle(record)
+        start = clock()
+        try:
+            return handle(record)
+        finally:
+            metrics.observe("logger_handler_seconds", clock() - start, labels)
+
+    handler.handle = timed_handle
+
+
+def _run_log_aggregator(settings: Dict[str, Any], address: Optional[str], connection):
+    """Entry point of the aggregator process; serves until terminated."""
+    import signal
+
+    from .multiprocess import LogAggregator
+
+    for name, value in settings.items():
+        setattr(LoggerManager, name, value)
+    try:
+        aggregator = LogAggregator(LoggerManager._create_aggregated_handler, address)
+    except Exception as error:
+        connection.send(error)
+        return
+
+    # SIGTERM stops serving; close() below still reads the connections left in the listen
+    # queue, then closes the handlers so buffered records are written
+    def request_shutdown(signum, frame):
+        threading.Thread(target=aggregator._server.shutdown, daemon=True).start()
+
+    signal.signal(signal.SIGTERM, request_shutdown)
+    connection.send(aggregator.address)
+    connection.close()
+    try:
+        aggregator.serve_forever()
+    finally:
+        aggregator.close()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=LoggerManager._reinit_after_fork)
@@ -0,0 +1,240 @@
+"""
+Single-writer logging for applications with several worker processes.
+
+Workers get an :class:`AggregatorClientHandler` instead of a file handler. It sends
+every record, tagged with the log file it belongs to, over a local socket to one
+:class:`LogAggregator`, which owns the real file handlers and does all the writing
+and rotation, so processes never race on the same file.
+
+Records travel in the stdlib ``SocketHandler`` wire format (a 4-byte length followed
+by a pickled record dict). The aggregator unpickles what it receives and must only
+listen on addresses reachable by trusted processes: a Unix socket in a private
+directory, or the loopback interface.
+"""
+
+import logging
+import os
+import pickle
+import shutil
+import socket
+import socketserver
+import struct
+import tempfile
+import threading
+from logging.handlers import SocketHandler
+from typing import Callable, Dict, Optional, Tuple, Union
+
+# Record attribute naming the log file an aggregated record is written to
+_LOG_FILE_ATTRIBUTE = "_h7_log_file"
+
+_UNIX_PREFIX = "unix:"
+
+_Address = Union[str, Tuple[str, int]]
+
+
+def parse_address(address: str) -> _Address:
+    """
+    Parse an aggregator address, "unix:/path/to/socket" or "host:port".
+
+    Raises:
+        ValueError: If the address has neither form
+    """
+    if address.startswith(_UNIX_PREFIX):
+        return address[len(_UNIX_PREFIX):]
+    host, _, port = address.rpartition(":")
+    if not host or not port.isdigit():
+        raise ValueError(f"Invalid log aggregator address '{address}', expected 'unix:PATH' or 'HOST:PORT'")
+    return host, int(port)
+
+
+def format_address(address: _Address) -> str:
+    """Return the text form of a parsed or bound address, the inverse of ``parse_address``."""
+    if isinstance(address, str):
+        return _UNIX_PREFIX + address
+    return f"{address[0]}:{address[1]}"
+
+
+class AggregatorClientHandler(SocketHandler):
+    """SocketHandler sending records for ``log_file`` to the aggregator at ``address``."""
+
+    def __init__(self, address: str, log_file: str):
+        """Create the handler; the connection is opened on the first record."""
+        parsed = parse_address(address)
+        if isinstance(parsed, str):
+            super().__init__(parsed, None)
+        else:
+            super().__init__(*parsed)
+        self.log_file = log_file
+
+    def makePickle(self, record: logging.LogRecord) -> bytes:
+        """Return the SocketHandler payload of the record, tagged with the destination file."""
+        if record.exc_info and not record.exc_text:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+        payload = dict(record.__dict__)
+        payload["msg"] = record.getMessage()
+        payload["args"] = None
+        payload["exc_info"] = None
+        payload.pop("message", None)
+        payload[_LOG_FILE_ATTRIBUTE] = self.log_file
+        data = pickle.dumps(payload, 1)
+        return struct.pack(">L", len(data)) + data
+
+
+class _RecordStreamHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        while True:
+            header = self.rfile.read(4)
+            if len(header) < 4:
+                return
+            size = struct.unpack(">L", header)[0]
+            data = self.rfile.read(size)
+            if len(data) < size:
+                return
+            self.server.aggregator.handle(logging.makeLogRecord(pickle.loads(data)))
+
+
+class _CountingMixIn:
+    """Count the connections from their acceptance, so close() also waits for the ones not yet read."""
+
+    def process_request(self, request, client_address):
+        self.aggregator._connection_opened()
+        try:
+            super().process_request(request, client_address)
+        except BaseException:
+            self.aggregator._connection_closed()
+            raise
+
+    def process_request_thread(self, request, client_address):
+        try:
+            super().process_request_thread(request, client_address)
+        finally:
+            self.aggregator._connection_closed()
+
+
+class _UnixServer(_CountingMixIn, socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+    # Many workers connect at once on startup; a refused connection loses records
+    request_queue_size = socket.SOMAXCONN
+
+
+class _TCPServer(_CountingMixIn, socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+    request_queue_size = socket.SOMAXCONN
+
+
+class LogAggregator:
+    """
+    Receive records from worker processes and write them with one handler per log file.
+
+    Args:
+        handler_factory: Returns the handler, with its formatter, for a log file path
+        address: Address to listen on, see ``parse_address``. Defaults to a Unix socket
+                 in a new private directory, or an ephemeral loopback port where Unix
+                 sockets are unavailable. The actual address is available as ``address``.
+    """
+
+    def __init__(self, handler_factory: Callable[[str], logging.Handler], address: Optional[str] = None):
+        """Bind the listening socket; records are received once ``start`` or ``serve_forever`` is called."""
+        self.handler_factory = handler_factory
+        self._handlers: Dict[str, logging.Handler] = {}
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._private_dir: Optional[str] = None
+        self._closed = False
+        self._connections = 0
+        self._idle = threading.Condition(self._lock)
+
+        if address is None:
+            if hasattr(socket, "AF_UNIX"):
+                self._private_dir = tempfile.mkdtemp(prefix="h7-log-")
+                address = _UNIX_PREFIX + os.path.join(self._private_dir, "aggregator.sock")
+            else:
+                address = "127.0.0.1:0"
+        parsed = parse_address(address)
+        if isinstance(parsed, str):
+            if os.path.exists(parsed):
+                os.unlink(parsed)
+            self._server = _UnixServer(parsed, _RecordStreamHandler)
+        else:
+            self._server = _TCPServer(parsed, _RecordStreamHandler)
+        self._server.aggregator = self
+        self.address = format_address(self._server.server_address)
+
+    def handle(self, record: logging.LogRecord):
+        """Write a received record with the handler of the log file it is tagged with."""
+        log_file = record.__dict__.pop(_LOG_FILE_ATTRIBUTE, None)
+        if log_file is None or self._closed:
+            return
+        handler = self._handlers.get(log_file)
+        if handler is None:
+            with self._lock:
+                handler = self._handlers.get(log_file)
+                if handler is None:
+                    handler = self._handlers[log_file] = self.handler_factory(log_file)
+        handler.handle(record)
+
+    def _connection_opened(self):
+        with self._lock:
+            self._connections += 1
+
+    def _connection_closed(self):
+        with self._lock:
+            self._connections -= 1
+            self._idle.notify_all()
+
+    def serve_forever(self):
+        """Accept connections and write their records until ``stop`` or ``close``."""
+        self._server.serve_forever()
+
+    def start(self):
+        """Serve on a background thread, for running the aggregator inside an existing process."""
+        self._thread = threading.Thread(target=self.serve_forever, name="h7-log-aggregator", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop accepting records and close the file handlers. Call from another thread than serve_forever."""
+        self._server.shutdown()
+        self.close()
+
+    def close(self, drain_timeout: float = 5.0):
+        """
+        Close the file handlers, after waiting up to ``drain_timeout`` seconds for clients to disconnect.
+
+        Connections still waiting in the listen queue, e.g. from a worker that sent its
+        records and exited just before the server stopped, are accepted and read first.
+        """
+        self._accept_pending()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        with self._lock:
+            self._idle.wait_for(lambda: self._connections == 0, drain_timeout)
+            self._closed = True
+            handlers, self._handlers = self._handlers, {}
+        for handler in handlers.values():
+            handler.close()
+        if isinstance(self._server.server_address, str):
+            try:
+                os.unlink(self._server.server_address)
+            except OSError:
+                pass
+        if self._private_dir is not None:
+            shutil.rmtree(self._private_dir, ignore_errors=True)
+
+    def _accept_pending(self):
+        """Hand the connections left in the listen queue to handler threads, without blocking."""
+        listener = self._server.socket
+        try:
+            listener.setblocking(False)
+        except OSError:
+            # Already closed
+            return
+        while True:
+            try:
+                request, client_address = listener.accept()
+            except OSError:
+                return
+            request.setblocking(True)
+            self._server.process_request(request, client_address)
@@ -0,0 +1,220 @@
+"""
+Non-blocking logging pipeline built on QueueHandler and QueueListener.
+
+Loggers only get a QueueHandler, which merges the message arguments and puts the
+record on a bounded queue. A single QueueListener thread owned by LoggerManager
+takes records off the queue and routes each one to the real handlers of the logger
+it was logged on, so formatting, file I/O and rotation checks all happen off the
+calling thread.
+"""
+
+import copy
+import logging
+import queue
+import threading
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, List, Optional
+
+from h7_file_finder.instrumentation import metrics
+
+OVERFLOW_POLICIES = ("block", "drop", "drop-debug-first")
+
+# Attribute set on queued records naming the logger whose handlers should emit them
+_ROUTE_ATTRIBUTE = "_h7_route"
+
+
+class BoundedQueueHandler(QueueHandler):
+    """
+    QueueHandler for a bounded queue with a backpressure policy.
+
+    Policies, applied when the queue is full:
+        block: wait for space (no record is ever lost)
+        drop: discard the record
+        drop-debug-first: discard DEBUG and lower records, wait for space for the others
+    """
+
+    def __init__(self, record_queue: queue.Queue, route: str, policy: str = "block"):
+        """
+        Create the handler feeding record_queue with the records of route.
+
+        Raises:
+            ValueError: If the policy is unknown
+        """
+        if policy not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown overflow policy '{policy}', expected one of {OVERFLOW_POLICIES}")
+        super().__init__(record_queue)
+        self.route = route
+        self.policy = policy
+        self.dropped = 0
+        # Set while the pipeline is stopped, so late records are written synchronously
+        self.direct: Optional[logging.Handler] = None
+        # The real handlers the listener routes the records of this handler to
+        self.routed: List[logging.Handler] = []
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """Return a copy of the record, tagged with its route, that is safe to hand to another thread."""
+        # Arguments are merged now because they may be mutated once the call returns;
+        # everything else, including the formatter, runs on the listener thread.
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            if not record.exc_text:
+                record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        setattr(record, _ROUTE_ATTRIBUTE, self.route)
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        """Put the record on the queue, applying the overflow policy when it is full."""
+        if self.direct is not None:
+            self.direct.handle(record)
+            return
+        if self.policy == "block":
+            self.queue.put(record)
+            return
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            if self.policy == "drop" or record.levelno <= logging.DEBUG:
+                self.dropped += 1
+                if metrics.enabled:
+                    metrics.inc("logger_records_dropped_total", labels=(("reason", "queue_full"),))
+            else:
+                self.queue.put(record)
+
+
+class RoutingHandler(logging.Handler):
+    """Dispatch records taken off the queue to the handlers of the logger they came from."""
+
+    def __init__(self):
+        """Create the handler without routes."""
+        super().__init__()
+        self.routes: Dict[str, List[logging.Handler]] = {}
+
+    def handle(self, record: logging.LogRecord) -> bool:
+        """Pass the record to the handlers of its route whose level it reaches."""
+        for handler in self.routes.get(getattr(record, _ROUTE_ATTRIBUTE, record.name), ()):
+            if record.levelno >= handler.level:
+                handler.handle(record)
+        return True
+
+    def emit(self, record: logging.LogRecord):
+        """Same as handle."""
+        self.handle(record)
+
+
+class _BarrierHandler(logging.Handler):
+    """Signals that the listener reached a record, and so wrote every record queued before it."""
+
+    def __init__(self):
+        super().__init__()
+        self.reached = threading.Event()
+
+    def emit(self, record: logging.LogRecord):
+        self.reached.set()
+
+
+class _Listener(QueueListener):
+    def enqueue_sentinel(self):
+        # The queue is bounded, so wait for room instead of failing with queue.Full
+        self.queue.put(self._sentinel)
+
+
+class AsyncLoggingPipeline:
+    """A bounded record queue drained by one background listener thread."""
+
+    def __init__(self, maxsize: int = 10000, policy: str = "block"):
+        """
+        Create a stopped pipeline; see BoundedQueueHandler for the policies.
+
+        Raises:
+            ValueError: If the policy is unknown
+        """
+        if policy not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown overflow policy '{policy}', expected one of {OVERFLOW_POLICIES}")
+        self.maxsize = maxsize
+        self.policy = policy
+        self.queue: queue.Queue = queue.Queue(maxsize)
+        self.router = RoutingHandler()
+        self.queue_handlers: List[BoundedQueueHandler] = []
+        self._listener: Optional[QueueListener] = None
+        self._lock = threading.Lock()
+
+    @property
+    def running(self) -> bool:
+        """Whether the listener thread is draining the queue."""
+        return self._listener is not None
+
+    @property
+    def dropped(self) -> int:
+        """Number of records discarded by the overflow policy."""
+        return sum(handler.dropped for handler in self.queue_handlers)
+
+    def start(self):
+        """Start the listener thread, if it is not running."""
+        with self._lock:
+            if self._listener is None:
+                self._listener = _Listener(self.queue, self.router)
+                self._listener.start()
+                for queue_handler in self.queue_handlers:
+                    queue_handler.direct = None
+
+    def attach(self, route: str, handlers: List[logging.Handler]) -> BoundedQueueHandler:
+        """Register the real handlers for ``route`` and return the QueueHandler that feeds them."""
+        self.router.routes[route] = list(handlers)
+        queue_handler = BoundedQueueHandler(self.queue, route, self.policy)
+        queue_handler.routed = self.router.routes[route]
+        with self._lock:
+            self.queue_handlers.append(queue_handler)
+        self.start()
+        return queue_handler
+
+    def detach(self, route: str, timeout: float = 10.0) -> List[logging.Handler]:
+        """
+        Unregister ``route`` once the records already queued for it are written.
+
+        Returns:
+            list: The real handlers of the route, for the caller to close
+        """
+        with self._lock:
+            self.queue_handlers = [handler for handler in self.queue_handlers if handler.route != route]
+            running = self._listener is not None
+        if running:
+            # Handled by the listener after every record queued before it
+            barrier = _BarrierHandler()
+            barrier_route = f"{_ROUTE_ATTRIBUTE}.barrier.{id(barrier)}"
+            self.router.routes[barrier_route] = [barrier]
+            record = logging.makeLogRecord({"levelno": logging.CRITICAL, _ROUTE_ATTRIBUTE: barrier_route})
+            try:
+                self.queue.put(record, timeout=timeout)
+                barrier.reached.wait(timeout)
+            except queue.Full:
+                pass
+            self.router.routes.pop(barrier_route, None)
+        return self.router.routes.pop(route, [])
+
+    def stop(self):
+        """
+        Write out every queued record and stop the listener thread.
+        Records logged afterwards, e.g. from other atexit hooks, are written synchronously.
+        """
+        with self._lock:
+            listener, self._listener = self._listener, None
+            for queue_handler in self.queue_handlers:
+                queue_handler.direct = self.router
+        if listener is not None:
+            listener.stop()
+        for handlers in self.router.routes.values():
+            for handler in handlers:
+                handler.flush()
+
+    def reinit_after_fork(self):
+        """Give a forked child its own queue and listener; the parent's thread did not survive the fork."""
+        self._lock = threading.Lock()
+        self.queue = queue.Queue(self.maxsize)
+        for queue_handler in self.queue_handlers:
+            queue_handler.queue = self.queue
+        was_running, self._listener = self._listener is not None, None
+        if was_running:
+            self.start()
@@ -0,0 +1,141 @@
+import logging
+import os
+import sys
+import tempfile
+import unittest
+from unittest.mock import patch
+
+# Add the src directory to the path so we can import the package
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from test_logger_manager import use_default_filter_settings
+
+from h7_logger_manager.fast_logger import FastLogger, invalidate_level_cache, lazy, set_handler_level
+from h7_logger_manager.logger_manager import LoggerManager
+from h7_logger_manager.queue_logging import AsyncLoggingPipeline
+
+
+class ListHandler(logging.Handler):
+    def __init__(self, level=logging.NOTSET):
+        super().__init__(level)
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+
+class TestFastLogger(unittest.TestCase):
+
+    def make_logger(self, name, handler_level=logging.INFO):
+        logger = logging.getLogger(name)
+        logger.setLevel(logging.DEBUG)
+        logger.propagate = False
+        handler = ListHandler(handler_level)
+        logger.addHandler(handler)
+        self.addCleanup(logger.removeHandler, handler)
+        invalidate_level_cache()
+        return FastLogger(logger), handler
+
+    def test_disabled_calls_skip_record_and_lazy_values(self):
+        """Test that calls below every handler level never build a record or call lazy values"""
+        logger, handler = self.make_logger("fast.disabled")
+        calls = []
+
+        def expensive():
+            calls.append(1)
+            return "value"
+
+        with patch.object(logging.Logger, "makeRecord", side_effect=AssertionError("record created")):
+            logger.debug(lambda: f"state {expensive()}")
+            logger.debug("state %s", lazy(expensive))
+            logger.log(logging.DEBUG, "state %s", lazy(expensive))
+        self.assertEqual(calls, [])
+        self.assertFalse(logger.isEnabledFor(logging.DEBUG))
+        self.assertEqual(logger.threshold, logging.INFO)
+
+        logger.info(lambda: f"state {expensive()}")
+        logger.info("state %s and %s", lazy(expensive), 2)
+        self.assertEqual([record.getMessage() for record in handler.records], ["state value", "state value and 2"])
+        self.assertEqual(handler.records[0].funcName, "test_disabled_calls_skip_record_and_lazy_values")
+        self.assertEqual(len(calls), 2)
+
+    def test_records_name_the_caller(self):
+        """Test that records report the frame calling the wrapper, honouring stacklevel"""
+        logger, handler = self.make_logger("fast.caller")
+
+        def helper():
+            logger.info("from helper", stacklevel=2)
+
+        logger.warning("direct", stack_info=True)
+        logger.log(logging.ERROR, "through log")
+        helper()
+        try:
+            raise RuntimeError("boom")
+        except RuntimeError:
+            logger.exception("failed")
+        self.assertEqual({record.funcName for record in handler.records}, {"test_records_name_the_caller"})
+        self.assertEqual({record.pathname for record in handler.records}, {__file__})
+        self.assertIn('logger.warning("direct", stack_info=True)', handler.records[0].stack_info.splitlines()[-1])
+        self.assertIs(handler.records[-1].exc_info[0], RuntimeError)
+
+    def test_level_changes_invalidate_threshold(self):
+        """Test that level changes through the wrapper and set_handler_level take effect"""
+        logger, handler = self.make_logger("fast.levels")
+        logger.debug("dropped")
+        set_handler_level(handler, logging.DEBUG)
+        logger.debug("kept")
+        logger.setLevel(logging.ERROR)
+        logger.warning("dropped")
+        logger.error("kept")
+        logging.disable(logging.CRITICAL)
+        try:
+            invalidate_level_cache()
+            logger.critical("dropped")
+        finally:
+            logging.disable(logging.NOTSET)
+        invalidate_level_cache()
+        logger.exception("kept")
+        self.assertEqual([record.getMessage() for record in handler.records], ["kept"] * 3)
+        self.assertIsNone(handler.records[-1].exc_info[0])
+
+    def test_threshold_follows_propagation_and_async_routes(self):
+        """Test the threshold of a child logger and of a logger behind the async queue"""
+        self.make_logger("fast.parent", logging.WARNING)
+        child = logging.getLogger("fast.parent.child")
+        self.assertEqual(FastLogger(child).threshold, logging.WARNING)
+
+        pipeline = AsyncLoggingPipeline()
+        self.addCleanup(pipeline.stop)
+        routed = ListHandler(logging.ERROR)
+        queued = logging.getLogger("fast.async")
+        queued.setLevel(logging.DEBUG)
+        queued.propagate = False
+        queue_handler = pipeline.attach("fast.async", [routed])
+        queued.addHandler(queue_handler)
+        self.addCleanup(queued.removeHandler, queue_handler)
+        self.assertEqual(FastLogger(queued).threshold, logging.ERROR)
+
+    @patch("h7_logger_manager.logger_manager.EnvManager")
+    def test_setup_fast_logger(self, mock_env_manager):
+        """Test that LoggerManager wraps its logger and that new handlers invalidate the threshold"""
+        with tempfile.TemporaryDirectory() as temp_logs_dir:
+            mock_env_manager.get_optional_env_var.return_value = "true"
+            use_default_filter_settings(mock_env_manager)
+            LoggerManager._loggers = {}
+            logging.getLogger("fast.managed").handlers.clear()
+            try:
+                logger = FastLogger(logging.getLogger("fast.managed"))
+                logger.logger.propagate = False
+                # Without handlers, records go to logging.lastResort
+                self.assertEqual(logger.threshold, logging.lastResort.level)
+                fast_logger = LoggerManager.setup_fast_logger("fast.managed", logs_dir=temp_logs_dir)
+                self.assertIs(fast_logger.logger, logger.logger)
+                self.assertEqual(logger.threshold, logging.DEBUG)
+                self.assertEqual(fast_logger.name, "fast.managed")
+            finally:
+                logger.logger.propagate = True
+                LoggerManager.close_all()
+
+
+if __name__ == '__main__':
+    unittest.main()
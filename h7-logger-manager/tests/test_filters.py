@@ -0,0 +1,160 @@
+import logging
+import os
+import sys
+import unittest
+from unittest.mock import patch
+
+# Add the src directory to the path so we can import the package
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from h7_file_finder.instrumentation import metrics
+
+from h7_logger_manager.filters import DeduplicationFilter, RateLimitFilter, SamplingFilter, parse_sample_rates
+from h7_logger_manager.logger_manager import LoggerManager
+
+
+class ListHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.messages = []
+
+    def emit(self, record):
+        self.messages.append(record.getMessage())
+
+
+def make_logger(name, log_filter):
+    logger = logging.getLogger(name)
+    logger.handlers.clear()
+    logger.filters.clear()
+    logger.setLevel(logging.DEBUG)
+    logger.propagate = False
+    handler = ListHandler()
+    logger.addHandler(handler)
+    logger.addFilter(log_filter)
+    return logger, handler
+
+
+class TestSamplingFilter(unittest.TestCase):
+
+    def test_parse_sample_rates(self):
+        """Test parsing of LEVEL:RATE entries"""
+        self.assertEqual(parse_sample_rates(["debug:0.1", "INFO:1"]), {logging.DEBUG: 0.1, logging.INFO: 1.0})
+        for entry in ("DEBUG", "VERBOSE:0.5", "INFO:2"):
+            with self.assertRaises(ValueError):
+                parse_sample_rates([entry])
+
+    def test_sampled_levels_only(self):
+        """Test that configured levels are sampled and other levels always pass"""
+        with patch("h7_logger_manager.filters.random.random", side_effect=[0.1, 0.5, 0.2, 0.9]):
+            logger, handler = make_logger("sampling_test", SamplingFilter({logging.DEBUG: 0.25}))
+            for index in range(4):
+                logger.debug("debug %d", index)
+        for index in range(3):
+            logger.warning("warning %d", index)
+        self.assertEqual(handler.messages, ["debug 0", "debug 2", "warning 0", "warning 1", "warning 2"])
+
+
+class TestRateLimitFilter(unittest.TestCase):
+
+    def test_limit_per_call_site(self):
+        """Test that each call site gets its own bucket and warnings are never limited"""
+        logger, handler = make_logger("rate_limit_test", RateLimitFilter(rate=1, burst=3))
+        with patch("h7_logger_manager.filters.time.monotonic", return_value=100.0):
+            for index in range(10):
+                logger.info("site a %d", index)
+            for index in range(10):
+                logger.info("site b %d", index)
+            for index in range(5):
+                logger.warning("warning %d", index)
+        self.assertEqual(sum(message.startswith("site a") for message in handler.messages), 3)
+        self.assertEqual(sum(message.startswith("site b") for message in handler.messages), 3)
+        self.assertEqual(sum(message.startswith("warning") for message in handler.messages), 5)
+        self.assertEqual(logger.filters[0].suppressed, 14)
+
+    def test_tokens_refill(self):
+        """Test that the bucket refills at the configured rate"""
+        logger, handler = make_logger("rate_refill_test", RateLimitFilter(rate=2, burst=1))
+        with patch("h7_logger_manager.filters.time.monotonic", side_effect=[0.0, 0.1, 0.6, 0.7]):
+            for index in range(4):
+                logger.info("tick %d", index)
+        self.assertEqual(handler.messages, ["tick 0", "tick 2"])
+
+
+class TestDeduplicationFilter(unittest.TestCase):
+
+    def test_repeats_collapsed(self):
+        """Test that consecutive identical messages become one summary line"""
+        logger, handler = make_logger("dedup_test", DeduplicationFilter(window=60))
+        for _ in range(5):
+            logger.info("connection to %s lost", "db")
+        logger.info("connection to %s lost", "cache")
+        logger.info("reconnected")
+        self.assertEqual(handler.messages, [
+            "connection to db lost",
+            "Last message repeated 4 times",
+            "connection to cache lost",
+            "reconnected",
+        ])
+
+    def test_window_and_flush(self):
+        """Test that a run longer than the window is summarized and flush reports pending repeats"""
+        log_filter = DeduplicationFilter(window=10)
+        logger, handler = make_logger("dedup_window_test", log_filter)
+        for created in (0, 1, 2, 15, 16):
+            record = logger.makeRecord(logger.name, logging.INFO, __file__, 1, "tick", None, None)
+            record.created = created
+            logger.handle(record)
+        self.assertEqual(handler.messages, ["tick", "Last message repeated 2 times", "tick"])
+
+        log_filter.flush()
+        self.assertEqual(handler.messages[-1], "Last message repeated 1 times")
+
+
+class TestFilterMetrics(unittest.TestCase):
+
+    def setUp(self):
+        metrics.reset()
+        metrics.enable()
+
+    def tearDown(self):
+        metrics.disable()
+        metrics.reset()
+
+    def test_dropped_records_counted_by_reason(self):
+        """Test that records discarded by the filters are counted per filter when metrics are enabled"""
+        logger, _ = make_logger("metrics_rate_limit_test", RateLimitFilter(rate=1, burst=1))
+        with patch("h7_logger_manager.filters.time.monotonic", return_value=100.0):
+            for _ in range(3):
+                logger.info("limited")
+        logger, _ = make_logger("metrics_dedup_test", DeduplicationFilter(window=60))
+        for _ in range(4):
+            logger.info("repeated")
+        counters = metrics.snapshot()["counters"]
+        self.assertEqual(counters['logger_records_dropped_total{reason="rate_limited"}'], 2)
+        self.assertEqual(counters['logger_records_dropped_total{reason="deduplicated"}'], 3)
+
+
+class TestFilterSettings(unittest.TestCase):
+
+    @patch("h7_logger_manager.logger_manager.EnvManager")
+    def test_filters_from_environment(self, mock_env_manager):
+        """Test that LoggerManager builds the filters from the environment variables"""
+        settings = {
+            "LOG_SAMPLE_RATES": ["DEBUG:0.1"],
+            "LOG_RATE_LIMIT": 50.0,
+            "LOG_RATE_LIMIT_BURST": 200,
+            "LOG_DEDUPLICATE": True,
+            "LOG_DEDUPLICATE_WINDOW": 30.0,
+        }
+        for getter in ("get_optional_list_env_var", "get_optional_float_env_var", "get_optional_int_env_var",
+                       "get_optional_bool_env_var", "get_optional_duration_env_var"):
+            getattr(mock_env_manager, getter).side_effect = lambda key, default=None: settings.get(key, default)
+
+        sampling, rate_limit, dedup = LoggerManager._create_filters()
+        self.assertEqual(sampling.rates, {logging.DEBUG: 0.1})
+        self.assertEqual((rate_limit.rate, rate_limit.burst), (50.0, 200.0))
+        self.assertEqual(dedup.window, 30.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
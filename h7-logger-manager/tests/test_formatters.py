@@ -0,0 +1,127 @@
+import io
+import json
+import logging
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+# Add the src directory to the path so we can import the package
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from h7_logger_manager.formatters import JsonFormatter, MsgpackFormatter, iter_binary_records, packb, unpackb
+from h7_logger_manager.handlers import BinaryRotatingFileHandler
+
+
+def make_record(msg, level=logging.INFO, **extra):
+    fields = {"name": "app", "msg": msg, "levelno": level, "levelname": logging.getLevelName(level)}
+    fields.update(extra)
+    return logging.makeLogRecord(fields)
+
+
+class TestJsonFormatter(unittest.TestCase):
+
+    def test_fields_and_extra(self):
+        """Test that the standard fields and extra fields are serialized"""
+        formatter = JsonFormatter(utc=True)
+        record = make_record("user %s logged in", args=("bob",), user_id=42, tags=["a", "b"])
+        payload = json.loads(formatter.format(record))
+        self.assertEqual(payload["level"], "INFO")
+        self.assertEqual(payload["logger"], "app")
+        self.assertEqual(payload["message"], "user bob logged in")
+        self.assertEqual(payload["user_id"], 42)
+        self.assertEqual(payload["tags"], ["a", "b"])
+        self.assertRegex(payload["time"], r"^\d{4}-\d\d-\d\dT\d\d:\d\d:\d\d\.\d{3}Z$")
+
+    def test_private_attributes_and_unserializable_values(self):
+        """Test that underscore attributes are skipped and other objects are stringified"""
+        formatter = JsonFormatter()
+        record = make_record("msg", _h7_route="app", path=Path("/tmp/x"))
+        payload = json.loads(formatter.format(record))
+        self.assertNotIn("_h7_route", payload)
+        self.assertEqual(payload["path"], str(Path("/tmp/x")))
+
+    def test_exception_and_quoting(self):
+        """Test that exceptions are included and special characters are escaped"""
+        formatter = JsonFormatter()
+        try:
+            raise RuntimeError("boom")
+        except RuntimeError:
+            record = make_record('quote " and\nnewline', exc_info=sys.exc_info())
+        line = formatter.format(record)
+        self.assertNotIn("\n", line)
+        payload = json.loads(line)
+        self.assertEqual(payload["message"], 'quote " and\nnewline')
+        self.assertIn("RuntimeError: boom", payload["exc_info"])
+
+    def test_timestamp_cached_per_second(self):
+        """Test that records in the same second share the date text but keep their milliseconds"""
+        formatter = JsonFormatter(utc=True)
+        first = make_record("a", created=1700000000.123, msecs=123)
+        second = make_record("b", created=1700000000.987, msecs=987)
+        self.assertEqual(json.loads(formatter.format(first))["time"], "2023-11-14T22:13:20.123Z")
+        self.assertEqual(json.loads(formatter.format(second))["time"], "2023-11-14T22:13:20.987Z")
+
+
+class TestMsgpackFormatter(unittest.TestCase):
+
+    def test_pack_roundtrip(self):
+        """Test that packb and unpackb roundtrip the supported types"""
+        value = {"none": None, "flags": [True, False], "small": 5, "negative": -7, "big": 1 << 40,
+                 "minus": -(1 << 40), "pi": 3.5, "short": "x", "long": "y" * 300, "raw": b"\x00\x01",
+                 "nested": {str(i): i for i in range(20)}, "array": list(range(-40, 40)),
+                 "medium": "z" * 70000}
+        self.assertEqual(unpackb(packb(value)), value)
+        self.assertEqual(unpackb(packb((bytearray(b"ab"), 1 << 70, Path("p")))), [b"ab", str(1 << 70), "p"])
+        with self.assertRaises(ValueError):
+            unpackb(b"\xc1")
+
+    def test_length_prefixed_records(self):
+        """Test that binary records can be read back from a stream"""
+        formatter = MsgpackFormatter(utc=True)
+        stream = io.BytesIO()
+        stream.write(formatter.format_bytes(make_record("first", request_id="r1")))
+        stream.write(formatter.format_bytes(make_record("second", logging.ERROR)))
+        stream.seek(0)
+        records = list(iter_binary_records(stream))
+        self.assertEqual([record["message"] for record in records], ["first", "second"])
+        self.assertEqual(records[0]["request_id"], "r1")
+        self.assertEqual(records[1]["level"], "ERROR")
+        self.assertEqual(set(records[1]), {"time", "level", "logger", "message"})
+
+    def test_extra_fields_named_like_record_fields_are_prefixed(self):
+        """Test that both formats keep the record fields and emit colliding extras with a prefix"""
+        extra = {"time": "yesterday", "level": 3, "logger": "other", "user": "bob"}
+        record = logging.getLogger("app").makeRecord("app", logging.INFO, __file__, 1, "msg", (), None, extra=extra)
+        payload = json.loads(JsonFormatter(utc=True).format(record))
+        stream = io.BytesIO(MsgpackFormatter(utc=True).format_bytes(record))
+        binary = next(iter_binary_records(stream))
+        for fields in (payload, binary):
+            self.assertEqual((fields["level"], fields["logger"]), ("INFO", "app"))
+            self.assertNotEqual(fields["time"], "yesterday")
+            self.assertEqual((fields["extra_time"], fields["extra_level"], fields["extra_logger"]),
+                             ("yesterday", 3, "other"))
+            self.assertEqual(fields["user"], "bob")
+        self.assertEqual(payload, binary)
+
+    def test_binary_handler_rotation(self):
+        """Test that the binary handler writes whole records and rotates between them"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            log_file = Path(temp_dir) / "app.bin"
+            handler = BinaryRotatingFileHandler(log_file, maxBytes=200, backupCount=5)
+            handler.setFormatter(MsgpackFormatter())
+            for i in range(10):
+                handler.handle(make_record(f"record {i}"))
+            handler.close()
+
+            messages = []
+            for path in sorted(Path(temp_dir).iterdir(), reverse=True):
+                with open(path, "rb") as stream:
+                    messages += [record["message"] for record in iter_binary_records(stream)]
+            self.assertEqual(messages, [f"record {i}" for i in range(10)])
+            self.assertTrue((Path(temp_dir) / "app.bin.1").exists())
+
+
+if __name__ == '__main__':
+    unittest.main()
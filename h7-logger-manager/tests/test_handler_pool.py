@@ -0,0 +1,85 @@
+import logging
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+# Add the src directory to the path so we can import the package
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from h7_logger_manager.handler_pool import HandlerPool, close_handles
+from h7_logger_manager.handlers import FlightRecorderHandler, IndexedRotatingFileHandler
+
+
+def make_record(message):
+    return logging.LogRecord("pool", logging.INFO, __file__, 1, message, None, None)
+
+
+class TestHandlerPool(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.logs_dir = Path(self.temp_dir.name)
+        self.pool = HandlerPool()
+
+    def tearDown(self):
+        self.pool.close_all()
+        self.temp_dir.cleanup()
+
+    def acquire(self, name):
+        path = str(self.logs_dir / name)
+        return self.pool.acquire(path, lambda: logging.FileHandler(path, delay=True))
+
+    def test_acquire_shares_and_release_closes_last(self):
+        """Test that a key gets one handler, closed when its last reference is released"""
+        first = self.acquire("a.log")
+        self.assertIs(self.acquire("a.log"), first)
+        self.assertIsNot(self.acquire("b.log"), first)
+        self.assertEqual(len(self.pool), 2)
+
+        first.handle(make_record("one"))
+        self.assertFalse(self.pool.release(first))
+        self.assertIsNotNone(first.stream)
+        self.assertTrue(self.pool.release(first))
+        self.assertIsNone(first.stream)
+        self.assertFalse(self.pool.owns(first))
+        # Released handlers and foreign handlers are ignored
+        self.assertFalse(self.pool.release(first))
+        self.assertFalse(self.pool.release(logging.NullHandler()))
+        self.assertEqual(len(self.pool), 1)
+
+    def test_least_recently_used_files_are_closed(self):
+        """Test that at most max_open files stay open and closed ones reopen on their next record"""
+        self.pool.max_open = 2
+        handlers = [self.acquire(f"{index}.log") for index in range(5)]
+        for round_number in range(3):
+            for handler in handlers:
+                handler.handle(make_record(f"round {round_number}"))
+                self.assertLessEqual(sum(h.stream is not None for h in handlers), 2)
+            self.assertEqual(self.pool.open_count, 2)
+        self.assertEqual([h.stream is not None for h in handlers], [False, False, False, True, True])
+        for index in range(5):
+            lines = (self.logs_dir / f"{index}.log").read_text().splitlines()
+            self.assertEqual(lines, ["round 0", "round 1", "round 2"])
+
+    def test_close_handles_keeps_handler_usable(self):
+        """Test that close_handles closes the log and index files of a wrapped handler"""
+        path = str(self.logs_dir / "indexed.log")
+        handler = IndexedRotatingFileHandler(path, index_interval=1)
+        recorder = FlightRecorderHandler(handler, capacity=4)
+        try:
+            recorder.handle(make_record("before"))
+            self.assertIsNotNone(handler._index)
+            close_handles(recorder)
+            self.assertIsNone(handler.stream)
+            self.assertIsNone(handler._index)
+            recorder.handle(make_record("after"))
+            self.assertEqual(Path(path).read_text().splitlines(), ["before", "after"])
+        finally:
+            recorder.close()
+            handler.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,234 @@
+import gzip
+import logging
+import os
+import sys
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+# Add the src directory to the path so we can import the package
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from h7_logger_manager import handlers
+from h7_logger_manager.handlers import (
+    BufferedRotatingFileHandler,
+    FlightRecorderHandler,
+    TimedSizeRotatingFileHandler,
+    wait_for_compression,
+)
+
+
+def make_record(msg, level=logging.INFO):
+    return logging.makeLogRecord({"msg": msg, "levelno": level, "levelname": logging.getLevelName(level)})
+
+
+class TestBufferedRotatingFileHandler(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.log_file = Path(self.temp_dir.name) / "app.log"
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def make_handler(self, **kwargs):
+        handler = BufferedRotatingFileHandler(self.log_file, encoding="utf-8", **kwargs)
+        self.addCleanup(handler.close)
+        return handler
+
+    def test_records_buffered_until_size_reached(self):
+        """Test that records stay in memory until the buffer size is reached"""
+        handler = self.make_handler(buffer_size=100, flush_interval=60)
+        handler.handle(make_record("x" * 40))
+        handler.handle(make_record("y" * 40))
+        self.assertEqual(self.log_file.read_text(), "")
+
+        handler.handle(make_record("z" * 40))
+        self.assertEqual(self.log_file.read_text().count("\n"), 3)
+
+    def test_error_flushes_immediately(self):
+        """Test that a record at the flush level writes the whole buffer"""
+        handler = self.make_handler(buffer_size=1 << 20, flush_interval=60)
+        handler.handle(make_record("context"))
+        handler.handle(make_record("failure", logging.ERROR))
+        self.assertEqual(self.log_file.read_text(), "context\nfailure\n")
+
+    def test_interval_flush_for_idle_handler(self):
+        """Test that the background flusher writes an idle buffer after the interval"""
+        handler = self.make_handler(buffer_size=1 << 20, flush_interval=0.05)
+        handler.handle(make_record("idle"))
+        deadline = time.monotonic() + 5
+        while self.log_file.read_text() == "" and time.monotonic() < deadline:
+            time.sleep(0.02)
+        self.assertEqual(self.log_file.read_text(), "idle\n")
+
+    def test_rollover_at_batch_boundary(self):
+        """Test that rollover happens between batches and keeps backupCount files"""
+        handler = self.make_handler(maxBytes=100, backupCount=2, buffer_size=60, flush_interval=60)
+        for index in range(12):
+            handler.handle(make_record(f"record {index:02d} " + "." * 20))
+        handler.flush()
+
+        files = sorted(path.name for path in Path(self.temp_dir.name).iterdir())
+        self.assertEqual(files, ["app.log", "app.log.1", "app.log.2"])
+        for path in Path(self.temp_dir.name).iterdir():
+            self.assertTrue(path.read_text().endswith("\n"))
+
+    def test_close_writes_pending_records(self):
+        """Test that closing the handler writes what is still buffered"""
+        handler = self.make_handler(buffer_size=1 << 20, flush_interval=60)
+        handler.handle(make_record("pending"))
+        handler.close()
+        self.assertEqual(self.log_file.read_text(), "pending\n")
+
+
+class ListHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.messages = []
+
+    def emit(self, record):
+        self.messages.append(record.getMessage())
+
+
+class TestFlightRecorderHandler(unittest.TestCase):
+
+    def test_debug_records_kept_in_ring(self):
+        """Test that only the last capacity DEBUG records are kept and other records pass through"""
+        target = ListHandler()
+        handler = FlightRecorderHandler(target, capacity=3)
+        for index in range(5):
+            handler.handle(make_record(f"debug {index}", logging.DEBUG))
+        handler.handle(make_record("info", logging.INFO))
+        self.assertEqual(target.messages, ["info"])
+        self.assertEqual(handler.buffered(), 3)
+
+    def test_error_dumps_context_first(self):
+        """Test that an ERROR record writes the buffered records, oldest first, before itself"""
+        target = ListHandler()
+        handler = FlightRecorderHandler(target, capacity=3)
+        for index in range(5):
+            handler.handle(make_record(f"debug {index}", logging.DEBUG))
+        handler.handle(make_record("failed", logging.ERROR))
+        handler.handle(make_record("debug 5", logging.DEBUG))
+        self.assertEqual(target.messages, ["debug 2", "debug 3", "debug 4", "failed"])
+        self.assertEqual(handler.buffered(), 1)
+
+    def test_dump_on_request(self):
+        """Test that dump writes and empties the buffer"""
+        target = ListHandler()
+        handler = FlightRecorderHandler(target, capacity=10)
+        handler.handle(make_record("debug 0", logging.DEBUG))
+        handler.handle(make_record("debug 1", logging.DEBUG))
+        handler.dump()
+        handler.dump()
+        self.assertEqual(target.messages, ["debug 0", "debug 1"])
+        with self.assertRaises(ValueError):
+            FlightRecorderHandler(target, capacity=0)
+
+
+class TestTimedSizeRotatingFileHandler(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.logs_dir = Path(self.temp_dir.name)
+        self.date = time.strftime("%Y%m%d")
+        self.log_file = self.logs_dir / f"app_{self.date}.log"
+
+    def tearDown(self):
+        wait_for_compression()
+        self.temp_dir.cleanup()
+
+    def make_handler(self, **kwargs):
+        handler = TimedSizeRotatingFileHandler(self.log_file, encoding="utf-8", **kwargs)
+        self.addCleanup(handler.close)
+        return handler
+
+    def read_lines(self, path):
+        opener = gzip.open if path.suffix == ".gz" else open
+        with opener(path, "rt", encoding="utf-8") as stream:
+            return stream.read().splitlines()
+
+    def test_size_rollover_numbers_and_compresses(self):
+        """Test that size rollover moves the file to growing backup numbers and compresses it"""
+        handler = self.make_handler(maxBytes=100)
+        for index in range(12):
+            handler.handle(make_record(f"record {index:02d} " + "." * 20))
+        wait_for_compression()
+
+        backups = sorted(self.logs_dir.glob(f"app_{self.date}.log.*.gz"), key=lambda path: int(path.name.split(".")[2]))
+        self.assertEqual([path.name for path in backups],
+                         [f"app_{self.date}.log.{number}.gz" for number in range(1, len(backups) + 1)])
+        lines = [line for path in [*backups, self.log_file] for line in self.read_lines(path)]
+        self.assertEqual(lines, [f"record {index:02d} " + "." * 20 for index in range(12)])
+
+    def test_index_follows_backup_until_compressed(self):
+        """Test that the checkpoint index is renamed with its backup and dropped once the backup is compressed"""
+        handler = self.make_handler(maxBytes=200, index_interval=50, compression=None)
+        for index in range(12):
+            handler.handle(make_record(f"record {index:02d} " + "." * 20))
+        self.assertTrue(Path(f"{self.log_file}.1.idx").exists())
+        self.assertTrue(Path(f"{self.log_file}.idx").exists())
+
+        handler.compression = "gzip"
+        handler.handle(make_record("x" * 200))
+        wait_for_compression()
+        self.assertFalse(Path(f"{self.log_file}.2.idx").exists())
+        self.assertTrue(Path(f"{self.log_file}.2.gz").exists())
+
+    def test_switches_file_at_midnight(self):
+        """Test that the first record after midnight goes to the new day's file"""
+        handler = self.make_handler()
+        handler.handle(make_record("before midnight"))
+        tomorrow = handler._next_date_change + 1
+        record = make_record("after midnight")
+        record.created = tomorrow
+        handler.handle(record)
+        wait_for_compression()
+
+        new_date = time.strftime("%Y%m%d", time.localtime(tomorrow))
+        self.assertEqual(self.read_lines(self.logs_dir / f"app_{new_date}.log"), ["after midnight"])
+        self.assertEqual(self.read_lines(self.logs_dir / f"app_{self.date}.log.gz"), ["before midnight"])
+        self.assertFalse(self.log_file.exists())
+
+    def test_numbering_continues_and_leftovers_compressed(self):
+        """Test that a new handler continues the backup numbers and compresses files left uncompressed"""
+        (self.logs_dir / f"app_{self.date}.log.3.gz").write_bytes(gzip.compress(b"old\n"))
+        (self.logs_dir / "app_20200101.log").write_text("older\n")
+        (self.logs_dir / "app_worker_20200101.log").write_text("other logger\n")
+        handler = self.make_handler(maxBytes=10)
+        handler.handle(make_record("first record"))
+        handler.handle(make_record("second record"))
+        wait_for_compression()
+
+        self.assertTrue((self.logs_dir / f"app_{self.date}.log.4.gz").exists())
+        self.assertTrue((self.logs_dir / "app_20200101.log.gz").exists())
+        self.assertTrue((self.logs_dir / "app_worker_20200101.log").exists())
+
+    def test_retention_keeps_newest_files(self):
+        """Test that the oldest rotated files are deleted beyond max_total_bytes"""
+        handler = self.make_handler(maxBytes=50, compression=None, max_total_bytes=120)
+        for index in range(20):
+            handler.handle(make_record(f"record {index:02d} " + "." * 20))
+        wait_for_compression()
+
+        backups = list(self.logs_dir.glob(f"app_{self.date}.log.*"))
+        self.assertLessEqual(sum(path.stat().st_size for path in backups), 120)
+        numbers = sorted(int(path.name.rsplit(".", 1)[1]) for path in backups)
+        self.assertEqual(numbers[-1], handler._backup_number)
+        self.assertEqual(numbers, list(range(numbers[0], numbers[-1] + 1)))
+
+    def test_invalid_configuration(self):
+        """Test that file names without a date and unavailable compressions are rejected"""
+        with self.assertRaises(ValueError):
+            TimedSizeRotatingFileHandler(self.logs_dir / "app.log")
+        with self.assertRaises(ValueError):
+            TimedSizeRotatingFileHandler(self.log_file, compression="bz2")
+        if not handlers.zstd_available():
+            with self.assertRaises(ValueError):
+                TimedSizeRotatingFileHandler(self.log_file, compression="zstd")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,139 @@
+import contextlib
+import gzip
+import io
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+# Add the src directory to the path so we can import the package
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from h7_logger_manager import log_query
+from h7_logger_manager.formatters import JsonFormatter
+from h7_logger_manager.handlers import IndexedRotatingFileHandler
+from h7_logger_manager.log_index import read_checkpoints
+from h7_logger_manager.log_query import query_file, query_logs
+from h7_logger_manager.logger_manager import TEXT_LOG_FORMAT
+
+# 2025-01-01 00:00:00 UTC
+BASE_TIME = 1735689600.0
+
+
+def make_record(index, name="app", level=logging.INFO, msg="request %d", exc_info=None):
+    record = logging.LogRecord(name, level, __file__, 1, msg, (index,), exc_info)
+    record.created = BASE_TIME + index
+    record.msecs = 0.0
+    return record
+
+
+class TestLogQuery(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.logs_dir = Path(self.temp_dir.name)
+        self.log_file = self.logs_dir / f"app_{time.strftime('%Y%m%d', time.localtime(BASE_TIME))}.log"
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def write_records(self, records, formatter=None, **kwargs):
+        kwargs.setdefault("index_interval", 1024)
+        handler = IndexedRotatingFileHandler(self.log_file, encoding="utf-8", **kwargs)
+        handler.setFormatter(formatter or logging.Formatter(TEXT_LOG_FORMAT))
+        for record in records:
+            handler.handle(record)
+        handler.close()
+
+    def test_index_checkpoints(self):
+        """Test that checkpoints are written every index_interval bytes at record boundaries"""
+        self.write_records(make_record(index) for index in range(500))
+        times, offsets = read_checkpoints(str(self.log_file))
+        self.assertGreater(len(offsets), 10)
+        self.assertEqual(times, sorted(times))
+        data = self.log_file.read_bytes()
+        for offset in offsets:
+            self.assertEqual(data[offset - 1:offset], b"\n")
+        self.assertTrue(all(later - earlier >= 1024 for earlier, later in zip(offsets, offsets[1:])))
+
+    def test_index_rotated_with_log_file(self):
+        """Test that each backup keeps the index of its own content"""
+        self.write_records((make_record(index) for index in range(2000)), maxBytes=40000, backupCount=2)
+        for path in (self.log_file, Path(f"{self.log_file}.1"), Path(f"{self.log_file}.2")):
+            times, offsets = read_checkpoints(str(path))
+            self.assertTrue(offsets, path)
+            data = path.read_bytes()
+            self.assertTrue(all(offset <= len(data) and data[offset - 1:offset] == b"\n" for offset in offsets))
+            first = next(query_file(str(path)))
+            self.assertLessEqual(first.time, times[0])
+
+    def test_time_range_uses_index(self):
+        """Test that a time range query starts at the last checkpoint before the range"""
+        self.write_records(make_record(index) for index in range(2000))
+        calls = []
+        real_match = log_query._RECORD_START_RE.match
+
+        class CountingPattern:
+            @staticmethod
+            def match(data, position=0):
+                calls.append(position)
+                return real_match(data, position)
+
+        with patch.object(log_query, "_RECORD_START_RE", CountingPattern):
+            entries = list(query_logs(self.logs_dir, start=BASE_TIME + 1500, end=BASE_TIME + 1509))
+        self.assertEqual([entry.message for entry in entries], [f"request {index}" for index in range(1500, 1510)])
+        # Only the records between the checkpoint and the end of the range are looked at
+        self.assertLess(len(calls), 100)
+
+    def test_level_logger_and_traceback(self):
+        """Test the level and logger filters and that traceback lines stay with their record"""
+        try:
+            raise ValueError("broken")
+        except ValueError:
+            exc_info = sys.exc_info()
+        records = [
+            make_record(0),
+            make_record(1, name="app.db", level=logging.ERROR, msg="failed %d", exc_info=exc_info),
+            make_record(2, name="app.dbx", level=logging.ERROR),
+            make_record(3, name="app.db"),
+        ]
+        self.write_records(records)
+
+        (entry,) = query_logs(self.logs_dir, level="WARNING", logger="app.db")
+        self.assertEqual((entry.logger, entry.level, entry.time), ("app.db", "ERROR", BASE_TIME + 1))
+        self.assertTrue(entry.message.startswith("failed 1\nTraceback"))
+        self.assertTrue(entry.text.endswith("ValueError: broken"))
+        with self.assertRaises(ValueError):
+            list(query_logs(self.logs_dir, level="LOUD"))
+
+    def test_json_lines_and_compressed_backups(self):
+        """Test that json log files and gzip backups are queried and merged in time order"""
+        self.write_records((make_record(index) for index in range(0, 10, 2)), formatter=JsonFormatter(utc=True))
+        with open(self.log_file, "rb") as source, gzip.open(f"{self.log_file}.1.gz", "wb") as target:
+            target.write(source.read())
+        self.log_file.unlink()
+        Path(f"{self.log_file}.idx").unlink()
+        self.write_records(make_record(index) for index in range(1, 10, 2))
+
+        entries = list(query_logs(self.logs_dir, start=BASE_TIME + 2, end=BASE_TIME + 7))
+        self.assertEqual([entry.message for entry in entries], [f"request {index}" for index in range(2, 8)])
+        self.assertEqual(json.loads(entries[0].text)["time"], "2025-01-01T00:00:02.000Z")
+
+    def test_command_line(self):
+        """Test the command line count and level options"""
+        self.write_records([make_record(0), make_record(1, level=logging.WARNING)])
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            self.assertEqual(log_query.main([str(self.logs_dir), "--level", "warning", "--count"]), 0)
+        self.assertEqual(output.getvalue(), "1\n")
+        with contextlib.redirect_stderr(io.StringIO()):
+            self.assertEqual(log_query.main([str(self.logs_dir), "--level", "loud"]), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
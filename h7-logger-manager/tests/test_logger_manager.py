@@ -1,6 +1,9 @@
+import json
 import logging
 import os
 import sys
+import tempfile
+import threading
 import unittest
 from pathlib import Path
 from unittest.mock import patch
@@ -8,11 +11,17 @@ from unittest.mock import patch
 # Add the src directory to the path so we can import the package
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
 
-from h7_logger_manager.logger_manager import LoggerManager
-from pathlib import Path
-import tempfile
+from h7_file_finder.instrumentation import metrics
+
+from h7_logger_manager.logger_manager import LoggerManager, _default_logs_dir
 
 
+def use_default_filter_settings(mock_env_manager):
+    """Make the mocked typed getters return their defaults, leaving the filters disabled"""
+    for getter in ("get_optional_list_env_var", "get_optional_float_env_var", "get_optional_int_env_var",
+                   "get_optional_bool_env_var", "get_optional_duration_env_var"):
+        getattr(mock_env_manager, getter).side_effect = lambda key, default=None: default
+
 
 class TestLoggerManager(unittest.TestCase):
 
@@ -29,6 +38,7 @@ class TestLoggerManager(unittest.TestCase):
             mock_find_logs.return_value = temp_path
             mock_env_manager.get_required_env_var.return_value = "test_logger"
             mock_env_manager.get_optional_env_var.return_value = "false"
+            use_default_filter_settings(mock_env_manager)
             mock_rotating_handler.return_value = unittest.mock.Mock()
 
             LoggerManager._loggers = {}
@@ -56,6 +66,7 @@ class TestLoggerManager(unittest.TestCase):
             temp_path = Path(temp_logs_dir)
             mock_find_logs.return_value = temp_path
             mock_env_manager.get_optional_env_var.return_value = "true"
+            use_default_filter_settings(mock_env_manager)
             mock_rotating_handler.return_value = unittest.mock.Mock()
 
             LoggerManager._loggers = {}
@@ -65,5 +76,203 @@ class TestLoggerManager(unittest.TestCase):
             self.assertIsInstance(logger, logging.Logger)
             self.assertEqual(logger.name, "custom_logger")
             mock_makedirs.assert_called_once_with(temp_path / "logs")
+
+    @patch("h7_logger_manager.logger_manager.running_archive")
+    @patch("h7_logger_manager.logger_manager.find_project_root")
+    def test_logs_dir_next_to_running_archive(self, mock_find_root, mock_running_archive):
+        """Test that a project root inside the running zipapp puts the logs next to the archive"""
+        archive = Path("/srv/app.pyz")
+        mock_find_root.return_value = archive
+        mock_running_archive.return_value.archive = archive
+        mock_running_archive.return_value.contains.return_value = True
+        self.assertEqual(_default_logs_dir(), Path("/srv/logs"))
+        mock_running_archive.return_value = None
+        self.assertEqual(_default_logs_dir(), archive / "logs")
+
+    @patch("h7_logger_manager.logger_manager.RotatingFileHandler")
+    @patch("h7_logger_manager.logger_manager.EnvManager")
+    @patch("h7_logger_manager.logger_manager.find_project_root")
+    @patch("h7_logger_manager.logger_manager.os.path.exists")
+    @patch("h7_logger_manager.logger_manager.os.makedirs")
+    def test_concurrent_setup_attaches_handlers_once(
+        self, mock_makedirs, mock_exists, mock_find_logs, mock_env_manager, mock_rotating_handler
+    ):
+        """Test that many threads setting up the same logger get one logger with one set of handlers"""
+        with tempfile.TemporaryDirectory() as temp_logs_dir:
+            mock_exists.return_value = True
+            mock_find_logs.return_value = Path(temp_logs_dir)
+            mock_env_manager.get_required_env_var.return_value = "concurrent_logger"
+            mock_env_manager.get_optional_env_var.return_value = "false"
+            use_default_filter_settings(mock_env_manager)
+            mock_rotating_handler.side_effect = lambda *args, **kwargs: unittest.mock.Mock(level=logging.DEBUG)
+
+            LoggerManager._loggers = {}
+            logging.getLogger("concurrent_logger").handlers.clear()
+            barrier = threading.Barrier(64)
+            loggers = []
+
+            def worker():
+                barrier.wait()
+                loggers.append(LoggerManager.setup_logger())
+
+            threads = [threading.Thread(target=worker) for _ in range(64)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+            self.assertEqual(len({id(logger) for logger in loggers}), 1)
+            self.assertEqual(len(loggers[0].handlers), 2)
+            self.assertEqual(mock_rotating_handler.call_count, 1)
+
+    @patch("h7_logger_manager.logger_manager.EnvManager")
+    def test_json_output_format(self, mock_env_manager):
+        """Test that the json output format writes one JSON object per record, including extra fields"""
+        with tempfile.TemporaryDirectory() as temp_logs_dir:
+            mock_env_manager.get_optional_env_var.return_value = "true"
+            use_default_filter_settings(mock_env_manager)
+            LoggerManager._loggers = {}
+            logger = logging.getLogger("json_logger")
+            logger.handlers.clear()
+            try:
+                with patch.object(LoggerManager, "output_format", "json"):
+                    logger = LoggerManager.setup_logger("json_logger", logs_dir=temp_logs_dir)
+                logger.handlers[0].setLevel(logging.CRITICAL)
+                logger.debug("order %s shipped", 17, extra={"order_id": 17})
+
+                (log_file,) = Path(temp_logs_dir).glob("json_logger_*.log")
+                payload = json.loads(log_file.read_text(encoding="utf-8"))
+                self.assertEqual(payload["message"], "order 17 shipped")
+                self.assertEqual(payload["order_id"], 17)
+                self.assertEqual(payload["level"], "DEBUG")
+            finally:
+                for handler in list(logger.handlers):
+                    logger.removeHandler(handler)
+                    handler.close()
+                LoggerManager._loggers = {}
+
+    @patch("h7_logger_manager.logger_manager.EnvManager")
+    def test_handler_timing_metrics(self, mock_env_manager):
+        """Test that loggers created with metrics enabled time each of their handlers"""
+        with tempfile.TemporaryDirectory() as temp_logs_dir:
+            mock_env_manager.get_optional_env_var.return_value = "true"
+            use_default_filter_settings(mock_env_manager)
+            LoggerManager._loggers = {}
+            logger = logging.getLogger("timed_logger")
+            logger.handlers.clear()
+            metrics.reset()
+            metrics.enable()
+            try:
+                logger = LoggerManager.setup_logger("timed_logger", logs_dir=temp_logs_dir)
+                logger.handlers[0].setLevel(logging.CRITICAL)
+                logger.debug("first")
+                logger.debug("second")
+
+                timings = metrics.snapshot()["timings"]
+                self.assertEqual(timings['logger_handler_seconds{handler="RotatingFileHandler"}']["count"], 2)
+                # The console handler is below its level, so the logger never calls it
+                self.assertNotIn('logger_handler_seconds{handler="StreamHandler"}', timings)
+            finally:
+                metrics.disable()
+                metrics.reset()
+                for handler in list(logger.handlers):
+                    logger.removeHandler(handler)
+                    handler.close()
+                LoggerManager._loggers = {}
+
+    @patch("h7_logger_manager.logger_manager.EnvManager")
+    def test_flight_recorder_mode(self, mock_env_manager):
+        """Test that DEBUG records only reach the log file before an error or on request"""
+        with tempfile.TemporaryDirectory() as temp_logs_dir:
+            mock_env_manager.get_optional_env_var.return_value = "true"
+            use_default_filter_settings(mock_env_manager)
+            LoggerManager._loggers = {}
+            logger = logging.getLogger("recorded_logger")
+            logger.handlers.clear()
+            try:
+                with patch.object(LoggerManager, "flight_recorder_size", 2):
+                    logger = LoggerManager.setup_logger("recorded_logger", logs_dir=temp_logs_dir)
+                logger.handlers[0].setLevel(logging.CRITICAL)
+                (log_file,) = Path(temp_logs_dir).glob("recorded_logger_*.log")
+
+                for index in range(3):
+                    logger.debug("step %d", index)
+                self.assertEqual(log_file.read_text(encoding="utf-8"), "")
+                logger.error("failed")
+                logger.debug("step 3")
+                lines = log_file.read_text(encoding="utf-8").splitlines()
+                self.assertEqual([line.rsplit(" - ", 1)[1] for line in lines], ["step 1", "step 2", "failed"])
+
+                LoggerManager.dump_flight_recorder("recorded_logger")
+                self.assertTrue(log_file.read_text(encoding="utf-8").endswith(" - step 3\n"))
+            finally:
+                LoggerManager.close_all()
+
+    @patch("h7_logger_manager.logger_manager.EnvManager")
+    def test_loggers_share_pooled_file_handler(self, mock_env_manager):
+        """Test that loggers with the same prefix share one file handler, closed with the last of them"""
+        with tempfile.TemporaryDirectory() as temp_logs_dir:
+            mock_env_manager.get_optional_env_var.return_value = "true"
+            use_default_filter_settings(mock_env_manager)
+            LoggerManager._loggers = {}
+            names = ["pooled.a", "pooled.b", "pooled.other"]
+            for name in names:
+                logging.getLogger(name).handlers.clear()
+            try:
+                with patch.object(LoggerManager, "max_open_log_files", 1):
+                    first = LoggerManager.setup_logger("pooled.a", "shared", logs_dir=temp_logs_dir)
+                    second = LoggerManager.setup_logger("pooled.b", "shared", logs_dir=temp_logs_dir)
+                    other = LoggerManager.setup_logger("pooled.other", logs_dir=temp_logs_dir)
+                shared_handler = first.handlers[1]
+                self.assertIs(second.handlers[1], shared_handler)
+                self.assertIsNot(other.handlers[1], shared_handler)
+                for logger in (first, second, other):
+                    logger.handlers[0].setLevel(logging.CRITICAL)
+
+                first.info("from a")
+                other.info("from other")
+                # Only one log file is kept open; the shared one reopens on its next record
+                self.assertIsNone(shared_handler.stream)
+                second.info("from b")
+                self.assertIsNone(other.handlers[1].stream)
+                (log_file,) = Path(temp_logs_dir).glob("shared_*.log")
+                lines = log_file.read_text(encoding="utf-8").splitlines()
+                self.assertEqual([line.split(" - ")[1] for line in lines], ["pooled.a", "pooled.b"])
+
+                self.assertTrue(LoggerManager.remove_logger("pooled.a"))
+                self.assertFalse(LoggerManager.remove_logger("pooled.a"))
+                self.assertEqual(first.handlers, [])
+                second.info("still open")
+                self.assertIsNotNone(shared_handler.stream)
+                LoggerManager.remove_logger("pooled.b")
+                self.assertIsNone(shared_handler.stream)
+                self.assertFalse(LoggerManager._handler_pool.owns(shared_handler))
+            finally:
+                LoggerManager.close_all()
+            self.assertEqual(len(LoggerManager._handler_pool), 0)
+            self.assertEqual(LoggerManager._loggers, {})
+
+    @unittest.skipUnless(hasattr(os, "fork"), "requires os.fork")
+    def test_forked_child_reopens_log_file(self):
+        """Test that a forked child drops the inherited file stream and gets a fresh lock"""
+        with tempfile.TemporaryDirectory() as temp_logs_dir:
+            handler = logging.FileHandler(os.path.join(temp_logs_dir, "fork.log"))
+            logger = logging.getLogger("fork_logger")
+            logger.addHandler(handler)
+            LoggerManager._loggers = {"fork_logger": logger}
+            try:
+                pid = os.fork()
+                if pid == 0:
+                    ok = handler.stream is None and LoggerManager._lock.acquire(timeout=2)
+                    os._exit(0 if ok else 1)
+                _, status = os.waitpid(pid, 0)
+                self.assertEqual(os.WEXITSTATUS(status), 0)
+                self.assertIsNotNone(handler.stream)
+            finally:
+                logger.removeHandler(handler)
+                handler.close()
+                LoggerManager._loggers = {}
+
+
 if __name__ == '__main__':
-    unittest.main()
\ No newline at end of file
+    unittest.main()
@@ -0,0 +1,121 @@
+import logging
+import multiprocessing
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+# Add the src directory to the path so we can import the package
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from test_logger_manager import use_default_filter_settings
+
+from h7_logger_manager.logger_manager import AGGREGATOR_ADDRESS_ENV_VAR, LoggerManager
+from h7_logger_manager.multiprocess import AggregatorClientHandler, LogAggregator, parse_address
+
+
+def make_file_handler(log_file):
+    handler = logging.FileHandler(log_file, encoding="utf-8")
+    handler.setFormatter(logging.Formatter("%(process)d %(message)s"))
+    return handler
+
+
+def produce(address, log_file, count):
+    handler = AggregatorClientHandler(address, log_file)
+    logger = logging.getLogger(f"producer_{os.getpid()}")
+    logger.setLevel(logging.DEBUG)
+    logger.addHandler(handler)
+    for index in range(count):
+        logger.debug("record %d", index)
+    handler.close()
+
+
+class TestLogAggregator(unittest.TestCase):
+
+    def test_parse_address(self):
+        """Test the unix and host:port address forms"""
+        self.assertEqual(parse_address("unix:/tmp/log.sock"), "/tmp/log.sock")
+        self.assertEqual(parse_address("127.0.0.1:9020"), ("127.0.0.1", 9020))
+        with self.assertRaises(ValueError):
+            parse_address("localhost")
+
+    @unittest.skipUnless(hasattr(os, "fork"), "requires os.fork")
+    def test_records_from_several_processes_reach_one_file(self):
+        """Test that the aggregator writes every record sent by several producer processes"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            log_file = os.path.join(temp_dir, "app.log")
+            for address in (None, "127.0.0.1:0"):
+                with self.subTest(address=address):
+                    aggregator = LogAggregator(make_file_handler, address)
+                    aggregator.start()
+                    context = multiprocessing.get_context("fork")
+                    producers = [context.Process(target=produce, args=(aggregator.address, log_file, 200))
+                                 for _ in range(4)]
+                    for process in producers:
+                        process.start()
+                    for process in producers:
+                        process.join()
+                    aggregator.stop()
+
+                    lines = Path(log_file).read_text(encoding="utf-8").splitlines()
+                    self.assertEqual(len(lines), 800)
+                    self.assertEqual({line.split()[0] for line in lines}, {str(p.pid) for p in producers})
+                    os.unlink(log_file)
+
+    @unittest.skipUnless(hasattr(os, "fork"), "requires os.fork")
+    def test_close_reads_connections_left_in_listen_queue(self):
+        """Test that records of clients that connected but were never accepted are written on close"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            log_file = os.path.join(temp_dir, "app.log")
+            for address in (None, "127.0.0.1:0"):
+                with self.subTest(address=address):
+                    # Never served: every connection stays in the listen queue until close()
+                    aggregator = LogAggregator(make_file_handler, address)
+                    context = multiprocessing.get_context("fork")
+                    producers = [context.Process(target=produce, args=(aggregator.address, log_file, 20))
+                                 for _ in range(3)]
+                    for process in producers:
+                        process.start()
+                    for process in producers:
+                        process.join()
+                    aggregator.close()
+
+                    lines = Path(log_file).read_text(encoding="utf-8").splitlines()
+                    self.assertEqual(len(lines), 60)
+                    os.unlink(log_file)
+
+    @patch("h7_logger_manager.logger_manager.EnvManager")
+    def test_logger_manager_multi_process_mode(self, mock_env_manager):
+        """Test that loggers send file records to the aggregator process started by LoggerManager"""
+        with tempfile.TemporaryDirectory() as temp_logs_dir:
+            mock_env_manager.get_optional_env_var.return_value = "true"
+            use_default_filter_settings(mock_env_manager)
+            LoggerManager._loggers = {}
+            logger = logging.getLogger("aggregated_logger")
+            logger.handlers.clear()
+            address = LoggerManager.start_log_aggregator()
+            try:
+                self.assertEqual(os.environ[AGGREGATOR_ADDRESS_ENV_VAR], address)
+                logger = LoggerManager.setup_logger("aggregated_logger", logs_dir=temp_logs_dir)
+                logger.handlers[0].setLevel(logging.CRITICAL)
+                self.assertIsInstance(logger.handlers[1], AggregatorClientHandler)
+                for index in range(50):
+                    logger.debug("record %d", index)
+            finally:
+                LoggerManager.stop_log_aggregator()
+                for handler in list(logger.handlers):
+                    logger.removeHandler(handler)
+                    handler.close()
+                LoggerManager._loggers = {}
+
+            self.assertNotIn(AGGREGATOR_ADDRESS_ENV_VAR, os.environ)
+            (log_file,) = Path(temp_logs_dir).glob("aggregated_logger_*.log")
+            lines = log_file.read_text(encoding="utf-8").splitlines()
+            self.assertEqual(len(lines), 50)
+            self.assertTrue(lines[-1].endswith("aggregated_logger - DEBUG - record 49"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,148 @@
+import logging
+import os
+import sys
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+# Add the src directory to the path so we can import the package
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from test_logger_manager import use_default_filter_settings
+
+from h7_logger_manager.logger_manager import LoggerManager
+from h7_logger_manager.queue_logging import AsyncLoggingPipeline
+
+
+class RecordingHandler(logging.Handler):
+    """Collect formatted messages and the thread that wrote them, optionally blocking first."""
+
+    def __init__(self, gate=None):
+        super().__init__()
+        self.gate = gate
+        self.messages = []
+        self.threads = set()
+
+    def emit(self, record):
+        if self.gate is not None:
+            self.gate.wait()
+        self.messages.append(self.format(record))
+        self.threads.add(threading.current_thread().name)
+
+
+class TestAsyncLoggingPipeline(unittest.TestCase):
+
+    def make_logger(self, name, pipeline, handler):
+        logger = logging.getLogger(name)
+        logger.setLevel(logging.DEBUG)
+        logger.propagate = False
+        queue_handler = pipeline.attach(name, [handler])
+        logger.addHandler(queue_handler)
+        self.addCleanup(logger.removeHandler, queue_handler)
+        return logger
+
+    def test_records_written_on_listener_thread(self):
+        """Test that handlers run on the listener thread and see the merged message"""
+        pipeline = AsyncLoggingPipeline()
+        handler = RecordingHandler()
+        logger = self.make_logger("async_thread_test", pipeline, handler)
+
+        items = ["a"]
+        logger.info("items=%s", items)
+        items.append("mutated after the call")
+        pipeline.stop()
+
+        self.assertEqual(handler.messages, ["items=['a']"])
+        self.assertNotIn(threading.current_thread().name, handler.threads)
+
+    def test_drop_policy_counts_dropped_records(self):
+        """Test that a full queue drops records instead of blocking the caller"""
+        gate = threading.Event()
+        pipeline = AsyncLoggingPipeline(maxsize=1, policy="drop")
+        handler = RecordingHandler(gate)
+        logger = self.make_logger("async_drop_test", pipeline, handler)
+
+        for index in range(20):
+            logger.info("record %d", index)
+        gate.set()
+        pipeline.stop()
+
+        self.assertGreater(pipeline.dropped, 0)
+        self.assertEqual(len(handler.messages) + pipeline.dropped, 20)
+
+    def test_drop_debug_first_keeps_warnings(self):
+        """Test that drop-debug-first only sacrifices DEBUG records"""
+        gate = threading.Event()
+        pipeline = AsyncLoggingPipeline(maxsize=1, policy="drop-debug-first")
+        handler = RecordingHandler(gate)
+        logger = self.make_logger("async_debug_first_test", pipeline, handler)
+
+        for index in range(10):
+            logger.debug("debug %d", index)
+        threading.Timer(0.05, gate.set).start()
+        logger.warning("must survive")
+        pipeline.stop()
+
+        self.assertIn("must survive", handler.messages)
+        self.assertGreater(pipeline.dropped, 0)
+
+    def test_records_after_stop_are_written_synchronously(self):
+        """Test that logging after shutdown neither blocks nor loses records"""
+        pipeline = AsyncLoggingPipeline(maxsize=1)
+        handler = RecordingHandler()
+        logger = self.make_logger("async_after_stop_test", pipeline, handler)
+        pipeline.stop()
+
+        for index in range(5):
+            logger.info("late %d", index)
+        self.assertEqual(len(handler.messages), 5)
+
+    def test_detach_writes_queued_records_first(self):
+        """Test that detach returns the handlers of a route after its queued records were written"""
+        gate = threading.Event()
+        pipeline = AsyncLoggingPipeline()
+        handler = RecordingHandler(gate)
+        logger = self.make_logger("async_detach_test", pipeline, handler)
+
+        for index in range(5):
+            logger.info("queued %d", index)
+        threading.Timer(0.05, gate.set).start()
+        self.assertEqual(pipeline.detach("async_detach_test"), [handler])
+        self.assertEqual(len(handler.messages), 5)
+        self.assertEqual(pipeline.detach("async_detach_test"), [])
+        self.assertEqual(pipeline.queue_handlers, [])
+        pipeline.stop()
+
+    @patch("h7_logger_manager.logger_manager.EnvManager")
+    @patch("h7_logger_manager.logger_manager.find_project_root")
+    def test_setup_logger_in_async_mode(self, mock_find_logs, mock_env_manager):
+        """Test that setup_logger attaches only a queue handler and writes through it"""
+        with tempfile.TemporaryDirectory() as temp_logs_dir:
+            mock_find_logs.return_value = Path(temp_logs_dir)
+            mock_env_manager.get_required_env_var.return_value = "async_setup_test"
+            mock_env_manager.get_optional_env_var.return_value = "false"
+            use_default_filter_settings(mock_env_manager)
+
+            LoggerManager._loggers = {}
+            with patch.object(LoggerManager, "async_logging", True), \
+                    patch.object(LoggerManager, "_async_pipeline", None):
+                logger = LoggerManager.setup_logger()
+                try:
+                    self.assertEqual([type(handler).__name__ for handler in logger.handlers],
+                                     ["BoundedQueueHandler"])
+                    logger.debug("written by the listener")
+                    LoggerManager.shutdown()
+
+                    log_files = list((Path(temp_logs_dir) / "logs").glob("async_setup_test_*.log"))
+                    self.assertIn("written by the listener", log_files[0].read_text())
+                finally:
+                    for handler in LoggerManager._async_pipeline.router.routes["async_setup_test"]:
+                        handler.close()
+                    logger.handlers.clear()
+                    LoggerManager._loggers = {}
+
+
+if __name__ == '__main__':
+    unittest.main()